@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from threading import RLock
+from typing import Deque, Dict
+
+
+@dataclass(slots=True)
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit for one provider key.
+
+    The limit grows by roughly one slot per window of healthy responses and is cut
+    multiplicatively on overload signals (timeouts, 429, 5xx). Counters are guarded
+    by a thread lock and waiters are futures on the caller's own loop, woken through
+    ``call_soon_threadsafe`` when released from another thread, so one limiter can be
+    shared by schedulers running on different event loops.
+    """
+
+    key: str
+    limit: float
+    min_limit: int = 1
+    max_limit: int = 8
+    increase_step: float = 1.0
+    decrease_factor: float = 0.5
+    latency_tolerance: float = 2.0
+    decrease_cooldown_sec: float = 2.0
+    in_flight: int = 0
+    latency_ewma_ms: float = 0.0
+    successes: int = 0
+    overloads: int = 0
+    last_decrease_at: float = 0.0
+    _waiters: Deque[asyncio.Future] = field(default_factory=deque)
+    _lock: RLock = field(default_factory=RLock, repr=False, compare=False)
+
+    @property
+    def current_limit(self) -> int:
+        return max(self.min_limit, min(self.max_limit, int(self.limit)))
+
+    async def acquire(self) -> None:
+        while True:
+            with self._lock:
+                if self.in_flight < self.current_limit:
+                    self.in_flight += 1
+                    return
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                    self._wake()
+                raise
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free right now; never waits."""
+        with self._lock:
+            if self._waiters or self.in_flight >= self.current_limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._wake()
+
+    def _wake(self) -> None:
+        free = self.current_limit - self.in_flight
+        while free > 0 and self._waiters:
+            if _notify(self._waiters.popleft()):
+                free -= 1
+
+    async def __aenter__(self) -> "AdaptiveConcurrencyLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.release()
+
+    def on_success(self, latency_ms: float) -> None:
+        with self._lock:
+            self.successes += 1
+            if self.latency_ewma_ms <= 0:
+                self.latency_ewma_ms = latency_ms
+            healthy = latency_ms <= self.latency_ewma_ms * self.latency_tolerance
+            self.latency_ewma_ms = self.latency_ewma_ms * 0.9 + latency_ms * 0.1
+            if healthy and self.limit < self.max_limit:
+                self.limit = min(float(self.max_limit), self.limit + self.increase_step / max(1.0, self.limit))
+                self._wake()
+
+    def on_overload(self) -> None:
+        with self._lock:
+            self.overloads += 1
+            now = time.monotonic()
+            if now - self.last_decrease_at < self.decrease_cooldown_sec:
+                return
+            self.last_decrease_at = now
+            self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "limit": self.current_limit,
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiters),
+                "latency_ewma_ms": round(self.latency_ewma_ms, 2),
+                "successes": self.successes,
+                "overloads": self.overloads,
+            }
+
+
+def _notify(waiter: asyncio.Future) -> bool:
+    """Resolve ``waiter`` on its own loop; False when it can no longer be woken."""
+    if waiter.done():
+        return False
+    loop = waiter.get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        waiter.set_result(None)
+        return True
+    try:
+        loop.call_soon_threadsafe(_resolve, waiter)
+    except RuntimeError:
+        return False
+    return True
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class ProviderLimiterRegistry:
+    """Process-wide limiters keyed by provider key, shared by every scheduler."""
+
+    def __init__(self) -> None:
+        self._lock = RLock()
+        self._limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+
+    def get(self, key: str, *, initial_limit: int, max_limit: int) -> AdaptiveConcurrencyLimiter:
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limiter = AdaptiveConcurrencyLimiter(
+                    key=key,
+                    limit=float(max(1, min(initial_limit, max_limit))),
+                    max_limit=max(1, max_limit),
+                    latency_tolerance=max(1.0, float(os.getenv("CAT_PROVIDER_LATENCY_TOLERANCE", "2.0"))),
+                    decrease_cooldown_sec=max(0.0, float(os.getenv("CAT_PROVIDER_DECREASE_COOLDOWN_SEC", "2.0"))),
+                )
+                self._limiters[key] = limiter
+            elif limiter.max_limit != max_limit:
+                limiter.max_limit = max(1, max_limit)
+            return limiter
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {key: limiter.to_dict() for key, limiter in self._limiters.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._limiters.clear()
+
+
+provider_limiters = ProviderLimiterRegistry()
@@ -1,16 +1,31 @@
 from __future__ import annotations
 
 import asyncio
+import math
 import os
 import time
+from bisect import bisect_left
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from urllib.parse import urlparse
 
 import httpx
 
+from app.agent.adaptive_limiter import AdaptiveConcurrencyLimiter, ProviderLimiterRegistry, provider_limiters
 from app.agent.fallback_strategies import FallbackStrategies
+from app.agent.ipc_transport import async_transport, ipc_url
+from app.core.audit_event import format_ts, now_ns
+from app.core.audit_log import SpillingAuditLog
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (
+    50, 100, 250, 500, 1000, 2000, 3000, 5000, 7500, 10000, 15000, 20000, 30000, 45000, 60000, 90000,
+)
 
 
 @dataclass(slots=True)
@@ -30,6 +45,49 @@ class AgentRegistration:
     registered_at: datetime = field(default_factory=datetime.utcnow)
     last_heartbeat: datetime = field(default_factory=datetime.utcnow)
     last_error: Optional[str] = None
+    breaker_state: str = BREAKER_CLOSED
+    breaker_open_until: float = 0.0
+    breaker_cooldown_sec: float = 0.0
+    breaker_trial_in_flight: bool = False
+
+
+@dataclass(slots=True)
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; memory stays constant regardless of sample count."""
+
+    counts: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+    count: int = 0
+    sum_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def observe(self, latency_ms: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+        self.count += 1
+        self.sum_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding quantile ``q``, capped at the observed max."""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for idx, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                if idx < len(LATENCY_BUCKETS_MS):
+                    return min(float(LATENCY_BUCKETS_MS[idx]), self.max_ms)
+                break
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "p50_ms": round(self.percentile(0.5), 2),
+            "p90_ms": round(self.percentile(0.9), 2),
+            "p99_ms": round(self.percentile(0.99), 2),
+            "max_ms": round(self.max_ms, 2),
+        }
 
 
 @dataclass(slots=True)
@@ -38,7 +96,35 @@ class SchedulerMetrics:
     timeout_calls: int = 0
     error_calls: int = 0
     total_latency_ms: float = 0.0
+    short_circuit_calls: int = 0
+    retry_attempts: int = 0
+    backoff_sec_total: float = 0.0
+    hedged_requests: int = 0
+    hedge_wins: int = 0
     by_error_type: Dict[str, int] = field(default_factory=dict)
+    retries_by_reason: Dict[str, int] = field(default_factory=dict)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    latency_by_phase: Dict[str, LatencyHistogram] = field(default_factory=dict)
+    latency_by_provider: Dict[str, LatencyHistogram] = field(default_factory=dict)
+    latency_by_player: Dict[str, LatencyHistogram] = field(default_factory=dict)
+
+    def observe_latency(self, latency_ms: float, *, phase: str, provider: str, player_id: str) -> None:
+        """Record one end-to-end call latency (retries and backoff included)."""
+        self.latency.observe(latency_ms)
+        for bucket, key in (
+            (self.latency_by_phase, phase),
+            (self.latency_by_provider, provider),
+            (self.latency_by_player, player_id),
+        ):
+            hist = bucket.get(key)
+            if hist is None:
+                hist = bucket[key] = LatencyHistogram()
+            hist.observe(latency_ms)
+
+    def observe_retry(self, reason: str, backoff_sec: float) -> None:
+        self.retry_attempts += 1
+        self.backoff_sec_total += backoff_sec
+        self.retries_by_reason[reason] = self.retries_by_reason.get(reason, 0) + 1
 
     def observe_success(self, latency_ms: float) -> None:
         self.total_calls += 1
@@ -54,6 +140,9 @@ class SchedulerMetrics:
         self.error_calls += 1
         self.by_error_type[error_name] = self.by_error_type.get(error_name, 0) + 1
 
+    def observe_short_circuit(self) -> None:
+        self.short_circuit_calls += 1
+
     def to_dict(self) -> dict:
         avg = 0.0 if self.total_calls == 0 else self.total_latency_ms / self.total_calls
         timeout_rate = 0.0 if self.total_calls == 0 else self.timeout_calls / self.total_calls
@@ -63,13 +152,25 @@ class SchedulerMetrics:
             "error_calls": self.error_calls,
             "avg_latency_ms": round(avg, 2),
             "timeout_rate": round(timeout_rate, 4),
+            "short_circuit_calls": self.short_circuit_calls,
             "by_error_type": self.by_error_type,
+            "retry_attempts": self.retry_attempts,
+            "retries_by_reason": self.retries_by_reason,
+            "backoff_sec_total": round(self.backoff_sec_total, 3),
+            "hedged_requests": self.hedged_requests,
+            "hedge_wins": self.hedge_wins,
+            "latency": self.latency.to_dict(),
+            "latency_by_phase": {key: hist.to_dict() for key, hist in sorted(self.latency_by_phase.items())},
+            "latency_by_provider": {key: hist.to_dict() for key, hist in sorted(self.latency_by_provider.items())},
+            "latency_by_player": {key: hist.to_dict() for key, hist in sorted(self.latency_by_player.items())},
         }
 
 
 class AgentRegistry:
     def __init__(self) -> None:
         self._agents: Dict[str, AgentRegistration] = {}
+        # Called with an endpoint no registered agent uses any more after a re-registration.
+        self.on_endpoint_released: Optional[Callable[[str], None]] = None
 
     def register(
         self,
@@ -97,7 +198,15 @@ class AgentRegistry:
             failed_count=0,
             entrusted=False,
         )
+        previous = self._agents.get(player_id)
         self._agents[player_id] = reg
+        if (
+            previous is not None
+            and previous.ipc_endpoint != reg.ipc_endpoint
+            and self.on_endpoint_released is not None
+            and all(agent.ipc_endpoint != previous.ipc_endpoint for agent in self._agents.values())
+        ):
+            self.on_endpoint_released(previous.ipc_endpoint)
         return reg
 
     def get(self, player_id: str) -> Optional[AgentRegistration]:
@@ -112,16 +221,25 @@ class AgentRegistry:
             return
         agent.online = False
         agent.entrusted = True
+        agent.breaker_state = BREAKER_OPEN
+        agent.breaker_open_until = float("inf")
 
 
 class AgentScheduler:
     """God-agent scheduling core with timeout/circuit-breaker/fallback."""
 
-    def __init__(self, fallback: Optional[FallbackStrategies] = None, debug_mode: bool = False) -> None:
+    def __init__(
+        self,
+        fallback: Optional[FallbackStrategies] = None,
+        debug_mode: bool = False,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        limiters: Optional[ProviderLimiterRegistry] = None,
+    ) -> None:
         self.registry = AgentRegistry()
+        self.registry.on_endpoint_released = self._release_client
         self.fallback = fallback or FallbackStrategies()
         self.metrics = SchedulerMetrics()
-        self.audit_logs: list[dict] = []
+        self.audit_logs = SpillingAuditLog()
         self.debug_mode = debug_mode
         self.provider_max_concurrency = max(1, int(os.getenv("CAT_PROVIDER_MAX_CONCURRENCY", "8")))
         self.same_provider_max_concurrency = max(1, int(os.getenv("CAT_SAME_PROVIDER_MAX_CONCURRENCY", "1")))
@@ -136,16 +254,40 @@ class AgentScheduler:
         self.max_timeout_retries = max(0, int(os.getenv("CAT_AGENT_TIMEOUT_RETRIES", "2")))
         self.max_transient_retries = max(0, int(os.getenv("CAT_AGENT_TRANSIENT_RETRIES", "2")))
         self.retry_backoff_sec = max(0.1, float(os.getenv("CAT_AGENT_RETRY_BACKOFF_SEC", "0.8")))
-        self._provider_semaphores: Dict[str, asyncio.Semaphore] = {}
-        self._provider_limits: Dict[str, int] = {}
+        self.limiters = limiters or provider_limiters
+        self.keepalive_expiry_sec = max(1.0, float(os.getenv("CAT_AGENT_KEEPALIVE_EXPIRY_SEC", "30")))
+        self._transport = transport
+        self._clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+        self._closing: Set[asyncio.Future] = set()
+        self.breaker_failure_threshold = max(1, int(os.getenv("CAT_AGENT_BREAKER_FAILURES", "4")))
+        self.breaker_cooldown_sec = max(0.0, float(os.getenv("CAT_AGENT_BREAKER_COOLDOWN_SEC", "5")))
+        self.breaker_max_cooldown_sec = max(
+            self.breaker_cooldown_sec,
+            float(os.getenv("CAT_AGENT_BREAKER_MAX_COOLDOWN_SEC", "60")),
+        )
+        self.health_probe_timeout_sec = max(0.1, float(os.getenv("CAT_AGENT_HEALTH_PROBE_TIMEOUT_SEC", "2")))
+        self._probe_tasks: Dict[str, asyncio.Task] = {}
+        # Set once the room is finalized; breaker probes stop and must not rebuild the pool.
+        self._closed = False
+        self.deadline_margin_sec = max(0.0, float(os.getenv("CAT_AGENT_DEADLINE_MARGIN_SEC", "1.0")))
+        self.min_attempt_sec = max(0.1, float(os.getenv("CAT_AGENT_MIN_ATTEMPT_SEC", "2.0")))
+        self.hedge_enabled = os.getenv("CAT_AGENT_HEDGE_ENABLED", "0").strip().lower() in {"1", "true", "yes", "on"}
+        self.hedge_percentile = min(0.999, max(0.5, float(os.getenv("CAT_AGENT_HEDGE_PERCENTILE", "0.9"))))
+        self.hedge_min_samples = max(1, int(os.getenv("CAT_AGENT_HEDGE_MIN_SAMPLES", "20")))
+        self.hedge_min_delay_ms = max(0.0, float(os.getenv("CAT_AGENT_HEDGE_MIN_DELAY_MS", "500")))
 
     @staticmethod
-    def _api_timeout_budget(agent: AgentRegistration, phase: str) -> int:
+    def _api_timeout_budget(agent: AgentRegistration, phase: str, time_left: float = math.inf) -> int:
         if phase in {"day_discuss", "day_vote"}:
-            return max(agent.timeout_sec - 1, 20)
-        if phase.startswith("night_"):
-            return max(agent.timeout_sec - 2, 15)
-        return max(agent.timeout_sec - 2, 15)
+            budget = max(agent.timeout_sec - 1, 20)
+        elif phase.startswith("night_"):
+            budget = max(agent.timeout_sec - 2, 15)
+        else:
+            budget = max(agent.timeout_sec - 2, 15)
+        if time_left < budget + 1:
+            # Leave the child agent a second to report back before the transport gives up.
+            budget = max(1, int(time_left - 1))
+        return budget
 
     @staticmethod
     def _transport_timeout_budget(agent: AgentRegistration, phase: str) -> int:
@@ -153,6 +295,91 @@ class AgentScheduler:
             return max(agent.timeout_sec + 10, 35)
         return max(agent.timeout_sec + 5, 25)
 
+    def _call_deadline(self, deadline_at: Optional[datetime]) -> Optional[float]:
+        """Convert the phase ``deadline_at`` into a monotonic cut-off, keeping a safety margin."""
+        if deadline_at is None:
+            return None
+        remaining = (deadline_at - datetime.utcnow()).total_seconds() - self.deadline_margin_sec
+        return time.monotonic() + remaining
+
+    @staticmethod
+    def _time_left(deadline: Optional[float]) -> float:
+        return math.inf if deadline is None else deadline - time.monotonic()
+
+    def _retry_fits(self, deadline: Optional[float], backoff_sec: float) -> bool:
+        return self._time_left(deadline) - backoff_sec >= self.min_attempt_sec
+
+    def _hedge_phase(self, phase: str) -> bool:
+        return self.hedge_enabled and (phase == "day_vote" or phase.startswith("night_"))
+
+    def _hedge_delay(self, phase: str) -> Optional[float]:
+        """Seconds to wait before hedging, from the phase latency percentile; None until enough samples."""
+        if not self._hedge_phase(phase):
+            return None
+        hist = self.metrics.latency_by_phase.get(phase)
+        if hist is None or hist.count < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay_ms, hist.percentile(self.hedge_percentile)) / 1000
+
+    async def _post_hedged(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        payload: dict,
+        timeout: float,
+        hedge_delay: Optional[float],
+        limiter: AdaptiveConcurrencyLimiter,
+    ) -> Tuple[httpx.Response, Optional[dict], str]:
+        """POST once, and once more if the first reply is slower than ``hedge_delay``.
+
+        Returns ``(response, parsed_body, label)``. A request only wins the race with a
+        response that passes ``_validate_and_parse``; a malformed 200 lets the other request
+        keep running. When nothing valid arrives, an HTTP error response is returned with
+        ``parsed_body`` None, otherwise the last error is raised. The hedge only fires when
+        the provider limiter has a free slot, so it never adds load to an already saturated
+        provider. Requests still running are cancelled on every exit, including when the
+        caller itself is cancelled.
+        """
+        tasks = {asyncio.ensure_future(client.post(url, json=payload, timeout=timeout)): "primary"}
+        hedged = False
+        try:
+            if hedge_delay is not None and hedge_delay < timeout:
+                done, _ = await asyncio.wait(set(tasks), timeout=hedge_delay)
+                if not done and limiter.try_acquire():
+                    hedged = True
+                    self.metrics.hedged_requests += 1
+                    hedge = asyncio.ensure_future(client.post(url, json=payload, timeout=timeout - hedge_delay))
+                    tasks[hedge] = "hedge"
+            pending = dict(tasks)
+            failed: Optional[Tuple[httpx.Response, Optional[dict], str]] = None
+            error: Optional[BaseException] = None
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    label = pending.pop(task)
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    resp = task.result()
+                    if resp.status_code >= 400:
+                        failed = (resp, None, label)
+                        continue
+                    try:
+                        return resp, self._validate_and_parse(resp.json()), label
+                    except ValueError as exc:
+                        error = exc
+            if failed is not None:
+                return failed
+            raise error  # type: ignore[misc]
+        finally:
+            unfinished = [task for task in tasks if not task.done()]
+            for task in unfinished:
+                task.cancel()
+            if unfinished:
+                await asyncio.gather(*unfinished, return_exceptions=True)
+            if hedged:
+                limiter.release()
+
     def _provider_key(self, agent: AgentRegistration) -> str:
         if agent.cli_command:
             return "cli"
@@ -176,21 +403,215 @@ class AgentScheduler:
             return min(self.provider_max_concurrency, self.same_provider_max_concurrency)
         return self.provider_max_concurrency
 
-    def _provider_semaphore(self, agent: AgentRegistration, phase: str) -> asyncio.Semaphore:
-        key = self._provider_key(agent)
-        sem = self._provider_semaphores.get(key)
-        limit = self._provider_limit(agent, phase)
-        if sem is None:
-            sem = asyncio.Semaphore(limit)
-            self._provider_semaphores[key] = sem
-            self._provider_limits[key] = limit
-            return sem
-        old_limit = self._provider_limits.get(key)
-        if old_limit != limit:
-            sem = asyncio.Semaphore(limit)
-            self._provider_semaphores[key] = sem
-            self._provider_limits[key] = limit
-        return sem
+    def _provider_limiter(self, agent: AgentRegistration, phase: str) -> AdaptiveConcurrencyLimiter:
+        """Shared AIMD limiter for the agent's provider.
+
+        The phase-specific env limits only seed the starting limit; afterwards the limiter
+        adapts between 1 and ``CAT_PROVIDER_MAX_CONCURRENCY`` and keeps its state across
+        phases and rooms.
+        """
+        return self.limiters.get(
+            self._provider_key(agent),
+            initial_limit=self._provider_limit(agent, phase),
+            max_limit=self.provider_max_concurrency,
+        )
+
+    def provider_concurrency(self) -> Dict[str, dict]:
+        keys = {self._provider_key(agent) for agent in self.registry.all().values()}
+        snapshot = self.limiters.snapshot()
+        return {key: snapshot[key] for key in sorted(keys) if key in snapshot}
+
+    def _client_for(self, agent: AgentRegistration) -> httpx.AsyncClient:
+        """Return the long-lived keep-alive client for ``agent.ipc_endpoint``.
+
+        Clients are bound to the event loop that created them; a loop change (e.g. a new
+        ``asyncio.run``) closes the stale pool instead of reusing it across loops.
+        """
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(agent.ipc_endpoint)
+        if entry is not None and entry[0] is loop and not entry[1].is_closed:
+            return entry[1]
+        if entry is not None and entry[0] is not loop:
+            stale = [key for key, value in self._clients.items() if value[0] is not loop]
+            for key in stale:
+                self._discard_client(*self._clients.pop(key))
+        limits = httpx.Limits(
+            max_connections=self.provider_max_concurrency,
+            max_keepalive_connections=self.provider_max_concurrency,
+            keepalive_expiry=self.keepalive_expiry_sec,
+        )
+        transport = self._transport or async_transport(agent.ipc_endpoint, limits)
+        client = httpx.AsyncClient(limits=limits, transport=transport)
+        self._clients[agent.ipc_endpoint] = (loop, client)
+        return client
+
+    def _release_client(self, endpoint: str) -> None:
+        entry = self._clients.pop(endpoint.rstrip("/"), None)
+        if entry is not None:
+            self._discard_client(*entry)
+
+    def _discard_client(self, owner: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> None:
+        """Close ``client`` without blocking, on the loop that owns its connections when possible."""
+        if client.is_closed:
+            return
+        try:
+            current: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        if owner is not current and owner.is_running():
+            asyncio.run_coroutine_threadsafe(self._aclose_quietly(client), owner)
+            return
+        if current is None:
+            # Neither loop can drive the close; the sockets are released with the client.
+            return
+        task = current.create_task(self._aclose_quietly(client))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _aclose_quietly(client: httpx.AsyncClient) -> None:
+        try:
+            await client.aclose()
+        except Exception:  # noqa: BLE001
+            pass
+
+    def release_clients(self) -> None:
+        """Close every pooled agent client from synchronous code; see ``aclose``."""
+        self._closed = True
+        self._cancel_probes()
+        clients, self._clients = self._clients, {}
+        for owner, client in clients.values():
+            self._discard_client(owner, client)
+
+    async def aclose(self) -> None:
+        """Close every pooled agent client owned by this scheduler.
+
+        Clients of the running loop are closed before returning; clients of other loops are
+        handed to their own loop.
+        """
+        self._closed = True
+        self._cancel_probes()
+        loop = asyncio.get_running_loop()
+        clients, self._clients = self._clients, {}
+        for owner, client in clients.values():
+            if owner is loop:
+                await self._aclose_quietly(client)
+            else:
+                self._discard_client(owner, client)
+        pending = [task for task in self._closing if task.get_loop() is loop]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def _cancel_probes(self) -> None:
+        """Cancel every breaker probe on the loop that runs it."""
+        probes, self._probe_tasks = self._probe_tasks, {}
+        try:
+            current: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        for task in probes.values():
+            if task.done():
+                continue
+            owner = task.get_loop()
+            if owner is current:
+                task.cancel()
+            elif not owner.is_closed():
+                owner.call_soon_threadsafe(task.cancel)
+
+    def _breaker_admit(self, agent: AgentRegistration) -> bool:
+        """Return whether a call may reach the agent; half-open admits a single trial."""
+        if agent.breaker_state == BREAKER_CLOSED:
+            return True
+        if agent.breaker_state == BREAKER_OPEN:
+            if time.monotonic() < agent.breaker_open_until:
+                return False
+            agent.breaker_state = BREAKER_HALF_OPEN
+        if agent.breaker_trial_in_flight:
+            return False
+        agent.breaker_trial_in_flight = True
+        return True
+
+    def _open_breaker(self, agent: AgentRegistration, reason: str) -> None:
+        if agent.breaker_state == BREAKER_CLOSED:
+            agent.breaker_cooldown_sec = 0.0
+        self._extend_cooldown(agent)
+        agent.breaker_state = BREAKER_OPEN
+        agent.breaker_trial_in_flight = False
+        agent.online = False
+        agent.entrusted = True
+        self._audit_breaker(agent, reason)
+        self._schedule_probe(agent)
+
+    def _close_breaker(self, agent: AgentRegistration) -> None:
+        previous = agent.breaker_state
+        agent.breaker_state = BREAKER_CLOSED
+        agent.breaker_cooldown_sec = 0.0
+        agent.breaker_open_until = 0.0
+        agent.breaker_trial_in_flight = False
+        agent.failed_count = 0
+        agent.online = True
+        agent.entrusted = False
+        if previous != BREAKER_CLOSED:
+            self._audit_breaker(agent, "recovered")
+
+    def _extend_cooldown(self, agent: AgentRegistration) -> None:
+        cooldown = min(self.breaker_max_cooldown_sec, max(self.breaker_cooldown_sec, agent.breaker_cooldown_sec * 2))
+        agent.breaker_cooldown_sec = cooldown
+        agent.breaker_open_until = time.monotonic() + cooldown
+
+    def _audit_breaker(self, agent: AgentRegistration, reason: str) -> None:
+        self.audit_logs.append(
+            {
+                "event": "agent_breaker",
+                "player_id": agent.player_id,
+                "state": agent.breaker_state,
+                "reason": reason,
+                "cooldown_sec": round(agent.breaker_cooldown_sec, 3),
+                "ts": format_ts(now_ns()),
+            }
+        )
+
+    def _schedule_probe(self, agent: AgentRegistration) -> None:
+        if self._closed:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = self._probe_tasks.get(agent.player_id)
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        self._probe_tasks[agent.player_id] = loop.create_task(self._probe_until_recovered(agent))
+
+    def _probe_wanted(self, agent: AgentRegistration) -> bool:
+        return (
+            not self._closed
+            and self.registry.get(agent.player_id) is agent
+            and agent.breaker_state == BREAKER_OPEN
+        )
+
+    async def _probe_until_recovered(self, agent: AgentRegistration) -> None:
+        """Poll ``/health`` while the breaker is open; a healthy reply moves it to half-open."""
+        while self._probe_wanted(agent):
+            await asyncio.sleep(max(0.0, agent.breaker_open_until - time.monotonic()))
+            if not self._probe_wanted(agent):
+                return
+            try:
+                resp = await self._client_for(agent).get(
+                    ipc_url(agent.ipc_endpoint, "/health"),
+                    timeout=self.health_probe_timeout_sec,
+                )
+                healthy = resp.status_code == 200
+            except httpx.HTTPError:
+                healthy = False
+            if not self._probe_wanted(agent):
+                return
+            if healthy:
+                agent.breaker_state = BREAKER_HALF_OPEN
+                agent.breaker_trial_in_flight = False
+                self._audit_breaker(agent, "health_probe_ok")
+                return
+            self._extend_cooldown(agent)
 
     async def trigger_agent_action(
         self,
@@ -202,10 +623,28 @@ class AgentScheduler:
         visible_state: dict,
         prompt_template: str,
         strategy_name: str,
+        deadline_at: Optional[datetime] = None,
     ) -> dict:
+        """Ask the agent for an action, falling back before ``deadline_at`` (UTC) if given.
+
+        Timeouts, retries and backoff are shrunk to the time left in the phase; when not
+        even one minimal attempt fits, the fallback strategy answers immediately.
+        """
         agent = self.registry.get(player_id)
-        if not agent or not agent.online:
-            return self._fallback_action(strategy_name, visible_state, "offline")
+        if not agent:
+            return self._fallback_action(strategy_name, visible_state, "offline", phase=phase)
+        deadline = self._call_deadline(deadline_at)
+        if self._time_left(deadline) < self.min_attempt_sec:
+            return self._fallback_action(strategy_name, visible_state, "deadline_exceeded", phase=phase)
+        if not self._breaker_admit(agent):
+            self.metrics.observe_short_circuit()
+            return self._fallback_action(strategy_name, visible_state, "circuit_open", phase=phase)
+        # A half-open trial gets a single attempt so a still-broken agent fails fast.
+        trial = agent.breaker_state == BREAKER_HALF_OPEN
+        max_timeout_retries = 0 if trial else self.max_timeout_retries
+        max_transient_retries = 0 if trial else self.max_transient_retries
+        # Hedged phases keep the fallback ready so the hard deadline costs no extra work.
+        precomputed = self.fallback.get_action(strategy_name, visible_state) if self._hedge_phase(phase) else None
 
         payload = {
             "session_id": session_id,
@@ -219,7 +658,7 @@ class AgentScheduler:
                 "api_url": agent.api_url,
                 "api_key": agent.api_key,
                 "model_name": agent.model_name or agent.model_type,
-                "api_timeout_sec": self._api_timeout_budget(agent, phase),
+                "api_timeout_sec": self._api_timeout_budget(agent, phase, self._time_left(deadline)),
                 "cli_command": agent.cli_command,
                 "cli_timeout_sec": agent.cli_timeout_sec,
             },
@@ -232,7 +671,7 @@ class AgentScheduler:
                     "player_id": player_id,
                     "phase": phase,
                     "visible_state": visible_state,
-                    "ts": datetime.utcnow().isoformat(),
+                    "ts": format_ts(now_ns()),
                 }
             )
 
@@ -240,25 +679,53 @@ class AgentScheduler:
         try:
             transport_timeout = self._transport_timeout_budget(agent, phase)
             timeout_reason: Optional[str] = None
-            async with self._provider_semaphore(agent, phase):
-                max_attempts = max(self.max_timeout_retries, self.max_transient_retries) + 1
+            limiter = self._provider_limiter(agent, phase)
+            if deadline is None:
+                await limiter.acquire()
+            else:
+                try:
+                    await asyncio.wait_for(limiter.acquire(), timeout=self._time_left(deadline) - self.min_attempt_sec)
+                except asyncio.TimeoutError:
+                    agent.breaker_trial_in_flight = False
+                    return self._fallback_action(strategy_name, visible_state, "deadline_exceeded", precomputed, phase=phase)
+            try:
+                max_attempts = max(max_timeout_retries, max_transient_retries) + 1
                 for attempt in range(max_attempts):
+                    if attempt > 0 and self._time_left(deadline) < self.min_attempt_sec:
+                        timeout_reason = timeout_reason or "deadline_exceeded"
+                        break
                     try:
-                        async with httpx.AsyncClient(timeout=transport_timeout) as client:
-                            resp = await client.post(f"{agent.ipc_endpoint}/act", json=payload)
+                        client = self._client_for(agent)
+                        attempt_start = time.perf_counter()
+                        resp, data, won_by = await self._post_hedged(
+                            client,
+                            ipc_url(agent.ipc_endpoint, "/act"),
+                            payload,
+                            min(transport_timeout, self._time_left(deadline)),
+                            self._hedge_delay(phase),
+                            limiter,
+                        )
 
                         if resp.status_code >= 400:
                             transient = resp.status_code in {429, 500, 502, 503, 504}
-                            if transient and attempt < self.max_transient_retries:
-                                await asyncio.sleep(self.retry_backoff_sec * (2 ** attempt))
+                            if transient:
+                                limiter.on_overload()
+                            backoff = self.retry_backoff_sec * (2 ** attempt)
+                            if transient and attempt < max_transient_retries and self._retry_fits(deadline, backoff):
+                                self.metrics.observe_retry(f"http_{resp.status_code}", backoff)
+                                await asyncio.sleep(backoff)
                                 continue
                             self.metrics.observe_error(f"http_{resp.status_code}")
-                            return self._handle_failure(agent, strategy_name, visible_state, f"http_{resp.status_code}")
+                            return self._handle_failure(
+                                agent, strategy_name, visible_state, f"http_{resp.status_code}", precomputed, phase=phase
+                            )
 
-                        data = self._validate_and_parse(resp.json())
+                        limiter.on_success((time.perf_counter() - attempt_start) * 1000)
                         latency_ms = (time.perf_counter() - start) * 1000
                         self.metrics.observe_success(latency_ms)
-                        agent.failed_count = 0
+                        if won_by == "hedge":
+                            self.metrics.hedge_wins += 1
+                        self._close_breaker(agent)
                         agent.last_heartbeat = datetime.utcnow()
                         agent.last_error = None
 
@@ -269,46 +736,81 @@ class AgentScheduler:
                                 "phase": phase,
                                 "model_type": agent.model_type,
                                 "latency_ms": round(latency_ms, 2),
+                                "won_by": won_by,
                                 "request": self._desensitize_payload(payload),
                                 "response": self._desensitize_payload(data),
-                                "ts": datetime.utcnow().isoformat(),
+                                "ts": format_ts(now_ns()),
                             }
                         )
                         return data
                     except httpx.TimeoutException:
+                        limiter.on_overload()
                         timeout_reason = f"timeout(retry={attempt})"
-                        if attempt < self.max_timeout_retries:
-                            await asyncio.sleep(self.retry_backoff_sec * (2 ** attempt))
+                        backoff = self.retry_backoff_sec * (2 ** attempt)
+                        if attempt < max_timeout_retries and self._retry_fits(deadline, backoff):
+                            self.metrics.observe_retry("timeout", backoff)
+                            await asyncio.sleep(backoff)
                             continue
                         break
+            finally:
+                limiter.release()
 
             self.metrics.observe_timeout()
-            return self._handle_failure(agent, strategy_name, visible_state, timeout_reason or "timeout")
+            return self._handle_failure(agent, strategy_name, visible_state, timeout_reason or "timeout", precomputed, phase=phase)
         except httpx.TimeoutException:
             self.metrics.observe_timeout()
-            return self._handle_failure(agent, strategy_name, visible_state, "timeout")
+            return self._handle_failure(agent, strategy_name, visible_state, "timeout", precomputed, phase=phase)
+        except asyncio.CancelledError:
+            agent.breaker_trial_in_flight = False
+            raise
         except Exception as exc:  # noqa: BLE001
             self.metrics.observe_error(type(exc).__name__)
-            return self._handle_failure(agent, strategy_name, visible_state, type(exc).__name__)
+            return self._handle_failure(agent, strategy_name, visible_state, type(exc).__name__, precomputed, phase=phase)
+        finally:
+            self.metrics.observe_latency(
+                (time.perf_counter() - start) * 1000,
+                phase=phase,
+                provider=self._provider_key(agent),
+                player_id=player_id,
+            )
 
-    def _handle_failure(self, agent: AgentRegistration, strategy_name: str, context: dict, reason: str) -> dict:
+    def _handle_failure(
+        self,
+        agent: AgentRegistration,
+        strategy_name: str,
+        context: dict,
+        reason: str,
+        precomputed: Optional[dict] = None,
+        *,
+        phase: str = "",
+    ) -> dict:
         agent.failed_count += 1
         agent.last_error = reason
-        if agent.failed_count >= 4:
-            agent.online = False
-            agent.entrusted = True
-        return self._fallback_action(strategy_name, context, reason)
+        if agent.breaker_state == BREAKER_HALF_OPEN or agent.failed_count >= self.breaker_failure_threshold:
+            self._open_breaker(agent, reason)
+        return self._fallback_action(strategy_name, context, reason, precomputed, phase=phase)
 
-    def _fallback_action(self, strategy_name: str, context: dict, reason: str) -> dict:
-        action = self.fallback.get_action(strategy_name, context)
+    def _fallback_action(
+        self,
+        strategy_name: str,
+        context: dict,
+        reason: str,
+        precomputed: Optional[dict] = None,
+        *,
+        phase: str = "",
+    ) -> dict:
+        action = precomputed if precomputed is not None else self.fallback.get_action(strategy_name, context)
         action["fallback_reason"] = reason
         self.audit_logs.append(
             {
                 "event": "fallback_action",
+                "player_id": context.get("player_id"),
+                "phase": phase or context.get("phase"),
                 "strategy": strategy_name,
                 "reason": reason,
+                "won_by": "fallback",
                 "response": self._desensitize_payload(action),
-                "ts": datetime.utcnow().isoformat(),
+                "ts": format_ts(now_ns()),
             }
         )
         return action
@@ -25,6 +25,7 @@ import httpx
 from app.agent.agent_scheduler import AgentScheduler
 from app.agent.fallback_strategies import FallbackStrategies
 from app.agent.perspective_engine import PerspectiveEngine
+from app.core.audit_event import as_dict
 from app.core.models import Phase, Role
 from app.engine.game_engine import GameEngine
 
@@ -556,7 +557,7 @@ class AIGodOrchestrator:
             for pid, cause in ctx.deaths_this_round.items()
         }
 
-        recent_audit = snapshot.action_audit_log[-30:] if snapshot.action_audit_log else []
+        recent_audit = [as_dict(row) for row in snapshot.action_audit_log[-30:]]
 
         return {
             "room_id": snapshot.room_id,
@@ -692,6 +693,7 @@ class AIGodOrchestrator:
                     visible_state=visible,
                     prompt_template=self.templates.night_wolf_discuss,
                     strategy_name="night_wolf",
+                    deadline_at=engine.snapshot.round_context.deadline_at,
                 )
                 target = self._normalize_target(engine, result.get("action", {}).get("target"), exclude_wolves=True)
                 if not target:
@@ -828,6 +830,7 @@ class AIGodOrchestrator:
             visible_state=visible,
             prompt_template=self.templates.night_guard,
             strategy_name="night_guard",
+            deadline_at=engine.snapshot.round_context.deadline_at,
         )
         target = self._normalize_target(engine, result.get("action", {}).get("target"), allow_self=True)
         if not target:
@@ -884,6 +887,7 @@ class AIGodOrchestrator:
             visible_state=visible,
             prompt_template=self.templates.night_witch,
             strategy_name="night_witch",
+            deadline_at=engine.snapshot.round_context.deadline_at,
         )
         action = result.get("action", {})
         target = self._normalize_target(engine, action.get("target"), allow_self=False)
@@ -919,6 +923,7 @@ class AIGodOrchestrator:
             visible_state=visible,
             prompt_template=self.templates.night_seer,
             strategy_name="night_seer",
+            deadline_at=engine.snapshot.round_context.deadline_at,
         )
         target = self._normalize_target(engine, result.get("action", {}).get("target"), allow_self=False)
         if not target:
@@ -980,6 +985,7 @@ class AIGodOrchestrator:
                 visible_state=visible,
                 prompt_template=self.templates.day_discuss,
                 strategy_name="day_discuss",
+                deadline_at=engine.snapshot.round_context.deadline_at,
             )
             speech_text, thinking_text = self._split_day_discuss_texts(
                 result,
@@ -1023,6 +1029,7 @@ class AIGodOrchestrator:
                     visible_state=visible,
                     prompt_template=self.templates.day_vote,
                     strategy_name="day_vote",
+                    deadline_at=engine.snapshot.round_context.deadline_at,
                 )
                 target = self._normalize_target(engine, result.get("action", {}).get("target"), allow_self=False)
                 try:
@@ -1072,6 +1079,7 @@ class AIGodOrchestrator:
             visible_state=visible,
             prompt_template=self.templates.hunter_shot,
             strategy_name="hunter_shot",
+            deadline_at=engine.fresh_action_deadline(),
         )
         target = self._normalize_target(engine, result.get("action", {}).get("target"), allow_self=False)
         hunter_content = self._hunter_speech_text(engine, result, target)
@@ -1531,6 +1539,7 @@ class AIGodOrchestrator:
             return None
 
         players = list(engine.snapshot.players.values())
+        index = engine.players_index
 
         def _compact(text: str) -> str:
             cleaned = re.sub(r"[\s\[\]【】()（）{}<>《》'\"“”‘’`~!！?？,，.。:：;；、\\/\\|·_-]+", "", text or "")
@@ -1543,22 +1552,13 @@ class AIGodOrchestrator:
             if probe in engine.snapshot.players:
                 return probe
 
-            exact = [
-                p.player_id
-                for p in players
-                if (p.nickname or "").strip() == probe
-            ]
+            exact = index.ids_by_nickname(probe)
             if len(exact) == 1:
                 return exact[0]
             if len(exact) > 1:
                 return None
 
-            lowered = probe.lower()
-            fuzzy = [
-                p.player_id
-                for p in players
-                if (p.nickname or "").strip().lower() == lowered
-            ]
+            fuzzy = index.ids_by_nickname(probe, case_insensitive=True)
             if len(fuzzy) == 1:
                 return fuzzy[0]
             if len(fuzzy) > 1:
@@ -1618,10 +1618,9 @@ class AIGodOrchestrator:
         if not resolved_id:
             return None
 
-        player = engine.snapshot.players.get(resolved_id)
-        if not player or not player.alive:
+        if resolved_id not in index.alive:
             return None
-        if exclude_wolves and player.role == Role.WEREWOLF:
+        if exclude_wolves and resolved_id in index.alive_by_role.get(Role.WEREWOLF, ()):
             return None
         return resolved_id
 
@@ -1634,22 +1633,12 @@ class AIGodOrchestrator:
         exclude_wolves: bool,
         exclude_player_id: Optional[str] = None,
     ) -> Optional[str]:
-        candidates = [
-            p.player_id
-            for p in engine.snapshot.players.values()
-            if p.alive
-            and (allow_self or p.player_id != actor_id)
-            and (not exclude_wolves or p.role != Role.WEREWOLF)
-            and (not exclude_player_id or p.player_id != exclude_player_id)
-        ]
+        index = engine.players_index
+        pool = index.alive_ids_excluding_role(Role.WEREWOLF) if exclude_wolves else index.alive_ids()
+        pool = [pid for pid in pool if allow_self or pid != actor_id]
+        candidates = [pid for pid in pool if not exclude_player_id or pid != exclude_player_id]
         if not candidates and exclude_player_id:
-            candidates = [
-                p.player_id
-                for p in engine.snapshot.players.values()
-                if p.alive
-                and (allow_self or p.player_id != actor_id)
-                and (not exclude_wolves or p.role != Role.WEREWOLF)
-            ]
+            candidates = pool
         if not candidates:
             return None
         return secrets.choice(candidates)
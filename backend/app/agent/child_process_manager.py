@@ -1,16 +1,39 @@
 from __future__ import annotations
 
+import logging
+import os
+import selectors
+import shutil
 import subprocess
 import sys
+import tempfile
 import time
 import socket
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
-from threading import RLock
-from typing import Dict, List
+from threading import Event, RLock, Thread
+from typing import Callable, Deque, Dict, List, Optional, Tuple
 
-import httpx
+from app.agent.ipc_transport import (
+    AGENT_TRANSPORTS,
+    TRANSPORT_TCP,
+    TRANSPORT_UDS,
+    ipc_url,
+    sync_client,
+    uds_endpoint,
+    uds_path,
+    uds_supported,
+)
+
+logger = logging.getLogger(__name__)
+
+AGENT_MODE_PROCESS = "process-per-player"
+AGENT_MODE_MULTIPLEXED = "multiplexed"
+AGENT_MODES = (AGENT_MODE_PROCESS, AGENT_MODE_MULTIPLEXED)
+# Must match cat_agent_template.serve.READY_FD_ENV; the backend does not import the agent package.
+READY_FD_ENV = "CAT_AGENT_READY_FD"
 
 
 @dataclass(slots=True)
@@ -20,12 +43,242 @@ class ChildAgentProcess:
     host: str
     port: int
     process: subprocess.Popen
+    pooled: bool = False
+    uses: int = 0
+    # Route prefix on a shared multiplexed host; empty for a dedicated process.
+    path: str = ""
+    socket_path: str = ""
+
+    @property
+    def base_endpoint(self) -> str:
+        if self.socket_path:
+            return uds_endpoint(self.socket_path)
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def endpoint(self) -> str:
+        return self.base_endpoint + self.path
+
+    @property
+    def mode(self) -> str:
+        return AGENT_MODE_MULTIPLEXED if self.path else AGENT_MODE_PROCESS
+
+
+@dataclass(slots=True)
+class MultiplexedAgentHost:
+    host: str
+    port: int
+    process: subprocess.Popen
+    workers: int = 1
+    socket_path: str = ""
+
+    @property
+    def endpoint(self) -> str:
+        if self.socket_path:
+            return uds_endpoint(self.socket_path)
+        return f"http://{self.host}:{self.port}"
+
+
+@dataclass(slots=True)
+class WarmAgentProcess:
+    host: str
+    port: int
+    process: subprocess.Popen
+    uses: int = 0
 
     @property
     def endpoint(self) -> str:
         return f"http://{self.host}:{self.port}"
 
 
+class WarmAgentPool:
+    """Idle, already-healthy cat-agent processes that rooms lease at bootstrap.
+
+    A background thread keeps ``size`` idle processes ready. Returned processes go back
+    to the idle queue until they have served ``max_uses`` rooms, then they are recycled
+    (stopped) and the refill thread replaces them. ``size=0`` disables the pool.
+    """
+
+    def __init__(
+        self,
+        spawn: Callable[[str, int], subprocess.Popen],
+        stop: Callable[[subprocess.Popen], None],
+        wait_health: Callable[[str, float], None],
+        next_port: Callable[[str, int, set[int]], int],
+        size: Optional[int] = None,
+        max_uses: Optional[int] = None,
+        host: Optional[str] = None,
+        start_port: Optional[int] = None,
+        startup_timeout_sec: float = 12.0,
+    ) -> None:
+        self.size = max(0, size if size is not None else int(os.getenv("CAT_AGENT_WARM_POOL_SIZE", "0")))
+        self.max_uses = max(1, max_uses if max_uses is not None else int(os.getenv("CAT_AGENT_WARM_POOL_MAX_USES", "20")))
+        self.host = host or os.getenv("CAT_AGENT_WARM_POOL_HOST", "127.0.0.1")
+        self.start_port = start_port or max(1, int(os.getenv("CAT_AGENT_WARM_POOL_START_PORT", "9601")))
+        self.startup_timeout_sec = startup_timeout_sec
+        self._spawn = spawn
+        self._stop = stop
+        self._wait_health = wait_health
+        self._next_port = next_port
+        self._lock = RLock()
+        self._idle: Deque[WarmAgentProcess] = deque()
+        self._ports: set[int] = set()
+        self._spawning = 0
+        self._wake = Event()
+        self._closed = False
+        self._thread: Optional[Thread] = None
+        self.leases = 0
+        self.misses = 0
+        self.returned = 0
+        self.recycled = 0
+        self.spawn_failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def reserved_ports(self) -> set[int]:
+        with self._lock:
+            return set(self._ports)
+
+    def start(self) -> None:
+        """Start the refill thread (idempotent); it fills the pool in the background."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._closed or (self._thread is not None and self._thread.is_alive()):
+                self._wake.set()
+                return
+            self._thread = Thread(target=self._refill_loop, name="cat-agent-warm-pool", daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def lease(self, host: str) -> Optional[WarmAgentProcess]:
+        """Pop a live idle process bound to ``host``; ``None`` counts as a miss."""
+        if not self.enabled:
+            return None
+        dead: List[WarmAgentProcess] = []
+        leased: Optional[WarmAgentProcess] = None
+        with self._lock:
+            if host == self.host:
+                while self._idle:
+                    item = self._idle.popleft()
+                    if item.process.poll() is None:
+                        item.uses += 1
+                        leased = item
+                        break
+                    dead.append(item)
+            for item in dead:
+                self._ports.discard(item.port)
+            if leased is None:
+                self.misses += 1
+            else:
+                self.leases += 1
+        self.start()
+        return leased
+
+    def give_back(self, item: WarmAgentProcess) -> bool:
+        """Return a leased process; ``False`` means it was recycled instead."""
+        with self._lock:
+            keep = (
+                not self._closed
+                and item.process.poll() is None
+                and item.uses < self.max_uses
+                and len(self._idle) < self.size
+            )
+            if keep:
+                self._idle.append(item)
+                self.returned += 1
+            else:
+                self._ports.discard(item.port)
+                self.recycled += 1
+        if not keep:
+            self._stop(item.process)
+            self._wake.set()
+        return keep
+
+    def _refill_loop(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                if self._closed:
+                    return
+                missing = self.size - len(self._idle) - self._spawning
+                if missing <= 0:
+                    continue
+                self._spawning += missing
+            try:
+                self._fill(missing)
+            finally:
+                with self._lock:
+                    self._spawning -= missing
+
+    def _fill(self, count: int) -> None:
+        created: List[WarmAgentProcess] = []
+        for _ in range(count):
+            port: Optional[int] = None
+            try:
+                with self._lock:
+                    port = self._next_port(self.host, self.start_port, self._ports)
+                    self._ports.add(port)
+                created.append(WarmAgentProcess(host=self.host, port=port, process=self._spawn(self.host, port)))
+            except Exception as exc:  # noqa: BLE001
+                with self._lock:
+                    if port is not None:
+                        self._ports.discard(port)
+                    self.spawn_failures += 1
+                logger.warning("[WarmAgentPool] spawn failed: %s", exc)
+
+        def _ready(item: WarmAgentProcess) -> Optional[WarmAgentProcess]:
+            try:
+                self._wait_health(item.endpoint, self.startup_timeout_sec)
+                return item
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("[WarmAgentPool] child not healthy on port %s: %s", item.port, exc)
+                return None
+
+        with ThreadPoolExecutor(max_workers=max(1, len(created))) as executor:
+            results = list(executor.map(_ready, created))
+        for item, ready in zip(created, results):
+            with self._lock:
+                accept = ready is not None and not self._closed and len(self._idle) < self.size
+                if accept:
+                    self._idle.append(item)
+                else:
+                    self._ports.discard(item.port)
+                    if ready is None:
+                        self.spawn_failures += 1
+            if not accept:
+                self._stop(item.process)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            for item in idle:
+                self._ports.discard(item.port)
+        self._wake.set()
+        for item in idle:
+            self._stop(item.process)
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "size": self.size,
+                "idle": len(self._idle),
+                "spawning": self._spawning,
+                "leases": self.leases,
+                "misses": self.misses,
+                "returned": self.returned,
+                "recycled": self.recycled,
+                "spawn_failures": self.spawn_failures,
+                "max_uses": self.max_uses,
+            }
+
+
 class ChildAgentProcessManager:
     """Manage child cat-agent processes under god-agent parent process."""
 
@@ -33,6 +286,204 @@ class ChildAgentProcessManager:
         self._lock = RLock()
         self._by_room: Dict[str, List[ChildAgentProcess]] = {}
         self._backend_dir = Path(__file__).resolve().parents[2]
+        self.warm_pool = WarmAgentPool(
+            spawn=self._spawn_child,
+            stop=self._stop_process,
+            wait_health=self._wait_health,
+            next_port=self._next_available_port,
+        )
+        self._mux_lock = RLock()
+        self._mux_hosts: Dict[str, MultiplexedAgentHost] = {}
+        self.mux_start_port = max(1, int(os.getenv("CAT_AGENT_MUX_START_PORT", "9501")))
+        self.mux_workers = max(1, int(os.getenv("CAT_AGENT_MUX_WORKERS", "1")))
+        self.runtime_dir = Path(os.getenv("CAT_AGENT_RUNTIME_DIR") or Path(tempfile.gettempdir()) / "catchat-agents")
+        # Children announce readiness on an inherited pipe; needs fd inheritance (POSIX).
+        self.ready_signal = os.name == "posix" and str(
+            os.getenv("CAT_AGENT_READY_SIGNAL", "1")
+        ).strip().lower() in {"1", "true", "yes", "on"}
+        self._ready_endpoints: set[str] = set()
+
+    def assert_managed_socket(self, endpoint: str) -> None:
+        """Reject a UDS endpoint whose socket is not under ``runtime_dir``; TCP passes through.
+
+        Endpoints arriving through the API could otherwise point the server at any socket
+        on the host (a database, the Docker daemon).
+        """
+        socket_path = uds_path(endpoint)
+        if socket_path is None:
+            return
+        if not Path(socket_path).resolve().is_relative_to(self.runtime_dir.resolve()):
+            raise ValueError("uds agent endpoint must be a socket under the agent runtime dir")
+
+    def _room_runtime_dir(self, room_id: str) -> Path:
+        path = self.runtime_dir / room_id
+        path.mkdir(mode=0o700, parents=True, exist_ok=True)
+        return path
+
+    @staticmethod
+    def _fresh_socket_path(path: Path) -> str:
+        path.unlink(missing_ok=True)
+        return str(path)
+
+    def _spawn_child(
+        self,
+        host: str,
+        port: int,
+        app: str = "cat_agent_template.main:app",
+        workers: int = 1,
+        uds: Optional[str] = None,
+        ready_fd: Optional[int] = None,
+    ) -> subprocess.Popen:
+        if ready_fd is not None:
+            cmd = [sys.executable, "-m", "cat_agent_template.serve", app]
+            cmd += ["--uds", uds] if uds else ["--host", host, "--port", str(port)]
+            env = {**os.environ, READY_FD_ENV: str(ready_fd)}
+            return subprocess.Popen(cmd, cwd=str(self._backend_dir), env=env, pass_fds=(ready_fd,))
+        cmd = [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            app,
+            "--app-dir",
+            str(self._backend_dir),
+        ]
+        cmd += ["--uds", uds] if uds else ["--host", host, "--port", str(port)]
+        if workers > 1:
+            cmd += ["--workers", str(workers)]
+        return subprocess.Popen(cmd, cwd=str(self._backend_dir))
+
+    def _spawn_signalling(
+        self,
+        host: str,
+        port: int,
+        app: str = "cat_agent_template.main:app",
+        workers: int = 1,
+        uds: Optional[str] = None,
+    ) -> Tuple[subprocess.Popen, Optional[int]]:
+        """Spawn a child plus the read end of its readiness pipe (``None`` when unsupported)."""
+        if not self.ready_signal or workers > 1:
+            return self._spawn_child(host, port, app=app, workers=workers, uds=uds), None
+        read_fd, write_fd = os.pipe()
+        try:
+            process = self._spawn_child(host, port, app=app, workers=workers, uds=uds, ready_fd=write_fd)
+        except Exception:
+            os.close(read_fd)
+            raise
+        finally:
+            os.close(write_fd)
+        return process, read_fd
+
+    def _await_ready(self, pending: List[Tuple[str, Optional[int]]], timeout_sec: float) -> None:
+        """Wait for every ``(endpoint, ready_fd)`` to come up.
+
+        Ready lines are awaited together on one selector. A child whose pipe closes without
+        a ready line, or that has no pipe, falls back to ``/health`` polling for the time
+        left, so a failed start still surfaces the usual health error.
+        """
+        deadline = time.monotonic() + timeout_sec
+        by_fd = {fd: endpoint for endpoint, fd in pending if fd is not None}
+        polled = [endpoint for endpoint, fd in pending if fd is None]
+        ready: List[str] = []
+        selector = selectors.DefaultSelector()
+        try:
+            for fd in by_fd:
+                selector.register(fd, selectors.EVENT_READ)
+            while by_fd:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                for key, _ in selector.select(left):
+                    line = os.read(key.fd, 64)
+                    endpoint = by_fd.pop(key.fd)
+                    selector.unregister(key.fd)
+                    (ready if line.startswith(b"ready") else polled).append(endpoint)
+            polled.extend(by_fd.values())
+        finally:
+            selector.close()
+            for _, fd in pending:
+                if fd is not None:
+                    os.close(fd)
+        if polled:
+            left = max(0.5, deadline - time.monotonic())
+            with ThreadPoolExecutor(max_workers=len(polled)) as executor:
+                futures = [executor.submit(self._wait_health, endpoint, left) for endpoint in polled]
+                for future in as_completed(futures):
+                    future.result()
+        with self._lock:
+            self._ready_endpoints.update(ready)
+            self._ready_endpoints.update(polled)
+
+    def is_ready(self, endpoint: str) -> bool:
+        """True for an endpoint this manager started and saw come up, while it still runs."""
+        endpoint = (endpoint or "").strip().rstrip("/")
+        with self._lock:
+            if endpoint not in self._ready_endpoints:
+                return False
+            return any(
+                item.endpoint == endpoint and item.process.poll() is None
+                for items in self._by_room.values()
+                for item in items
+            )
+
+    def _ensure_multiplexed_host(
+        self, host: str, startup_timeout_sec: float, transport: str = TRANSPORT_TCP
+    ) -> MultiplexedAgentHost:
+        """Return the shared agent host for ``host`` (or the UDS host), starting it if needed."""
+        key = TRANSPORT_UDS if transport == TRANSPORT_UDS else host
+        with self._mux_lock:
+            current = self._mux_hosts.get(key)
+            if current is not None and current.process.poll() is None:
+                return current
+            socket_path = ""
+            port = 0
+            if transport == TRANSPORT_UDS:
+                self.runtime_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+                socket_path = self._fresh_socket_path(self.runtime_dir / "multiplexed.sock")
+            else:
+                port = self._next_available_port(host, self.mux_start_port, self.warm_pool.reserved_ports())
+            process, ready_fd = self._spawn_signalling(
+                host,
+                port,
+                app="cat_agent_template.multiplexed:app",
+                workers=self.mux_workers,
+                uds=socket_path or None,
+            )
+            mux = MultiplexedAgentHost(
+                host=host, port=port, process=process, workers=self.mux_workers, socket_path=socket_path
+            )
+            try:
+                self._await_ready([(mux.endpoint, ready_fd)], startup_timeout_sec)
+            except Exception:
+                self._stop_process(process)
+                raise
+            self._mux_hosts[key] = mux
+            return mux
+
+    def _bootstrap_multiplexed(
+        self,
+        room_id: str,
+        player_ids: List[str],
+        host: str,
+        startup_timeout_sec: float,
+        transport: str = TRANSPORT_TCP,
+    ) -> Dict[str, str]:
+        mux = self._ensure_multiplexed_host(host, startup_timeout_sec, transport)
+        items = [
+            ChildAgentProcess(
+                room_id=room_id,
+                player_id=player_id,
+                host=mux.host,
+                port=mux.port,
+                process=mux.process,
+                path=f"/agents/{room_id}/{player_id}",
+                socket_path=mux.socket_path,
+            )
+            for player_id in player_ids
+        ]
+        with self._lock:
+            self._by_room[room_id] = items
+            self._ready_endpoints.update(item.endpoint for item in items)
+        return {item.player_id: item.endpoint for item in items}
 
     def bootstrap_room(
         self,
@@ -42,53 +493,88 @@ class ChildAgentProcessManager:
         host: str = "127.0.0.1",
         start_port: int = 9101,
         startup_timeout_sec: float = 12.0,
+        mode: str = AGENT_MODE_PROCESS,
+        transport: str = TRANSPORT_TCP,
     ) -> Dict[str, str]:
+        if mode not in AGENT_MODES:
+            raise ValueError(f"unknown agent mode: {mode} (expected one of {', '.join(AGENT_MODES)})")
+        if transport not in AGENT_TRANSPORTS:
+            raise ValueError(f"unknown agent transport: {transport} (expected one of {', '.join(AGENT_TRANSPORTS)})")
+        if transport == TRANSPORT_UDS and not uds_supported():
+            raise ValueError("unix domain sockets are not supported on this platform")
         self.stop_room(room_id)
+        if mode == AGENT_MODE_MULTIPLEXED:
+            return self._bootstrap_multiplexed(room_id, player_ids, host, startup_timeout_sec, transport)
         created: List[ChildAgentProcess] = []
-        reserved_ports: set[int] = set()
+        leased: List[ChildAgentProcess] = []
+        reserved_ports: set[int] = self.warm_pool.reserved_ports()
+        room_dir = self._room_runtime_dir(room_id) if transport == TRANSPORT_UDS else None
+        ready_fds: Dict[str, Optional[int]] = {}
         try:
             for idx, player_id in enumerate(player_ids):
+                if room_dir is not None:
+                    socket_path = self._fresh_socket_path(room_dir / f"{player_id}.sock")
+                    process, ready_fd = self._spawn_signalling("", 0, uds=socket_path)
+                    ready_fds[player_id] = ready_fd
+                    created.append(
+                        ChildAgentProcess(
+                            room_id=room_id,
+                            player_id=player_id,
+                            host="",
+                            port=0,
+                            process=process,
+                            socket_path=socket_path,
+                        )
+                    )
+                    continue
+                warm = self.warm_pool.lease(host)
+                if warm is not None:
+                    leased.append(
+                        ChildAgentProcess(
+                            room_id=room_id,
+                            player_id=player_id,
+                            host=warm.host,
+                            port=warm.port,
+                            process=warm.process,
+                            pooled=True,
+                            uses=warm.uses,
+                        )
+                    )
+                    continue
                 preferred_port = start_port + idx
                 port = self._next_available_port(host, preferred_port, reserved_ports)
                 reserved_ports.add(port)
-                cmd = [
-                    sys.executable,
-                    "-m",
-                    "uvicorn",
-                    "cat_agent_template.main:app",
-                    "--app-dir",
-                    str(self._backend_dir),
-                    "--host",
-                    host,
-                    "--port",
-                    str(port),
-                ]
-                proc = subprocess.Popen(cmd, cwd=str(self._backend_dir))
+                process, ready_fd = self._spawn_signalling(host, port)
+                ready_fds[player_id] = ready_fd
                 child = ChildAgentProcess(
                     room_id=room_id,
                     player_id=player_id,
                     host=host,
                     port=port,
-                    process=proc,
+                    process=process,
                 )
                 created.append(child)
 
-            max_workers = max(1, len(created))
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_map = {
-                    executor.submit(self._wait_health, child.endpoint, startup_timeout_sec): child
-                    for child in created
-                }
-                for future in as_completed(future_map):
-                    future.result()
+            # Leased processes were health-checked by the pool; only fresh spawns are waited on.
+            pending = [(child.endpoint, ready_fds.pop(child.player_id)) for child in created]
+            self._await_ready(pending, startup_timeout_sec)
 
+            ordered = sorted(leased + created, key=lambda item: player_ids.index(item.player_id))
             with self._lock:
-                self._by_room[room_id] = created
+                self._by_room[room_id] = ordered
+                self._ready_endpoints.update(item.endpoint for item in leased)
 
-            return {item.player_id: item.endpoint for item in created}
+            return {item.player_id: item.endpoint for item in ordered}
         except Exception:
+            for fd in ready_fds.values():
+                if fd is not None:
+                    os.close(fd)
             for item in created:
                 self._stop_process(item.process)
+            for item in leased:
+                self._release(item)
+            if room_dir is not None:
+                shutil.rmtree(room_dir, ignore_errors=True)
             raise
 
     @staticmethod
@@ -118,17 +604,56 @@ class ChildAgentProcessManager:
                 port = 1024
         raise ValueError(f"no available port found from {start_port} within scan window={max_scan}")
 
+    def _release(self, item: ChildAgentProcess) -> None:
+        if item.path:
+            return  # the shared host outlives its rooms
+        if item.pooled:
+            self.warm_pool.give_back(
+                WarmAgentProcess(host=item.host, port=item.port, process=item.process, uses=item.uses)
+            )
+            return
+        self._stop_process(item.process)
+
     def stop_room(self, room_id: str) -> None:
         with self._lock:
             items = self._by_room.pop(room_id, [])
+            self._ready_endpoints.difference_update(item.endpoint for item in items)
         for item in items:
-            self._stop_process(item.process)
+            self._release(item)
+        if any(item.socket_path and not item.path for item in items):
+            shutil.rmtree(self.runtime_dir / room_id, ignore_errors=True)
+        shared = next((item for item in items if item.path), None)
+        if shared is not None and shared.process.poll() is None:
+            # Best effort and off the caller's thread, which may be an event loop; workers
+            # the DELETE misses drop the room's logical agents once they go idle.
+            Thread(
+                target=self._drop_multiplexed_room,
+                args=(shared.base_endpoint, room_id),
+                name="cat-agent-mux-cleanup",
+                daemon=True,
+            ).start()
+
+    @staticmethod
+    def _drop_multiplexed_room(base_endpoint: str, room_id: str) -> None:
+        try:
+            with sync_client(base_endpoint, timeout=1.5) as client:
+                client.delete(ipc_url(base_endpoint, f"/agents/{room_id}"))
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("multiplexed host room cleanup failed room_id=%s: %s", room_id, exc)
 
     def stop_all(self) -> None:
         with self._lock:
             all_rooms = list(self._by_room.keys())
+        self.warm_pool.close()
         for room_id in all_rooms:
             self.stop_room(room_id)
+        with self._mux_lock:
+            hosts = list(self._mux_hosts.values())
+            self._mux_hosts.clear()
+        for mux in hosts:
+            self._stop_process(mux.process)
+            if mux.socket_path:
+                Path(mux.socket_path).unlink(missing_ok=True)
 
     def status(self, room_id: str) -> Dict[str, dict]:
         with self._lock:
@@ -139,17 +664,43 @@ class ChildAgentProcessManager:
                 "endpoint": item.endpoint,
                 "running": item.process.poll() is None,
                 "pid": item.process.pid,
+                "pooled": item.pooled,
+                "mode": item.mode,
+                "transport": TRANSPORT_UDS if item.socket_path else TRANSPORT_TCP,
             }
         return result
 
+    def pool_status(self) -> dict:
+        return self.warm_pool.status()
+
+    def multiplexed_status(self) -> List[dict]:
+        with self._mux_lock:
+            hosts = list(self._mux_hosts.values())
+        with self._lock:
+            rooms_by_host: Dict[str, int] = {}
+            for items in self._by_room.values():
+                if items and items[0].path:
+                    base = items[0].base_endpoint
+                    rooms_by_host[base] = rooms_by_host.get(base, 0) + 1
+        return [
+            {
+                "endpoint": mux.endpoint,
+                "pid": mux.process.pid,
+                "running": mux.process.poll() is None,
+                "workers": mux.workers,
+                "rooms": rooms_by_host.get(mux.endpoint, 0),
+            }
+            for mux in hosts
+        ]
+
     @staticmethod
     def _wait_health(endpoint: str, timeout_sec: float) -> None:
-        url = endpoint.rstrip("/") + "/health"
+        url = ipc_url(endpoint, "/health")
         deadline = time.time() + timeout_sec
         last_error = "unknown"
         while time.time() < deadline:
             try:
-                with httpx.Client(timeout=1.5) as client:
+                with sync_client(endpoint, timeout=1.5) as client:
                     resp = client.get(url)
                 if resp.status_code < 400:
                     return
@@ -3,7 +3,7 @@ from __future__ import annotations
 import json
 import random
 from pathlib import Path
-from typing import Callable, Dict
+from typing import Callable, Dict, Optional
 
 from app.core.models import Role
 
@@ -14,7 +14,7 @@ class FallbackStrategies:
     Supports dynamic loading from JSON file and built-in defaults.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, rng: Optional[random.Random] = None) -> None:
         self._strategies: Dict[str, Callable[[dict], dict]] = {
             "default": self._default_action,
             "night_wolf": self._night_wolf_action,
@@ -26,7 +26,7 @@ class FallbackStrategies:
             "hunter_shot": self._hunter_shot_action,
         }
         self._templates: Dict[str, dict] = {}
-        self._rng = random.SystemRandom()
+        self._rng = rng or random.SystemRandom()
 
     def _pick_random(self, candidates: list):
         if not candidates:
@@ -168,7 +168,9 @@ class FallbackStrategies:
     def _night_seer_action(self, context: dict) -> dict:
         alive = context.get("alive_player_ids") or context.get("alive_players", [])
         me = context.get("player_id")
-        candidates = [pid for pid in alive if pid != me]
+        last_seer_target = context.get("last_seer_target_id") or context.get("last_seer_target")
+        others = [pid for pid in alive if pid != me]
+        candidates = [pid for pid in others if pid != last_seer_target] or others
         target = self._pick_random(candidates)
         if target:
             reasoning = f"第一夜信息有限，我查验了 {target} 以获取身份线索。"
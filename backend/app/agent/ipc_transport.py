@@ -0,0 +1,68 @@
+"""Agent endpoint helpers for TCP and Unix-domain-socket IPC.
+
+A UDS endpoint is written ``http+unix://<percent-encoded socket path>[/route/prefix]``;
+plain ``http://host:port[/prefix]`` endpoints pass through unchanged.
+"""
+
+from __future__ import annotations
+
+import socket
+from typing import Any, Optional, Tuple
+from urllib.parse import quote, unquote
+
+import httpx
+
+UDS_SCHEME = "http+unix"
+TRANSPORT_TCP = "tcp"
+TRANSPORT_UDS = "uds"
+AGENT_TRANSPORTS = (TRANSPORT_TCP, TRANSPORT_UDS)
+
+_UDS_PREFIX = UDS_SCHEME + "://"
+# httpx still needs an absolute URL; the host part is ignored once a UDS transport is set.
+_UDS_BASE_URL = "http://localhost"
+
+
+def uds_supported() -> bool:
+    return hasattr(socket, "AF_UNIX")
+
+
+def uds_endpoint(socket_path: str, path: str = "") -> str:
+    return f"{_UDS_PREFIX}{quote(socket_path, safe='')}{path}"
+
+
+def split_uds(endpoint: str) -> Optional[Tuple[str, str]]:
+    """Return ``(socket_path, route_prefix)`` for a UDS endpoint, else ``None``."""
+    value = (endpoint or "").strip()
+    if not value.startswith(_UDS_PREFIX):
+        return None
+    rest = value[len(_UDS_PREFIX):]
+    encoded, sep, route = rest.partition("/")
+    return unquote(encoded), (sep + route).rstrip("/")
+
+
+def uds_path(endpoint: str) -> Optional[str]:
+    parsed = split_uds(endpoint)
+    return parsed[0] if parsed else None
+
+
+def ipc_url(endpoint: str, suffix: str) -> str:
+    """Request URL for ``suffix`` (e.g. ``/act``) on an agent endpoint."""
+    parsed = split_uds(endpoint)
+    if parsed is None:
+        return (endpoint or "").strip().rstrip("/") + suffix
+    return _UDS_BASE_URL + parsed[1] + suffix
+
+
+def sync_client(endpoint: str, **kwargs: Any) -> httpx.Client:
+    """``httpx.Client`` that reaches ``endpoint`` over TCP or its Unix socket."""
+    socket_path = uds_path(endpoint)
+    if socket_path:
+        kwargs.setdefault("transport", httpx.HTTPTransport(uds=socket_path))
+    return httpx.Client(**kwargs)
+
+
+def async_transport(endpoint: str, limits: httpx.Limits) -> Optional[httpx.AsyncHTTPTransport]:
+    socket_path = uds_path(endpoint)
+    if not socket_path:
+        return None
+    return httpx.AsyncHTTPTransport(uds=socket_path, limits=limits)
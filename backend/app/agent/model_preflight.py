@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import RLock
+from typing import Callable, Dict, Optional, Union
+
+
+def preflight_key(
+    api_url: Optional[str],
+    api_key: Optional[str],
+    model_name: Optional[str],
+    cli_command: Optional[str],
+) -> Optional[str]:
+    """Provider identity for a model check; ``None`` when there is nothing to probe.
+
+    The API key only enters the key as a short digest so it never shows up in status output.
+    """
+    cli = (cli_command or "").strip()
+    if cli:
+        return f"cli:{cli}"
+    url = (api_url or "").strip().rstrip("/").lower()
+    if not (url and api_key):
+        return None
+    digest = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+    model = (model_name or "").strip().lower() or "unknown-model"
+    return f"api:{url}|model:{model}|key:{digest}"
+
+
+class ModelPreflightCache:
+    """Deduplicated model-access checks shared across rooms.
+
+    Successful checks are cached per provider key for ``ttl_sec``; failures are not.
+    Concurrent callers for the same key wait on the single probe already in flight
+    instead of issuing their own LLM round trip.
+    """
+
+    def __init__(self, ttl_sec: Optional[float] = None) -> None:
+        self.ttl_sec = max(
+            0.0, ttl_sec if ttl_sec is not None else float(os.getenv("CAT_PREFLIGHT_TTL_SEC", "600"))
+        )
+        self._lock = RLock()
+        self._ok_until: Dict[str, float] = {}
+        self._in_flight: Dict[str, Future] = {}
+        self.hits = 0
+        self.joined = 0
+        self.probes = 0
+        self.failures = 0
+
+    def check(self, key: str, probe: Callable[[], None]) -> bool:
+        """Run ``probe`` unless ``key`` passed recently; True means the cache answered.
+
+        Raises whatever the probe raised, for the caller that ran it and for every
+        caller that joined it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._ok_until.get(key, 0.0) > now:
+                self.hits += 1
+                return True
+            pending = self._in_flight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._in_flight[key] = Future()
+                self.probes += 1
+            else:
+                self.joined += 1
+        if not owner:
+            pending.result()
+            return True
+        try:
+            probe()
+        except BaseException as exc:
+            with self._lock:
+                self.failures += 1
+                self._in_flight.pop(key, None)
+            pending.set_exception(exc)
+            raise
+        with self._lock:
+            if self.ttl_sec > 0:
+                self._ok_until[key] = time.monotonic() + self.ttl_sec
+            self._in_flight.pop(key, None)
+        pending.set_result(None)
+        return False
+
+    def check_many(self, probes: Dict[str, Callable[[], None]]) -> Dict[str, Union[bool, Exception]]:
+        """Check every key concurrently; maps key to ``check``'s result or the exception."""
+        if not probes:
+            return {}
+
+        def _one(key: str) -> Union[bool, Exception]:
+            try:
+                return self.check(key, probes[key])
+            except Exception as exc:  # noqa: BLE001
+                return exc
+
+        with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+            return dict(zip(probes, executor.map(_one, probes)))
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._ok_until.clear()
+            else:
+                self._ok_until.pop(key, None)
+
+    def status(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "ttl_sec": self.ttl_sec,
+                "cached": sum(1 for until in self._ok_until.values() if until > now),
+                "in_flight": len(self._in_flight),
+                "hits": self.hits,
+                "joined": self.joined,
+                "probes": self.probes,
+                "failures": self.failures,
+            }
+
+
+model_preflights = ModelPreflightCache()
@@ -2,8 +2,13 @@ from __future__ import annotations
 
 import os
 import random
-from typing import Any, Dict, List
+import weakref
+from collections import deque
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
+from app.core.audit_event import AuditEventType, as_event
 from app.core.models import Phase, Role
 from app.engine.game_engine import GameEngine
 
@@ -74,6 +79,7 @@ class PerspectiveEngine:
         player = snapshot.players[player_id]
         role = player.role
         ctx = snapshot.round_context
+        cache = PerspectiveEngine.cache_for(engine)
 
         alive_player_ids: List[str] = [
             p.player_id for p in snapshot.players.values() if p.alive
@@ -112,10 +118,7 @@ class PerspectiveEngine:
                 PerspectiveEngine._player_name(snapshot.players.get(pid)): PerspectiveEngine._death_cause_label(cause.value)
                 for pid, cause in ctx.deaths_this_round.items()
             },
-            "public_vote_log": PerspectiveEngine._extract_public_votes(
-                snapshot.action_audit_log,
-                snapshot.players,
-            ),
+            "public_vote_log": cache.public_votes(snapshot.action_audit_log, snapshot.players),
             "your_identity_hint": PerspectiveEngine._identity_hint(role),
             "role_capability": {
                 "can_use_antidote": role == Role.WITCH and not player.used_antidote,
@@ -124,7 +127,7 @@ class PerspectiveEngine:
             },
         }
 
-        base["memory_context"] = PerspectiveEngine._build_memory_context(
+        base["memory_context"] = cache.memory_context(
             audit_log=snapshot.action_audit_log,
             players=snapshot.players,
             viewer_id=player_id,
@@ -174,6 +177,14 @@ class PerspectiveEngine:
 
         return base
 
+    @staticmethod
+    def cache_for(engine: GameEngine) -> "PerspectiveCache":
+        cache = _ROOM_CACHES.get(engine)
+        if cache is None:
+            cache = PerspectiveCache()
+            _ROOM_CACHES[engine] = cache
+        return cache
+
     @staticmethod
     def _shuffled_player_ids(player_ids: List[str]) -> List[str]:
         ids = list(player_ids)
@@ -193,7 +204,7 @@ class PerspectiveEngine:
                 continue
             payload = row.get("payload", {})
             actor_id = row.get("actor_id")
-            target_id = payload.get("target") if isinstance(payload, dict) else None
+            target_id = payload.get("target") if isinstance(payload, Mapping) else None
             result.append(
                 {
                     "event_type": row.get("event_type"),
@@ -227,7 +238,7 @@ class PerspectiveEngine:
         for row in audit_log:
             event_type = str(row.get("event_type") or "")
             actor_id = str(row.get("actor_id") or "")
-            payload = row.get("payload") if isinstance(row.get("payload"), dict) else {}
+            payload = row.get("payload") if isinstance(row.get("payload"), Mapping) else {}
             phase = str(payload.get("phase") or "")
             ts = row.get("ts")
 
@@ -515,3 +526,255 @@ class PerspectiveEngine:
             "hunter": "被猎人带走",
         }
         return mapping.get(str(cause or "").lower(), str(cause or "未知原因"))
+
+
+PUBLIC_PHASES = {"day_announce", "day_discuss", "day_vote"}
+_SELF_ACTION_EVENTS = {AuditEventType.VOTE, AuditEventType.NIGHT_ACTION, AuditEventType.HUNTER_SHOT}
+PUBLIC_VOTE_LOG_LIMIT = 50
+ELIMINATED_PLAYERS_LIMIT = 12
+
+
+@dataclass(slots=True)
+class _ViewerMemory:
+    """Incrementally folded equivalent of one ``_build_memory_context`` scan."""
+
+    viewer_id: str
+    viewer_role: Optional[Role]
+    cursor: int = 0
+    current_round: int = 1
+    seen_round_start: bool = False
+    public_memory: Deque[dict] = field(default_factory=lambda: deque(maxlen=PerspectiveEngine.PUBLIC_MEMORY_LIMIT))
+    public_event_count: int = 0
+    self_memory: Deque[dict] = field(default_factory=lambda: deque(maxlen=PerspectiveEngine.SELF_MEMORY_LIMIT))
+    self_event_count: int = 0
+    wolf_team_memory: Deque[dict] = field(default_factory=lambda: deque(maxlen=PerspectiveEngine.WOLF_MEMORY_LIMIT))
+    eliminated_players: Deque[str] = field(default_factory=lambda: deque(maxlen=ELIMINATED_PLAYERS_LIMIT))
+    last_vote_result: str = ""
+    round_events: Dict[int, Dict[str, None]] = field(default_factory=dict)
+    blocked_markers: Tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        markers = set(PerspectiveEngine.SENSITIVE_MARKERS_COMMON)
+        markers.update(PerspectiveEngine.SENSITIVE_MARKERS_BY_ROLE.get(self.viewer_role) or set())
+        self.blocked_markers = tuple(str(marker).lower() for marker in markers)
+
+    def _blocked(self, content: str) -> bool:
+        text = str(content or "").strip().lower()
+        if not text:
+            return False
+        return any(marker in text for marker in self.blocked_markers)
+
+    def _public(self, round_text: str, entry: dict) -> None:
+        text = round_text.strip()
+        if text:
+            self.round_events.setdefault(self.current_round, {})[text] = None
+        self.public_memory.append(entry)
+        self.public_event_count += 1
+
+    def _self(self, entry: dict) -> None:
+        self.self_memory.append(entry)
+        self.self_event_count += 1
+
+    def fold(self, row: Mapping, players: dict) -> None:
+        event = as_event(row)
+        event_type = event.event_type
+        actor_id = str(event.actor_id or "")
+        payload = event.payload
+        ts = event.ts
+
+        if event_type is AuditEventType.PHASE_CHANGE:
+            if payload.phase == Phase.NIGHT_WOLF.value:
+                if self.seen_round_start:
+                    self.current_round += 1
+                else:
+                    self.seen_round_start = True
+            return
+
+        if event_type is AuditEventType.AGENT_SPEECH:
+            role = str(payload.role or "")
+            if actor_id == "god" and role == "judge":
+                return
+            content = str(payload.content or "").strip()
+            if not content:
+                return
+            phase = str(payload.phase or "")
+            actor_name = PerspectiveEngine._player_name(players.get(actor_id))
+            if phase in PUBLIC_PHASES:
+                if self._blocked(content):
+                    return
+                self._public(content, {"phase": phase, "speaker": actor_name, "content": content, "ts": ts})
+            if actor_id == self.viewer_id:
+                self._self({"phase": phase, "content": content, "ts": ts})
+            if (
+                self.viewer_role == Role.WEREWOLF
+                and phase in {"night_wolf_discuss", "night_wolf"}
+                and role == Role.WEREWOLF.value
+            ):
+                self.wolf_team_memory.append({"phase": phase, "speaker": actor_name, "content": content, "ts": ts})
+            return
+
+        if event_type is AuditEventType.DEATH:
+            dead_id = str(payload.player_id or "")
+            if dead_id:
+                dead_name = PerspectiveEngine._player_name(players.get(dead_id))
+                cause = PerspectiveEngine._death_cause_label(str(payload.cause or ""))
+                text = f"{dead_name} 出局（{cause}）。"
+                self.eliminated_players.append(dead_name)
+                self._public(text, {"phase": "day_announce", "speaker": "system", "content": text, "ts": ts})
+            return
+
+        if event_type is AuditEventType.FOOL_REVEAL:
+            text = "白痴翻牌并免死，本轮无人出局。"
+            self._public(text, {"phase": "day_vote", "speaker": "system", "content": text, "ts": ts})
+            return
+
+        if not isinstance(payload, Mapping):
+            payload = {}
+
+        if event_type is AuditEventType.GOD_NARRATION:
+            content = str(payload.get("content") or "").strip()
+            phase = str(payload.get("phase") or "")
+            if content and phase in PUBLIC_PHASES and not self._blocked(content):
+                self._public(content, {"phase": phase, "speaker": "god", "content": content, "ts": ts})
+            return
+
+        if event_type is AuditEventType.VOTE_RESULT:
+            result = str(payload.get("result") or "")
+            if result == "exile":
+                target_name = PerspectiveEngine._player_name(players.get(str(payload.get("target") or "")))
+                text = f"白天投票结果：{target_name} 被放逐。"
+            elif result == "tie_no_exile":
+                text = "白天投票结果：平票，无人出局。"
+            elif result == "no_valid_vote":
+                text = "白天投票结果：未形成有效票型。"
+            elif result == "fool_reveal_immune":
+                text = "白天投票结果：白痴翻牌免死。"
+            else:
+                text = "白天投票已结算。"
+            self.last_vote_result = text
+            self._public(text, {"phase": "day_vote", "speaker": "system", "content": text, "ts": ts})
+            return
+
+        if event_type in _SELF_ACTION_EVENTS and actor_id == self.viewer_id:
+            phase = str(payload.get("phase") or "")
+            self._self({"phase": phase, "content": f"你执行了 {event.type_name}。", "ts": ts})
+
+    def round_summaries(self, limit: int = 8) -> list[dict]:
+        result: list[dict] = []
+        for round_no, events in self.round_events.items():
+            deduped = list(events)
+            highlights = deduped[-4:]
+            result.append(
+                {
+                    "round_no": round_no,
+                    "event_count": len(deduped),
+                    "highlights": highlights,
+                    "summary": "；".join(highlights),
+                }
+            )
+        return result[-limit:]
+
+    def render(self, round_no: int, alive_count: int, dead_count: int) -> dict:
+        public_memory_limited = [dict(item) for item in self.public_memory]
+        self_memory_limited = [dict(item) for item in self.self_memory]
+        highlights = PerspectiveEngine._dedupe_recent_public_memory(public_memory_limited, limit=12)
+        round_summaries = self.round_summaries()
+        rolling_summary = PerspectiveEngine._compose_rolling_summary(round_summaries)
+        game_facts = {
+            "public_event_count": self.public_event_count,
+            "self_event_count": self.self_event_count,
+            "alive_count": alive_count,
+            "dead_count": dead_count,
+            "eliminated_players": list(self.eliminated_players),
+            "last_vote_result": self.last_vote_result,
+            "recent_highlights": highlights,
+            "round_summaries": round_summaries,
+        }
+        result = {
+            "summary": PerspectiveEngine._compose_memory_summary(
+                round_no=round_no,
+                alive_count=alive_count,
+                dead_count=dead_count,
+                game_facts=game_facts,
+            ),
+            "public_memory": public_memory_limited,
+            "self_memory": self_memory_limited,
+            "game_facts": game_facts,
+            "round_summaries": round_summaries,
+            "rolling_summary": rolling_summary,
+        }
+        if self.viewer_role == Role.WEREWOLF:
+            result["wolf_team_memory"] = [dict(item) for item in self.wolf_team_memory]
+        return result
+
+
+class PerspectiveCache:
+    """Per-room cursor over the audit log.
+
+    Each call folds only the rows appended since the previous call for that viewer.
+    Player names are resolved when a row is folded, so the cache is rebuilt whenever
+    a nickname changes or the audit log is replaced/shrinks.
+    """
+
+    def __init__(self) -> None:
+        self._audit_log: Optional[list] = None
+        self._names_signature: Tuple[Tuple[str, str], ...] = ()
+        self._viewers: Dict[str, _ViewerMemory] = {}
+        self._vote_cursor = 0
+        self._public_votes: Deque[dict] = deque(maxlen=PUBLIC_VOTE_LOG_LIMIT)
+
+    def _sync(self, audit_log: list, players: dict) -> None:
+        signature = tuple((pid, str(getattr(p, "nickname", "") or "")) for pid, p in players.items())
+        if audit_log is self._audit_log and signature == self._names_signature and len(audit_log) >= self._vote_cursor:
+            return
+        self._audit_log = audit_log
+        self._names_signature = signature
+        self._viewers.clear()
+        self._vote_cursor = 0
+        self._public_votes.clear()
+
+    def public_votes(self, audit_log: list, players: dict) -> list[dict]:
+        self._sync(audit_log, players)
+        for row in audit_log[self._vote_cursor :]:
+            event = as_event(row)
+            if event.event_type is AuditEventType.VOTE:
+                target_id = event.payload.target
+            elif event.event_type is AuditEventType.VOTE_RESULT:
+                payload = event.payload
+                target_id = payload.get("target") if isinstance(payload, Mapping) else None
+            else:
+                continue
+            self._public_votes.append(
+                {
+                    "event_type": event.type_name,
+                    "actor": PerspectiveEngine._player_name(players.get(event.actor_id)),
+                    "target": PerspectiveEngine._player_name(players.get(target_id)),
+                    "ts": event.ts,
+                }
+            )
+        self._vote_cursor = len(audit_log)
+        return [dict(item) for item in self._public_votes]
+
+    def memory_context(
+        self,
+        *,
+        audit_log: list,
+        players: dict,
+        viewer_id: str,
+        viewer_role: Optional[Role],
+        round_no: int,
+        alive_count: int,
+        dead_count: int,
+    ) -> dict:
+        self._sync(audit_log, players)
+        memory = self._viewers.get(viewer_id)
+        if memory is None or memory.viewer_role != viewer_role or memory.cursor > len(audit_log):
+            memory = _ViewerMemory(viewer_id=viewer_id, viewer_role=viewer_role)
+            self._viewers[viewer_id] = memory
+        for row in audit_log[memory.cursor :]:
+            memory.fold(row, players)
+        memory.cursor = len(audit_log)
+        return memory.render(round_no=round_no, alive_count=alive_count, dead_count=dead_count)
+
+
+_ROOM_CACHES: "weakref.WeakKeyDictionary[GameEngine, PerspectiveCache]" = weakref.WeakKeyDictionary()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import Dict, List
+
+from app.agent.agent_scheduler import LATENCY_BUCKETS_MS, LatencyHistogram, SchedulerMetrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return repr(round(float(value), 6))
+
+
+def _histogram_lines(name: str, hist: LatencyHistogram, labels: Dict[str, str]) -> List[str]:
+    lines: List[str] = []
+    cumulative = 0
+    for bound, bucket_count in zip(LATENCY_BUCKETS_MS, hist.counts):
+        cumulative += bucket_count
+        lines.append(f"{name}_bucket{_labels({**labels, 'le': _number(bound)})} {cumulative}")
+    lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {hist.count}")
+    lines.append(f"{name}_sum{_labels(labels)} {_number(hist.sum_ms)}")
+    lines.append(f"{name}_count{_labels(labels)} {hist.count}")
+    return lines
+
+
+def render_scheduler_metrics(metrics_by_room: Dict[str, SchedulerMetrics]) -> str:
+    """Render per-room scheduler metrics in the Prometheus text exposition format."""
+    counters = (
+        ("cat_agent_calls_total", "Agent calls that reached the network.", lambda m: m.total_calls),
+        ("cat_agent_timeouts_total", "Agent calls that ended in a timeout.", lambda m: m.timeout_calls),
+        ("cat_agent_errors_total", "Agent calls that ended in an error.", lambda m: m.error_calls),
+        ("cat_agent_short_circuits_total", "Calls answered by fallback while the breaker was open.", lambda m: m.short_circuit_calls),
+        ("cat_agent_retries_total", "Retry attempts after timeouts or transient HTTP errors.", lambda m: m.retry_attempts),
+        ("cat_agent_backoff_seconds_total", "Time spent sleeping between retries.", lambda m: m.backoff_sec_total),
+    )
+    lines: List[str] = []
+    for name, help_text, getter in counters:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for room_id, metrics in sorted(metrics_by_room.items()):
+            lines.append(f"{name}{_labels({'room_id': room_id})} {_number(getter(metrics))}")
+
+    histograms = (
+        ("cat_agent_phase_latency_ms", "phase", lambda m: m.latency_by_phase),
+        ("cat_agent_provider_latency_ms", "provider", lambda m: m.latency_by_provider),
+        ("cat_agent_player_latency_ms", "player_id", lambda m: m.latency_by_player),
+    )
+    for name, label, getter in histograms:
+        lines.append(f"# HELP {name} End-to-end agent call latency by {label}.")
+        lines.append(f"# TYPE {name} histogram")
+        for room_id, metrics in sorted(metrics_by_room.items()):
+            for key, hist in sorted(getter(metrics).items()):
+                lines.extend(_histogram_lines(name, hist, {"room_id": room_id, label: key}))
+    return "\n".join(lines) + "\n"
+
+
+def render_ws_metrics(snapshot: Dict[str, int]) -> str:
+    """Render WSConnectionManager queue gauges and counters."""
+    series = (
+        ("cat_ws_connections", "gauge", "Open game WebSocket connections.", "connections"),
+        ("cat_ws_queue_depth", "gauge", "Frames waiting in all outbound queues.", "queue_depth_total"),
+        ("cat_ws_queue_depth_max", "gauge", "Deepest outbound queue.", "queue_depth_max"),
+        ("cat_ws_frames_sent_total", "counter", "Frames written to sockets.", "frames_sent"),
+        ("cat_ws_frames_coalesced_total", "counter", "Pending room_state frames replaced by a newer one.", "frames_coalesced"),
+        ("cat_ws_clients_dropped_total", "counter", "Clients dropped for falling behind or failing sends.", "clients_dropped"),
+    )
+    lines: List[str] = []
+    for name, kind, help_text, key in series:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {_number(snapshot.get(key, 0))}")
+    return "\n".join(lines) + "\n"
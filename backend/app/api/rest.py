@@ -21,7 +21,9 @@ from app.schemas import (
     JoinRoomRequest,
     RegisterAgentRequest,
     RegisterAgentGlobalRequest,
+    ReplayEventsResponse,
     ReplayResponse,
+    ReplayStateResponse,
     RoomConfigResponse,
     RoomPlayerView,
     RoomStateResponse,
@@ -193,6 +195,9 @@ def bootstrap_agents(room_id: str, req: BootstrapAgentsRequest) -> dict:
             model_name=req.model_name,
             cli_command=req.cli_command,
             cli_timeout_sec=req.cli_timeout_sec,
+            agent_mode=req.agent_mode,
+            agent_transport=req.agent_transport,
+            preflight_check=req.preflight_check,
         )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -352,3 +357,19 @@ def replay_record(record_id: int) -> ReplayResponse:
         return ReplayResponse(record=room_manager.replay_record(record_id))
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+@router.get("/replay/{record_id}/events", response_model=ReplayEventsResponse)
+def replay_events(record_id: int, offset: int = 0, limit: int = 200) -> ReplayEventsResponse:
+    try:
+        return ReplayEventsResponse(**room_manager.replay_events(record_id, offset=offset, limit=limit))
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+@router.get("/replay/{record_id}/state", response_model=ReplayStateResponse)
+def replay_state(record_id: int, event_index: int) -> ReplayStateResponse:
+    try:
+        return ReplayStateResponse(**room_manager.replay_state(record_id, event_index))
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import sys
+import time
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+
+class AuditEventType(str, Enum):
+    PHASE_CHANGE = "phase_change"
+    NIGHT_ACTION = "night_action"
+    VOTE = "vote"
+    VOTE_RESULT = "vote_result"
+    DEATH = "death"
+    HUNTER_SHOT = "hunter_shot"
+    AUTO_ACTION = "auto_action"
+    AGENT_SPEECH = "agent_speech"
+    GOD_NARRATION = "god_narration"
+    FOOL_REVEAL = "fool_reveal"
+
+
+_EVENT_TYPES: Dict[str, AuditEventType] = {item.value: item for item in AuditEventType}
+_UNIX_EPOCH = datetime(1970, 1, 1)
+# Offset turning monotonic_ns() into wall-clock ns, fixed at import so stamps never go backwards.
+_WALL_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+_MISSING: Any = object()
+_NO_FIELDS: frozenset = frozenset()
+
+
+def now_ns() -> int:
+    return time.monotonic_ns() + _WALL_OFFSET_NS
+
+
+def format_ts(ts_ns: int) -> str:
+    """Same shape as ``datetime.utcnow().isoformat()``."""
+    return (_UNIX_EPOCH + timedelta(microseconds=ts_ns // 1000)).isoformat()
+
+
+def event_type_of(name: str) -> Union[AuditEventType, str]:
+    return _EVENT_TYPES.get(name) or sys.intern(str(name))
+
+
+class _TypedPayload(Mapping):
+    """Slots-backed payload that reads like the dict it was built from.
+
+    Keys outside ``_fields`` are kept in ``extra``. Fields that were absent read as ``None``
+    through attributes (``payload.target``) and stay absent from the mapping view.
+    """
+
+    __slots__ = ("extra", "_absent")
+    _fields: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "_TypedPayload":
+        payload = cls.__new__(cls)
+        absent = []
+        for name in cls._fields:
+            value = data.get(name, _MISSING)
+            if value is _MISSING:
+                absent.append(name)
+                value = None
+            object.__setattr__(payload, name, value)
+        extra = {key: value for key, value in data.items() if key not in cls._fields}
+        payload.extra = extra or None
+        payload._absent = frozenset(absent) if absent else _NO_FIELDS
+        return payload
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._fields:
+            if key not in self._absent:
+                return getattr(self, key)
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._fields:
+            return default if key in self._absent else getattr(self, key)
+        return self.extra.get(key, default) if self.extra else default
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self._fields:
+            if name not in self._absent:
+                yield name
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class PhaseChangePayload(_TypedPayload):
+    __slots__ = ("phase", "round_no")
+    _fields = ("phase", "round_no")
+
+
+class VotePayload(_TypedPayload):
+    __slots__ = ("target",)
+    _fields = ("target",)
+
+
+class DeathPayload(_TypedPayload):
+    __slots__ = ("player_id", "cause")
+    _fields = ("player_id", "cause")
+
+
+class SpeechPayload(_TypedPayload):
+    __slots__ = ("phase", "role", "content", "thought_content", "is_fallback", "fallback_reason")
+    _fields = ("phase", "role", "content", "thought_content", "is_fallback", "fallback_reason")
+
+
+_PAYLOAD_TYPES: Dict[AuditEventType, type] = {
+    AuditEventType.PHASE_CHANGE: PhaseChangePayload,
+    AuditEventType.VOTE: VotePayload,
+    AuditEventType.DEATH: DeathPayload,
+    AuditEventType.AGENT_SPEECH: SpeechPayload,
+}
+
+_EVENT_KEYS = ("ts", "event_type", "actor_id", "payload")
+
+
+class AuditEvent(Mapping):
+    """One engine audit row.
+
+    The mapping view (``row["event_type"]``, ``row.get("payload")``) matches the dict rows
+    the engine used to append, with the event type as a plain string and ``ts`` formatted
+    on first access from the integer ``ts_ns``.
+    """
+
+    __slots__ = ("ts_ns", "event_type", "actor_id", "payload", "_ts")
+
+    def __init__(
+        self,
+        event_type: Union[AuditEventType, str],
+        actor_id: str,
+        payload: Any,
+        ts_ns: Optional[int] = None,
+    ) -> None:
+        self.event_type = event_type_of(event_type) if not isinstance(event_type, AuditEventType) else event_type
+        self.actor_id = actor_id
+        payload_type = _PAYLOAD_TYPES.get(self.event_type)  # type: ignore[arg-type]
+        if payload_type is not None and (payload is None or isinstance(payload, dict)):
+            payload = payload_type.from_dict(payload or {})
+        self.payload = payload
+        self.ts_ns = now_ns() if ts_ns is None else ts_ns
+        self._ts: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, row: Mapping) -> "AuditEvent":
+        """Rebuild an event from its dict form (spilled or stored rows), keeping its ``ts`` text."""
+        ts = row.get("ts")
+        ts_ns = 0
+        if isinstance(ts, str):
+            try:
+                ts_ns = (datetime.fromisoformat(ts) - _UNIX_EPOCH) // timedelta(microseconds=1) * 1000
+            except ValueError:
+                pass
+        event = cls(str(row.get("event_type") or ""), row.get("actor_id"), row.get("payload"), ts_ns=ts_ns)
+        if isinstance(ts, str):
+            event._ts = ts
+        return event
+
+    @property
+    def ts(self) -> str:
+        if self._ts is None:
+            self._ts = format_ts(self.ts_ns)
+        return self._ts
+
+    @property
+    def type_name(self) -> str:
+        return self.event_type.value if isinstance(self.event_type, AuditEventType) else self.event_type
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "ts":
+            return self.ts
+        if key == "event_type":
+            return self.type_name
+        if key == "actor_id":
+            return self.actor_id
+        if key == "payload":
+            return self.payload
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # Compatibility for dict-style callers; hot folds read the attributes via ``as_event``.
+        if key == "event_type":
+            return self.type_name
+        if key == "payload":
+            return self.payload
+        if key == "actor_id":
+            return self.actor_id
+        if key == "ts":
+            return self.ts
+        return default
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_EVENT_KEYS)
+
+    def __len__(self) -> int:
+        return len(_EVENT_KEYS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        payload = self.payload.to_dict() if isinstance(self.payload, _TypedPayload) else self.payload
+        return {"ts": self.ts, "event_type": self.type_name, "actor_id": self.actor_id, "payload": payload}
+
+    def __repr__(self) -> str:
+        return f"AuditEvent({self.to_dict()!r})"
+
+
+def as_event(row: Mapping) -> AuditEvent:
+    """The row as an ``AuditEvent``; dict rows (spilled, stored, hand-built) are converted."""
+    return row if type(row) is AuditEvent else AuditEvent.from_dict(row)
+
+
+def as_dict(row: Mapping) -> Dict[str, Any]:
+    """Plain-dict copy of an audit row for JSON boundaries; dict rows pass through."""
+    return row.to_dict() if isinstance(row, (AuditEvent, _TypedPayload)) else row
+
+
+def json_default(value: Any) -> Any:
+    if isinstance(value, (AuditEvent, _TypedPayload)):
+        return value.to_dict()
+    return str(value)
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from typing import IO, Any, Dict, Iterator, List, Optional, Union
+
+from app.core.audit_event import json_default
+
+
+class SpillingAuditLog:
+    """Append-only audit log with a bounded in-memory tail.
+
+    Indexes are absolute positions in the whole log. Once the tail exceeds its limit by
+    one segment, the oldest segment is appended to an anonymous temp file as JSON lines;
+    iteration and slicing read spilled rows back from disk, so callers that keep
+    cursors into the log (PerspectiveCache, replay capture) behave as with a list.
+    Spilled rows come back as JSON-equal copies rather than the original objects.
+    """
+
+    def __init__(self, memory_limit: Optional[int] = None, segment_size: Optional[int] = None) -> None:
+        self.memory_limit = max(
+            1, memory_limit if memory_limit is not None else int(os.getenv("CAT_AUDIT_MEMORY_EVENTS", "2000"))
+        )
+        self.segment_size = max(
+            1, segment_size if segment_size is not None else int(os.getenv("CAT_AUDIT_SPILL_SEGMENT", "500"))
+        )
+        self._recent: List[Dict[str, Any]] = []
+        self._spilled = 0
+        self._offsets: List[int] = []
+        self._file: Optional[IO[bytes]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def spilled(self) -> int:
+        """Number of rows that live only in the spill file."""
+        return self._spilled
+
+    def append(self, row: Dict[str, Any]) -> None:
+        with self._lock:
+            self._recent.append(row)
+            if len(self._recent) >= self.memory_limit + self.segment_size:
+                self._spill_locked()
+
+    def _spill_locked(self) -> None:
+        segment = self._recent[: self.segment_size]
+        del self._recent[: self.segment_size]
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix="cat-audit-", dir=os.getenv("CAT_AUDIT_SPILL_DIR") or None)
+        self._file.seek(0, os.SEEK_END)
+        self._offsets.append(self._file.tell())
+        self._file.write(
+            b"".join(json.dumps(row, ensure_ascii=False, default=json_default).encode("utf-8") + b"\n" for row in segment)
+        )
+        self._file.flush()
+        self._spilled += len(segment)
+
+    def _read_spilled(self, start: int, stop: int) -> Iterator[Dict[str, Any]]:
+        index = start
+        while index < stop:
+            segment_no, skip = divmod(index, self.segment_size)
+            with self._lock:
+                if self._file is None:
+                    return
+                self._file.seek(self._offsets[segment_no])
+                lines = [self._file.readline() for _ in range(self.segment_size)]
+            for line in lines[skip : skip + stop - index]:
+                yield json.loads(line)
+            index += len(lines[skip : skip + stop - index])
+
+    def iter_from(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Yield rows ``[start, stop)``, reading spilled segments from disk as needed."""
+        with self._lock:
+            spilled = self._spilled
+            total = spilled + len(self._recent)
+            stop = total if stop is None else min(stop, total)
+            start = max(0, start)
+            recent = self._recent[max(0, start - spilled) : max(0, stop - spilled)]
+        if start < min(spilled, stop):
+            yield from self._read_spilled(start, min(spilled, stop))
+        yield from recent
+
+    def close(self) -> None:
+        """Drop the spill file; the log keeps only its in-memory tail afterwards.
+
+        Iteration then skips the rows that lived only on disk.
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __len__(self) -> int:
+        return self._spilled + len(self._recent)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.iter_from(0)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                return list(self)[key]
+            return list(self.iter_from(start, stop)) if start < stop else []
+        index = key + len(self) if key < 0 else key
+        if not 0 <= index < len(self):
+            raise IndexError("audit log index out of range")
+        for row in self.iter_from(index, index + 1):
+            return row
+        raise IndexError("audit log row was spilled and the log is closed")
+
+    def __repr__(self) -> str:
+        return f"SpillingAuditLog(len={len(self)}, spilled={self._spilled})"
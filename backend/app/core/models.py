@@ -3,8 +3,11 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from threading import Lock
 from typing import Any, Dict, List, Optional, Set
 
+from app.core.audit_log import SpillingAuditLog
+
 
 class Role(str, Enum):
     WEREWOLF = "werewolf"
@@ -45,6 +48,25 @@ class Winner(str, Enum):
     GOOD = "good"
 
 
+# Writes to these PlayerState fields bump the owning room's PlayerEpoch, so that room's
+# player index notices direct mutations (tests, admin tools) and rebuilds.
+_INDEXED_PLAYER_FIELDS = frozenset({"player_id", "nickname", "role", "alive", "can_vote"})
+
+
+class PlayerEpoch:
+    """Write counter shared by the players of one room."""
+
+    __slots__ = ("value", "_lock")
+
+    def __init__(self) -> None:
+        self.value = 0
+        self._lock = Lock()
+
+    def bump(self) -> None:
+        with self._lock:
+            self.value += 1
+
+
 @dataclass(slots=True)
 class PlayerState:
     player_id: str
@@ -60,6 +82,14 @@ class PlayerState:
     last_seer_target: Optional[str] = None
     used_antidote: bool = False
     used_poison: bool = False
+    index_epoch: Optional[PlayerEpoch] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name in _INDEXED_PLAYER_FIELDS:
+            epoch = getattr(self, "index_epoch", None)
+            if epoch is not None:
+                epoch.bump()
 
 
 @dataclass(slots=True)
@@ -96,7 +126,7 @@ class GameSnapshot:
     phase: Phase = Phase.PREPARE
     game_metadata: Dict[str, Any] = field(default_factory=dict)
     round_context: RoundContext = field(default_factory=RoundContext)
-    action_audit_log: List[Dict[str, Any]] = field(default_factory=list)
+    action_audit_log: SpillingAuditLog = field(default_factory=SpillingAuditLog)
 
 
 ROLE_TEAM_MAP: Dict[Role, Team] = {
@@ -2,9 +2,12 @@ from __future__ import annotations
 
 import random
 import re
+from collections import deque
+from collections.abc import Mapping
 from datetime import datetime, timedelta
-from typing import Callable, Dict, List, Optional
+from typing import Callable, Deque, Dict, List, Optional
 
+from app.core.audit_event import AuditEvent, AuditEventType, as_event
 from app.core.game_config import GameConfig, default_game_config
 from app.core.models import (
     DeathCause,
@@ -16,6 +19,7 @@ from app.core.models import (
     Winner,
 )
 from app.engine.phase_orchestrator import PhaseOrchestrator
+from app.engine.player_index import PlayerIndex
 from app.roles.skills import SKILL_REGISTRY, resolve_wolf_target
 
 
@@ -46,6 +50,18 @@ class GameEngine:
             "on_phase_start": [],
             "on_player_death": [],
         }
+        self.state_version = 0
+        self._public_speech_history: Deque[dict] = deque(maxlen=self.PUBLIC_SPEECH_HISTORY_LIMIT)
+        self._death_cause_by_player: Dict[str, str] = {}
+        self._public_state_cache: Optional[dict] = None
+        self._public_state_cache_version = -1
+        self._audit_listeners: List[Callable[[dict], None]] = []
+        self._player_index = PlayerIndex()
+
+    @property
+    def players_index(self) -> PlayerIndex:
+        """Alive/role/voter/nickname lookups, rebuilt first if players were changed directly."""
+        return self._player_index.sync(self.snapshot.players)
 
     def register_hook(self, hook_name: str, callback: Callable[[GameSnapshot], None]) -> None:
         if hook_name not in self.hooks:
@@ -56,6 +72,14 @@ class GameEngine:
         for callback in self.hooks.get(hook_name, []):
             callback(self.snapshot)
 
+    def add_audit_listener(self, callback: Callable[[dict], None]) -> None:
+        """Call ``callback(row)`` after every audit row is recorded and projected."""
+        self._audit_listeners.append(callback)
+
+    def remove_audit_listener(self, callback: Callable[[dict], None]) -> None:
+        if callback in self._audit_listeners:
+            self._audit_listeners.remove(callback)
+
     def add_player(self, player_id: str, nickname: str) -> None:
         if self.snapshot.started:
             raise ValueError("game already started")
@@ -64,12 +88,18 @@ class GameEngine:
         if len(self.snapshot.players) >= self.config.total_players:
             raise ValueError("room is full")
         self.snapshot.players[player_id] = PlayerState(player_id=player_id, nickname=nickname)
+        self.mark_state_changed()
+
+    def mark_state_changed(self) -> None:
+        """Bump ``state_version`` after mutating public fields outside ``_audit``."""
+        self.state_version += 1
 
     def mark_online_status(self, player_id: str, online: bool) -> None:
         player = self._must_get_player(player_id)
         player.online = online
         if not online:
             player.entrusted = True
+        self.mark_state_changed()
 
     def start_game(self, operator_id: str) -> None:
         if operator_id != self.snapshot.owner_id:
@@ -104,6 +134,7 @@ class GameEngine:
         random.shuffle(role_pool)
         for player, role in zip(self.snapshot.players.values(), role_pool):
             player.role = role
+        self._player_index.rebuild(self.snapshot.players)
 
     def submit_night_action(
         self,
@@ -198,16 +229,9 @@ class GameEngine:
         self.advance_phase()
 
     def _autorun_wolf_phase(self) -> None:
-        alive_non_wolf = [
-            p.player_id
-            for p in self.snapshot.players.values()
-            if p.alive and p.role != Role.WEREWOLF
-        ]
-        alive_wolves = [
-            p.player_id
-            for p in self.snapshot.players.values()
-            if p.alive and p.role == Role.WEREWOLF
-        ]
+        index = self.players_index
+        alive_non_wolf = index.alive_ids_excluding_role(Role.WEREWOLF)
+        alive_wolves = index.alive_ids(Role.WEREWOLF)
         for wolf_id in alive_wolves:
             votes = self.snapshot.round_context.night_actions.wolf_votes
             if wolf_id in votes or not alive_non_wolf:
@@ -225,13 +249,10 @@ class GameEngine:
         if self.snapshot.round_context.night_actions.guard_target is not None:
             return
 
-        candidates = [
-            p.player_id
-            for p in self.snapshot.players.values()
-            if p.alive and p.player_id != guard.last_guard_target
-        ]
+        alive_ids = self.players_index.alive_ids()
+        candidates = [pid for pid in alive_ids if pid != guard.last_guard_target]
         if not candidates:
-            candidates = [p.player_id for p in self.snapshot.players.values() if p.alive]
+            candidates = alive_ids
         picked = _pick_random_target(candidates)
         if not picked:
             return
@@ -250,17 +271,10 @@ class GameEngine:
             return
         if self.snapshot.round_context.night_actions.seer_target is not None:
             return
-        candidates = [
-            p.player_id
-            for p in self.snapshot.players.values()
-            if p.alive and p.player_id != seer.player_id and p.player_id != seer.last_seer_target
-        ]
+        others = [pid for pid in self.players_index.alive_ids() if pid != seer.player_id]
+        candidates = [pid for pid in others if pid != seer.last_seer_target]
         if not candidates:
-            candidates = [
-                p.player_id
-                for p in self.snapshot.players.values()
-                if p.alive and p.player_id != seer.player_id
-            ]
+            candidates = others
         if not candidates:
             return
         target_id = _pick_random_target(candidates)
@@ -271,11 +285,11 @@ class GameEngine:
         self._audit("auto_action", seer.player_id, {"phase": "night_seer"})
 
     def _autorun_day_vote_phase(self) -> None:
-        alive_players = [p.player_id for p in self.snapshot.players.values() if p.alive]
+        index = self.players_index
+        alive_players = index.alive_ids()
         votes = self.snapshot.round_context.night_actions.day_votes
         for pid in alive_players:
-            player = self.snapshot.players[pid]
-            if not player.can_vote:
+            if pid not in index.voters:
                 continue
             if pid in votes:
                 continue
@@ -286,6 +300,7 @@ class GameEngine:
     def advance_phase(self) -> None:
         if self.snapshot.game_over:
             self.snapshot.phase = Phase.GAME_OVER
+            self.mark_state_changed()
             return
 
         phase = self.snapshot.phase
@@ -347,11 +362,7 @@ class GameEngine:
         return self.snapshot.round_context.wolf_target
 
     def _resolve_wolf_target(self) -> None:
-        alive_non_wolf = [
-            p.player_id
-            for p in self.snapshot.players.values()
-            if p.alive and p.role != Role.WEREWOLF
-        ]
+        alive_non_wolf = self.players_index.alive_ids_excluding_role(Role.WEREWOLF)
         wolf_target = resolve_wolf_target(
             self.snapshot.round_context.night_actions.wolf_votes,
             alive_non_wolf,
@@ -390,11 +401,7 @@ class GameEngine:
 
     def _resolve_day_vote(self) -> None:
         votes = self.snapshot.round_context.night_actions.day_votes
-        alive_voters = {
-            p.player_id
-            for p in self.snapshot.players.values()
-            if p.alive and p.can_vote
-        }
+        alive_voters = set(self.players_index.voters)
 
         counter: Dict[str, int] = {}
         submitted_count = 0
@@ -443,8 +450,11 @@ class GameEngine:
             and not exiled_player.fool_revealed
             and self.config.rules.fool_reveal_immune_once
         ):
+            index = self.players_index
             exiled_player.fool_revealed = True
             exiled_player.can_vote = False
+            index.on_lost_vote(exiled_player)
+            index.mark_synced(self.snapshot.players)
             self.snapshot.round_context.deaths_this_round = {}
             self._audit(
                 "fool_reveal",
@@ -538,7 +548,10 @@ class GameEngine:
         player = self._must_get_player(player_id)
         if not player.alive:
             return
+        index = self.players_index
         player.alive = False
+        index.on_death(player)
+        index.mark_synced(self.snapshot.players)
         self._audit("death", "system", {"player_id": player_id, "cause": cause.value})
         self._trigger_hook("on_player_death")
 
@@ -561,6 +574,7 @@ class GameEngine:
 
         self.snapshot.game_over = True
         self.snapshot.phase = Phase.GAME_OVER
+        self.mark_state_changed()
         return self.snapshot.winner
 
     def _next_round_reset(self) -> None:
@@ -577,6 +591,10 @@ class GameEngine:
         ctx.protected_players.clear()
         ctx.wolf_target = None
 
+    def fresh_action_deadline(self) -> datetime:
+        """Deadline for an out-of-phase action (hunter shot) started now."""
+        return datetime.utcnow() + timedelta(seconds=self.config.timeout.night_action_seconds)
+
     def _goto_phase(self, phase: Phase) -> None:
         self.snapshot.phase = phase
         self.snapshot.round_context.phase = phase
@@ -598,7 +616,7 @@ class GameEngine:
         if phase == Phase.DAY_VOTE:
             self.snapshot.round_context.night_actions.day_votes.clear()
 
-        self._audit("phase_change", "system", {"phase": phase.value})
+        self._audit("phase_change", "system", {"phase": phase.value, "round_no": self.snapshot.round_context.round_no})
         self._trigger_hook("on_phase_start")
 
     def _audit(self, event_type: str, actor_id: str, payload: dict) -> None:
@@ -612,14 +630,124 @@ class GameEngine:
                     sanitized_payload["content"] = self._sanitize_public_day_discuss_content(content)
                     payload = sanitized_payload
 
-        self.snapshot.action_audit_log.append(
-            {
-                "ts": datetime.utcnow().isoformat(),
-                "event_type": event_type,
-                "actor_id": actor_id,
-                "payload": payload,
-            }
-        )
+        row = AuditEvent(event_type, actor_id, payload)
+        self.snapshot.action_audit_log.append(row)
+        self._project_public_event(row)
+        self.mark_state_changed()
+        for callback in list(self._audit_listeners):
+            callback(row)
+
+    def _project_public_event(self, row: Mapping) -> None:
+        event = as_event(row)
+        event_type = event.event_type
+        payload = event.payload
+
+        if event_type is AuditEventType.DEATH:
+            dead_player_id = payload.player_id
+            cause = payload.cause
+            if isinstance(dead_player_id, str) and dead_player_id and isinstance(cause, str) and cause:
+                self._death_cause_by_player[dead_player_id] = cause
+            return
+
+        if event_type is AuditEventType.AGENT_SPEECH:
+            self._public_speech_history.append(
+                {
+                    "player_id": event.actor_id,
+                    "phase": payload.phase,
+                    "role": payload.role,
+                    "content": payload.content or "",
+                    "thought_content": payload.thought_content or "",
+                    "is_fallback": payload.is_fallback or False,
+                    "fallback_reason": payload.fallback_reason,
+                    "timestamp": event.ts,
+                    "event": "agent_speech",
+                }
+            )
+            return
+
+        if not isinstance(payload, Mapping):
+            payload = {}
+
+        if event_type is AuditEventType.GOD_NARRATION:
+            rulings = payload.get("rulings")
+            if not isinstance(rulings, dict):
+                rulings = {}
+            self._public_speech_history.append(
+                {
+                    "player_id": "god",
+                    "phase": payload.get("phase") or self.snapshot.phase.value,
+                    "role": "judge",
+                    "content": payload.get("content", ""),
+                    "phase_instructions": payload.get("phase_instructions", ""),
+                    "rulings": rulings,
+                    "next_phase_hint": payload.get("next_phase_hint", ""),
+                    "is_fallback": payload.get("is_fallback", False),
+                    "fallback_reason": payload.get("fallback_reason"),
+                    "timestamp": event.ts,
+                    "event": "god_narration",
+                }
+            )
+            return
+
+        if event_type is AuditEventType.VOTE_RESULT:
+            result = str(payload.get("result") or "")
+            if result == "exile":
+                target_id = payload.get("target")
+                target_name = (
+                    (self.snapshot.players[target_id].nickname or target_id)
+                    if isinstance(target_id, str) and target_id in self.snapshot.players
+                    else "未知"
+                )
+                content = f"投票结果：{target_name} 被放逐。"
+            elif result == "tie_no_exile":
+                tied = payload.get("tied") or []
+                tied_names = [
+                    (self.snapshot.players[pid].nickname or pid)
+                    for pid in tied
+                    if isinstance(pid, str) and pid in self.snapshot.players
+                ]
+                if tied_names:
+                    content = "投票结果：平票（" + "、".join(tied_names) + "），无人出局。"
+                else:
+                    content = "投票结果：平票，无人出局。"
+            elif result == "no_valid_vote":
+                content = "投票结果：未形成有效票型，无人出局。"
+            else:
+                content = "投票结果已结算。"
+
+            self._public_speech_history.append(
+                {
+                    "player_id": "god",
+                    "phase": Phase.DAY_VOTE.value,
+                    "role": "judge",
+                    "content": content,
+                    "is_fallback": False,
+                    "fallback_reason": None,
+                    "timestamp": event.ts,
+                    "event": "vote_result",
+                }
+            )
+            return
+
+        if event_type is AuditEventType.FOOL_REVEAL:
+            player_id = event.actor_id
+            player_name = (
+                (self.snapshot.players[player_id].nickname or player_id)
+                if isinstance(player_id, str) and player_id in self.snapshot.players
+                else "该玩家"
+            )
+            self._public_speech_history.append(
+                {
+                    "player_id": "god",
+                    "phase": Phase.DAY_VOTE.value,
+                    "role": "judge",
+                    "content": f"投票结果：{player_name} 为白痴并翻牌免死，本轮无人出局。",
+                    "is_fallback": False,
+                    "fallback_reason": None,
+                    "timestamp": event.ts,
+                    "event": "fool_reveal",
+                }
+            )
 
     @staticmethod
     def _sanitize_public_day_discuss_content(text: str) -> str:
@@ -643,9 +771,8 @@ class GameEngine:
         return speech
 
     def _find_alive_role(self, role: Role) -> Optional[PlayerState]:
-        for player in self.snapshot.players.values():
-            if player.alive and player.role == role:
-                return player
+        for player_id in self.players_index.alive_by_role.get(role, ()):
+            return self.snapshot.players[player_id]
         return None
 
     def _must_get_player(self, player_id: str) -> PlayerState:
@@ -655,117 +782,15 @@ class GameEngine:
         return player
 
     def public_state(self) -> dict:
-        speech_history = []
-        death_cause_by_player: Dict[str, str] = {}
-        for row in self.snapshot.action_audit_log:
-            event_type = row.get("event_type")
-            payload = row.get("payload", {}) or {}
-
-            if event_type == "death":
-                dead_player_id = payload.get("player_id")
-                cause = payload.get("cause")
-                if isinstance(dead_player_id, str) and dead_player_id and isinstance(cause, str) and cause:
-                    death_cause_by_player[dead_player_id] = cause
-                continue
-
-            if event_type == "agent_speech":
-                speech_history.append(
-                    {
-                        "player_id": row.get("actor_id"),
-                        "phase": payload.get("phase"),
-                        "role": payload.get("role"),
-                        "content": payload.get("content", ""),
-                        "thought_content": payload.get("thought_content", ""),
-                        "is_fallback": payload.get("is_fallback", False),
-                        "fallback_reason": payload.get("fallback_reason"),
-                        "timestamp": row.get("ts"),
-                        "event": "agent_speech",
-                    }
-                )
-                continue
-
-            if event_type == "god_narration":
-                rulings = payload.get("rulings")
-                if not isinstance(rulings, dict):
-                    rulings = {}
-                speech_history.append(
-                    {
-                        "player_id": "god",
-                        "phase": payload.get("phase") or self.snapshot.phase.value,
-                        "role": "judge",
-                        "content": payload.get("content", ""),
-                        "phase_instructions": payload.get("phase_instructions", ""),
-                        "rulings": rulings,
-                        "next_phase_hint": payload.get("next_phase_hint", ""),
-                        "is_fallback": payload.get("is_fallback", False),
-                        "fallback_reason": payload.get("fallback_reason"),
-                        "timestamp": row.get("ts"),
-                        "event": "god_narration",
-                    }
-                )
-                continue
-
-            if event_type == "vote_result":
-                result = str(payload.get("result") or "")
-                if result == "exile":
-                    target_id = payload.get("target")
-                    target_name = (
-                        (self.snapshot.players[target_id].nickname or target_id)
-                        if isinstance(target_id, str) and target_id in self.snapshot.players
-                        else "未知"
-                    )
-                    content = f"投票结果：{target_name} 被放逐。"
-                elif result == "tie_no_exile":
-                    tied = payload.get("tied") or []
-                    tied_names = [
-                        (self.snapshot.players[pid].nickname or pid)
-                        for pid in tied
-                        if isinstance(pid, str) and pid in self.snapshot.players
-                    ]
-                    if tied_names:
-                        content = "投票结果：平票（" + "、".join(tied_names) + "），无人出局。"
-                    else:
-                        content = "投票结果：平票，无人出局。"
-                elif result == "no_valid_vote":
-                    content = "投票结果：未形成有效票型，无人出局。"
-                else:
-                    content = "投票结果已结算。"
-
-                speech_history.append(
-                    {
-                        "player_id": "god",
-                        "phase": Phase.DAY_VOTE.value,
-                        "role": "judge",
-                        "content": content,
-                        "is_fallback": False,
-                        "fallback_reason": None,
-                        "timestamp": row.get("ts"),
-                        "event": "vote_result",
-                    }
-                )
-                continue
+        """Return the public room state.
 
-            if event_type == "fool_reveal":
-                player_id = row.get("actor_id")
-                player_name = (
-                    (self.snapshot.players[player_id].nickname or player_id)
-                    if isinstance(player_id, str) and player_id in self.snapshot.players
-                    else "该玩家"
-                )
-                speech_history.append(
-                    {
-                        "player_id": "god",
-                        "phase": Phase.DAY_VOTE.value,
-                        "role": "judge",
-                        "content": f"投票结果：{player_name} 为白痴并翻牌免死，本轮无人出局。",
-                        "is_fallback": False,
-                        "fallback_reason": None,
-                        "timestamp": row.get("ts"),
-                        "event": "fool_reveal",
-                    }
-                )
+        Built from the incremental projection maintained by ``_audit`` and cached per
+        ``state_version``; callers must treat the returned dict as read-only.
+        """
+        if self._public_state_cache is not None and self._public_state_cache_version == self.state_version:
+            return self._public_state_cache
 
-        return {
+        state = {
             "room_id": self.snapshot.room_id,
             "owner_id": self.snapshot.owner_id,
             "started": self.snapshot.started,
@@ -781,7 +806,7 @@ class GameEngine:
                     "nickname": p.nickname,
                     "role": p.role.value if p.role else None,
                     "alive": p.alive,
-                    "death_cause": death_cause_by_player.get(p.player_id),
+                    "death_cause": self._death_cause_by_player.get(p.player_id),
                     "online": p.online,
                     "can_vote": p.can_vote,
                     "fool_revealed": p.fool_revealed,
@@ -792,7 +817,76 @@ class GameEngine:
                 pid: cause.value
                 for pid, cause in self.snapshot.round_context.deaths_this_round.items()
             },
-            "speech_history": speech_history[-self.PUBLIC_SPEECH_HISTORY_LIMIT :],
+            "speech_history": list(self._public_speech_history),
             "is_peace_night": self.snapshot.phase in {Phase.DAY_ANNOUNCE, Phase.DAY_DISCUSS, Phase.DAY_VOTE}
             and not self.snapshot.round_context.deaths_this_round,
+            "state_version": self.state_version,
         }
+        self._public_state_cache = state
+        self._public_state_cache_version = self.state_version
+        return state
+
+    @classmethod
+    def for_replay(cls, room_id: str, players: List[dict]) -> "GameEngine":
+        """Engine shell seeded with a finished game's roster, to be fed through ``replay_audit_row``."""
+        engine = cls(room_id=room_id, owner_id="")
+        roles = {role.value: role for role in Role}
+        for item in players:
+            player_id = str(item.get("player_id") or "")
+            if not player_id:
+                continue
+            engine.snapshot.players[player_id] = PlayerState(
+                player_id=player_id,
+                nickname=str(item.get("nickname") or player_id),
+                role=roles.get(str(item.get("role"))),
+            )
+        engine.snapshot.started = True
+        return engine
+
+    def replay_audit_row(self, row: dict) -> None:
+        """Apply one recorded audit row to the fields ``public_state`` exposes."""
+        event_type = row.get("event_type")
+        payload = row.get("payload") or {}
+        ctx = self.snapshot.round_context
+
+        if event_type == "phase_change" and payload.get("phase") in {p.value for p in Phase}:
+            phase = Phase(payload["phase"])
+            round_no = payload.get("round_no")
+            if not isinstance(round_no, int):
+                # Records written before phase changes carried round_no: each night after the first starts a round.
+                round_no = ctx.round_no + (1 if phase == Phase.NIGHT_WOLF and not ctx.first_night else 0)
+            if phase == Phase.NIGHT_WOLF:
+                ctx.first_night = False
+            if round_no != ctx.round_no:
+                ctx.round_no = round_no
+                ctx.deaths_this_round.clear()
+            self.snapshot.phase = phase
+            ctx.phase = phase
+        elif event_type == "death":
+            player = self.snapshot.players.get(str(payload.get("player_id")))
+            cause = payload.get("cause")
+            if player is not None:
+                player.alive = False
+                # Only night deaths are announced through deaths_this_round; exiles arrive with vote_result.
+                if cause in (DeathCause.WOLF.value, DeathCause.POISON.value):
+                    ctx.deaths_this_round[player.player_id] = DeathCause(cause)
+        elif event_type == "vote_result":
+            target = payload.get("target")
+            exiled = payload.get("result") == "exile" and target in self.snapshot.players
+            ctx.deaths_this_round = {target: DeathCause.VOTE} if exiled else {}
+        elif event_type == "fool_reveal":
+            player = self.snapshot.players.get(str(row.get("actor_id")))
+            if player is not None:
+                player.fool_revealed = True
+                player.can_vote = False
+                ctx.deaths_this_round = {}
+
+        self._project_public_event(row)
+        self.mark_state_changed()
+
+    def finish_replay(self, winner: Optional[str]) -> None:
+        """Mark a replayed game as over once every audit row has been applied."""
+        self.snapshot.winner = Winner(winner) if winner in {w.value for w in Winner} else None
+        self.snapshot.game_over = True
+        self.snapshot.phase = Phase.GAME_OVER
+        self.mark_state_changed()
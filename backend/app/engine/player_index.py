@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from app.core.models import PlayerEpoch, PlayerState, Role
+
+
+class PlayerIndex:
+    """Liveness, role, voter and nickname lookups for one room's players.
+
+    GameEngine updates it in place on kills, role assignment and fool reveals. ``rebuild``
+    binds every player to this index's own epoch, so any other write to an indexed
+    PlayerState field bumps only this room's counter and ``sync`` rebuilds on the next read.
+    """
+
+    __slots__ = (
+        "alive",
+        "alive_by_role",
+        "voters",
+        "nickname_ids",
+        "nickname_ids_lower",
+        "epoch",
+        "_seen_epoch",
+        "_size",
+    )
+
+    def __init__(self) -> None:
+        # Dicts used as ordered sets so candidate lists keep seat order.
+        self.alive: Dict[str, None] = {}
+        self.alive_by_role: Dict[Role, Dict[str, None]] = {}
+        self.voters: Dict[str, None] = {}
+        self.nickname_ids: Dict[str, List[str]] = {}
+        self.nickname_ids_lower: Dict[str, List[str]] = {}
+        self.epoch = PlayerEpoch()
+        self._seen_epoch = -1
+        self._size = -1
+
+    def sync(self, players: Dict[str, PlayerState]) -> "PlayerIndex":
+        if self._seen_epoch != self.epoch.value or self._size != len(players):
+            self.rebuild(players)
+        return self
+
+    def rebuild(self, players: Dict[str, PlayerState]) -> None:
+        self.alive = {}
+        self.alive_by_role = {}
+        self.voters = {}
+        self.nickname_ids = {}
+        self.nickname_ids_lower = {}
+        for player in players.values():
+            if player.index_epoch is not self.epoch:
+                player.index_epoch = self.epoch
+            pid = player.player_id
+            if player.alive:
+                self.alive[pid] = None
+                if player.role is not None:
+                    self.alive_by_role.setdefault(player.role, {})[pid] = None
+                if player.can_vote:
+                    self.voters[pid] = None
+            nickname = (player.nickname or "").strip()
+            if nickname:
+                self.nickname_ids.setdefault(nickname, []).append(pid)
+                self.nickname_ids_lower.setdefault(nickname.lower(), []).append(pid)
+        self.mark_synced(players)
+
+    def mark_synced(self, players: Dict[str, PlayerState]) -> None:
+        """Record that the index reflects every player write made so far."""
+        self._seen_epoch = self.epoch.value
+        self._size = len(players)
+
+    def on_death(self, player: PlayerState) -> None:
+        self.alive.pop(player.player_id, None)
+        self.voters.pop(player.player_id, None)
+        if player.role is not None:
+            self.alive_by_role.get(player.role, {}).pop(player.player_id, None)
+
+    def on_lost_vote(self, player: PlayerState) -> None:
+        self.voters.pop(player.player_id, None)
+
+    def alive_ids(self, role: Optional[Role] = None) -> List[str]:
+        if role is None:
+            return list(self.alive)
+        return list(self.alive_by_role.get(role, ()))
+
+    def alive_ids_excluding_role(self, role: Role) -> List[str]:
+        excluded = self.alive_by_role.get(role, {})
+        return [pid for pid in self.alive if pid not in excluded]
+
+    def voter_ids(self) -> List[str]:
+        return list(self.voters)
+
+    def ids_by_nickname(self, nickname: str, *, case_insensitive: bool = False) -> List[str]:
+        key = (nickname or "").strip()
+        if case_insensitive:
+            return list(self.nickname_ids_lower.get(key.lower(), ()))
+        return list(self.nickname_ids.get(key, ()))
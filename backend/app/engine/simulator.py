@@ -0,0 +1,370 @@
+"""Headless game simulation for balance checks and engine benchmarking.
+
+Games run on ``GameEngine`` with every seat played by ``FallbackStrategies``: no agent
+processes, no network. Batches are spread over a process pool and summarized per role
+template::
+
+    python -m app.engine.simulator --games 2000 --player-counts 8 9 10 11 12 --seed 7
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.agent.fallback_strategies import FallbackStrategies
+from app.core.game_config import GameConfig, default_game_config
+from app.core.models import Phase, Role, Winner
+from app.engine.game_engine import GameEngine
+
+
+SIM_OWNER_ID = "sim-owner"
+SIM_MAX_STEPS = max(1, int(os.getenv("CAT_SIM_MAX_STEPS", "400")))
+SIM_BATCH_GAMES = max(1, int(os.getenv("CAT_SIM_BATCH_GAMES", "50")))
+
+_NIGHT_STRATEGIES = {
+    Phase.NIGHT_GUARD: (Role.GUARD, "night_guard"),
+    Phase.NIGHT_SEER: (Role.SEER, "night_seer"),
+}
+
+
+@dataclass(slots=True)
+class GameResult:
+    player_count: int
+    winner: Optional[str]
+    rounds: int
+    rejected_actions: int = 0
+    phase_seconds: Dict[str, float] = field(default_factory=dict)
+    phase_counts: Dict[str, int] = field(default_factory=dict)
+
+
+def game_seed(base_seed: int, player_count: int, game_no: int) -> int:
+    """Stable per-game seed, independent of worker count and batch layout."""
+    digest = hashlib.blake2b(f"{base_seed}:{player_count}:{game_no}".encode("ascii"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _target(result: dict) -> Optional[str]:
+    action = result.get("action") or {}
+    return action.get("target") if isinstance(action, dict) else None
+
+
+class _SimulatedTable:
+    """Plays one engine to completion with fallback actions for every seat."""
+
+    def __init__(self, engine: GameEngine, fallback: FallbackStrategies) -> None:
+        self.engine = engine
+        self.fallback = fallback
+        self.rejected = 0
+
+    def _submit(self, fn, *args, **kwargs) -> bool:
+        try:
+            fn(*args, **kwargs)
+        except ValueError:
+            self.rejected += 1
+            return False
+        return True
+
+    def _act_with_retry(self, strategy: str, context: dict, submit) -> None:
+        """Submit the fallback pick; on rejection retry once without the rejected target."""
+        target = _target(self.fallback.get_action(strategy, context))
+        if self._submit(submit, target) or not target:
+            return
+        retry = dict(context, alive_player_ids=[pid for pid in context["alive_player_ids"] if pid != target])
+        retry_target = _target(self.fallback.get_action(strategy, retry))
+        if retry_target:
+            self._submit(submit, retry_target)
+
+    def _act_witch(self, alive: List[str]) -> None:
+        engine = self.engine
+        witch = engine._find_alive_role(Role.WITCH)
+        if witch is None:
+            return
+        context = {
+            "player_id": witch.player_id,
+            "alive_player_ids": [pid for pid in alive if pid != witch.player_id],
+            "wolf_target_id": engine.snapshot.round_context.wolf_target,
+            "role_capability": {
+                "can_use_antidote": not witch.used_antidote,
+                "can_use_poison": not witch.used_poison,
+            },
+        }
+        save, target = self._witch_pick(context)
+        if self._submit(engine.submit_night_action, witch.player_id, target, save=save) or not (save or target):
+            return
+        # Fall back to poison or skip: no antidote, and never the rejected poison target.
+        context["alive_player_ids"] = [pid for pid in context["alive_player_ids"] if pid != target]
+        context["role_capability"]["can_use_antidote"] = False
+        save, target = self._witch_pick(context)
+        if target:
+            self._submit(engine.submit_night_action, witch.player_id, target, save=save)
+
+    def _witch_pick(self, context: dict) -> Tuple[bool, Optional[str]]:
+        result = self.fallback.get_action("night_witch", context)
+        save = bool((result.get("action") or {}).get("save", False))
+        # A save action names the wolf target; only a non-save target is a poison target.
+        return save, None if save else _target(result)
+
+    def act(self, phase: Phase) -> None:
+        engine = self.engine
+        index = engine.players_index
+        alive = index.alive_ids()
+        if phase == Phase.NIGHT_WOLF:
+            wolves = index.alive_ids(Role.WEREWOLF)
+            for wolf_id in wolves:
+                self._act_with_retry(
+                    "night_wolf",
+                    {"player_id": wolf_id, "alive_player_ids": alive, "wolf_team_ids": wolves},
+                    lambda target, wolf_id=wolf_id: engine.submit_night_action(wolf_id, target),
+                )
+        elif phase == Phase.NIGHT_WITCH:
+            self._act_witch(alive)
+        elif phase in _NIGHT_STRATEGIES:
+            role, strategy = _NIGHT_STRATEGIES[phase]
+            actor = engine._find_alive_role(role)
+            if actor is None:
+                return
+            context = {"player_id": actor.player_id, "alive_player_ids": alive}
+            if role == Role.GUARD:
+                context["last_guard_target_id"] = actor.last_guard_target
+            else:
+                context["last_seer_target_id"] = actor.last_seer_target
+            self._act_with_retry(
+                strategy, context, lambda target: engine.submit_night_action(actor.player_id, target)
+            )
+        elif phase == Phase.DAY_VOTE:
+            for voter_id in index.voter_ids():
+                self._act_with_retry(
+                    "day_vote",
+                    {"player_id": voter_id, "alive_player_ids": alive},
+                    lambda target, voter_id=voter_id: engine.submit_vote(voter_id, target),
+                )
+
+    def shoot_if_needed(self) -> None:
+        engine = self.engine
+        for player in engine.snapshot.players.values():
+            if player.role != Role.HUNTER or player.alive or not player.can_hunter_shoot:
+                continue
+            result = self.fallback.get_action(
+                "hunter_shot",
+                {"player_id": player.player_id, "alive_player_ids": engine.players_index.alive_ids()},
+            )
+            target = _target(result)
+            if target:
+                self._submit(engine.submit_hunter_shot, player.player_id, target)
+            player.can_hunter_shoot = False
+
+
+def play_game(config: GameConfig, seed: int, max_steps: int = SIM_MAX_STEPS) -> GameResult:
+    """Play one full game; the global ``random`` state is restored afterwards."""
+    saved_state = random.getstate()
+    random.seed(seed)
+    try:
+        engine = GameEngine(room_id=f"sim-{seed:x}", owner_id=SIM_OWNER_ID, config=config)
+        for seat in range(config.total_players):
+            engine.add_player(f"p{seat + 1}", f"P{seat + 1}")
+        engine.start_game(SIM_OWNER_ID)
+        table = _SimulatedTable(engine, FallbackStrategies(rng=random.Random(seed)))
+        phase_seconds: Dict[str, float] = {}
+        phase_counts: Dict[str, int] = {}
+        snapshot = engine.snapshot
+        steps = 0
+        while not snapshot.game_over and steps < max_steps:
+            phase = snapshot.phase
+            started = time.perf_counter()
+            table.act(phase)
+            engine.advance_phase()
+            table.shoot_if_needed()
+            elapsed = time.perf_counter() - started
+            phase_seconds[phase.value] = phase_seconds.get(phase.value, 0.0) + elapsed
+            phase_counts[phase.value] = phase_counts.get(phase.value, 0) + 1
+            steps += 1
+        winner = snapshot.winner.value if isinstance(snapshot.winner, Winner) else None
+        return GameResult(
+            player_count=config.player_count,
+            winner=winner,
+            rounds=snapshot.round_context.round_no,
+            rejected_actions=table.rejected,
+            phase_seconds=phase_seconds,
+            phase_counts=phase_counts,
+        )
+    finally:
+        random.setstate(saved_state)
+
+
+def _run_batch(
+    player_count: int,
+    custom_role_config: Optional[Dict[str, Any]],
+    base_seed: int,
+    game_numbers: Sequence[int],
+) -> List[GameResult]:
+    config = default_game_config(
+        player_count=player_count,
+        custom_role_config=custom_role_config,
+        admin_override=custom_role_config is not None,
+    )
+    return [play_game(config, game_seed(base_seed, player_count, game_no)) for game_no in game_numbers]
+
+
+def _batches(games: int, batch_size: int) -> Iterator[range]:
+    for start in range(0, games, batch_size):
+        yield range(start, min(games, start + batch_size))
+
+
+def summarize(config: GameConfig, results: Sequence[GameResult]) -> Dict[str, Any]:
+    games = len(results)
+    wolf_wins = sum(1 for r in results if r.winner == Winner.WOLF.value)
+    good_wins = sum(1 for r in results if r.winner == Winner.GOOD.value)
+    rounds = [r.rounds for r in results]
+    phase_seconds: Dict[str, float] = {}
+    phase_counts: Dict[str, int] = {}
+    for result in results:
+        for phase, seconds in result.phase_seconds.items():
+            phase_seconds[phase] = phase_seconds.get(phase, 0.0) + seconds
+            phase_counts[phase] = phase_counts.get(phase, 0) + result.phase_counts.get(phase, 0)
+    return {
+        "player_count": config.player_count,
+        "role_distribution": dict(config.role_distribution),
+        "night_order": list(config.night_order),
+        "warnings": list(config.warnings),
+        "games": games,
+        "wolf_wins": wolf_wins,
+        "good_wins": good_wins,
+        "unfinished": games - wolf_wins - good_wins,
+        "wolf_win_rate": round(wolf_wins / games, 4) if games else 0.0,
+        "good_win_rate": round(good_wins / games, 4) if games else 0.0,
+        "rounds_mean": round(sum(rounds) / games, 3) if games else 0.0,
+        "rounds_min": min(rounds, default=0),
+        "rounds_max": max(rounds, default=0),
+        "rejected_actions": sum(r.rejected_actions for r in results),
+        "phase_mean_us": {
+            phase: round(phase_seconds[phase] / phase_counts[phase] * 1e6, 2)
+            for phase in sorted(phase_seconds)
+            if phase_counts.get(phase)
+        },
+    }
+
+
+def run_simulation(
+    player_counts: Sequence[int],
+    games: int,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    custom_role_config: Optional[Dict[str, Any]] = None,
+    batch_size: int = SIM_BATCH_GAMES,
+) -> Dict[str, Any]:
+    """Run ``games`` games per player count and return the summary report.
+
+    ``workers=1`` runs in-process; otherwise batches go to a ``ProcessPoolExecutor``.
+    Results only depend on ``seed``, not on ``workers`` or ``batch_size``.
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    configs = {
+        count: default_game_config(
+            player_count=count,
+            custom_role_config=custom_role_config,
+            admin_override=custom_role_config is not None,
+        )
+        for count in player_counts
+    }
+    jobs = [(count, batch) for count in player_counts for batch in _batches(games, max(1, batch_size))]
+    results: Dict[int, List[GameResult]] = {count: [] for count in player_counts}
+    started = time.perf_counter()
+    if workers == 1:
+        for count, batch in jobs:
+            results[count].extend(_run_batch(count, custom_role_config, seed, batch))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                (count, pool.submit(_run_batch, count, custom_role_config, seed, batch)) for count, batch in jobs
+            ]
+            for count, future in futures:
+                results[count].extend(future.result())
+    elapsed = time.perf_counter() - started
+    total_games = sum(len(items) for items in results.values())
+    return {
+        "seed": seed,
+        "workers": workers,
+        "games_per_template": games,
+        "total_games": total_games,
+        "elapsed_seconds": round(elapsed, 4),
+        "games_per_second": round(total_games / elapsed, 2) if elapsed > 0 else 0.0,
+        "templates": [summarize(configs[count], results[count]) for count in player_counts],
+    }
+
+
+def report_to_csv(report: Dict[str, Any]) -> str:
+    phases = sorted({phase for item in report["templates"] for phase in item["phase_mean_us"]})
+    columns = [
+        "player_count",
+        "games",
+        "wolf_win_rate",
+        "good_win_rate",
+        "unfinished",
+        "rounds_mean",
+        "rounds_min",
+        "rounds_max",
+        "rejected_actions",
+        "warnings",
+    ] + [f"{phase}_mean_us" for phase in phases]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for item in report["templates"]:
+        row = [item[name] for name in columns[:9]] + ["; ".join(item["warnings"])]
+        row.extend(item["phase_mean_us"].get(phase, "") for phase in phases)
+        writer.writerow(row)
+    return buffer.getvalue()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Headless fallback-only werewolf simulation")
+    parser.add_argument("--games", type=int, default=1000, help="games per player count")
+    parser.add_argument("--player-counts", type=int, nargs="+", default=[8, 9, 10, 11, 12])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=SIM_BATCH_GAMES)
+    parser.add_argument("--role-config", default=None, help="JSON file with a custom role distribution")
+    parser.add_argument("--format", choices=["json", "csv"], default="json")
+    parser.add_argument("--output", default=None, help="write the summary here instead of stdout")
+    args = parser.parse_args(argv)
+
+    custom_role_config = None
+    if args.role_config:
+        with open(args.role_config, encoding="utf-8") as fh:
+            custom_role_config = json.load(fh)
+
+    report = run_simulation(
+        player_counts=args.player_counts,
+        games=max(1, args.games),
+        seed=args.seed,
+        workers=args.workers,
+        custom_role_config=custom_role_config,
+        batch_size=args.batch_size,
+    )
+    text = report_to_csv(report) if args.format == "csv" else json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as fh:
+            fh.write(text)
+    else:
+        sys.stdout.write(text if text.endswith("\n") else text + "\n")
+    print(
+        f"{report['total_games']} games in {report['elapsed_seconds']:.2f}s "
+        f"({report['games_per_second']:.1f} games/s, workers={report['workers']})",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
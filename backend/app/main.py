@@ -7,10 +7,13 @@ import logging
 import os
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.agent.prometheus import CONTENT_TYPE as PROMETHEUS_CONTENT_TYPE, render_ws_metrics
 from app.api.deps import room_manager
 from app.config.frontend_profile_env import load_frontend_profile
+from app.core.models import Phase, Role
 from app.api.rest import router as rest_router
 from app.websocket.handler import ws_manager
 
@@ -47,10 +50,23 @@ def health() -> dict:
         "status": "ok",
         "service": "werewolf-backend",
         "summary": room_manager.health_summary(),
+        "websocket": ws_manager.metrics_snapshot(),
         "auto_bootstrap": getattr(app.state, "auto_bootstrap", {"status": "not-run"}),
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    text = room_manager.scheduler_metrics_text() + render_ws_metrics(ws_manager.metrics_snapshot())
+    return PlainTextResponse(text, media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@app.on_event("startup")
+async def warm_agent_pool_on_startup() -> None:
+    # No-op unless CAT_AGENT_WARM_POOL_SIZE > 0; the pool fills in a background thread.
+    room_manager.child_agents.warm_pool.start()
+
+
 @app.on_event("startup")
 async def auto_bootstrap_on_startup() -> None:
     try:
@@ -97,27 +113,40 @@ async def auto_bootstrap_on_startup() -> None:
 @app.on_event("shutdown")
 async def cleanup_on_shutdown() -> None:
     try:
-        await asyncio.to_thread(room_manager.shutdown_cleanup)
+        await room_manager.shutdown_cleanup()
         logger.info("graceful shutdown cleanup completed: child agent ports released")
     except Exception as exc:  # noqa: BLE001
         logger.exception("shutdown cleanup failed: %s", exc)
 
 
+_NIGHT_PHASE_ROLES = {
+    Phase.NIGHT_WOLF: Role.WEREWOLF,
+    Phase.NIGHT_GUARD: Role.GUARD,
+    Phase.NIGHT_WITCH: Role.WITCH,
+    Phase.NIGHT_SEER: Role.SEER,
+}
+
+
+def _resume_event_id(raw: object) -> int | None:
+    """Client-supplied resume point; anything but a non-negative integer means no resume."""
+    if isinstance(raw, bool):
+        return None
+    try:
+        value = int(raw)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return None
+    return value if value >= 0 else None
+
+
 def _active_players_for_phase(room) -> list[str]:
     phase = room.engine.snapshot.phase
-    players = room.engine.snapshot.players.values()
-    if phase.value == "night_wolf":
-        return [p.player_id for p in players if p.alive and p.role and p.role.value == "werewolf"]
-    if phase.value == "night_guard":
-        return [p.player_id for p in players if p.alive and p.role and p.role.value == "guard"]
-    if phase.value == "night_witch":
-        return [p.player_id for p in players if p.alive and p.role and p.role.value == "witch"]
-    if phase.value == "night_seer":
-        return [p.player_id for p in players if p.alive and p.role and p.role.value == "seer"]
-    if phase.value == "day_vote":
-        return [p.player_id for p in players if p.alive and p.can_vote]
-    if phase.value == "day_discuss":
-        return [p.player_id for p in players if p.alive]
+    index = room.engine.players_index
+    if phase in _NIGHT_PHASE_ROLES:
+        return index.alive_ids(_NIGHT_PHASE_ROLES[phase])
+    if phase == Phase.DAY_VOTE:
+        return index.voter_ids()
+    if phase == Phase.DAY_DISCUSS:
+        return index.alive_ids()
     return []
 
 
@@ -140,27 +169,15 @@ def _god_view_for_phase(room) -> dict | None:
     }
 
 
-@app.websocket("/ws/{room_id}/{player_id}")
-async def room_ws(websocket: WebSocket, room_id: str, player_id: str) -> None:
-    await ws_manager.connect(room_id, player_id, websocket)
-
-
-@app.websocket("/ws/chat/{room_id}")
-async def autonomous_chat_ws(websocket: WebSocket, room_id: str) -> None:
-    """自主聊天 WebSocket 端点 - 实时接收 AI 猫对话消息"""
-    await autonomous_chat_websocket_endpoint(websocket, room_id)
-
-
 @app.websocket("/ws/chat/{room_id}")
 async def autonomous_chat_ws(websocket: WebSocket, room_id: str) -> None:
     """自主聊天 WebSocket 端点 - 实时接收 AI 猫对话消息"""
     await autonomous_chat_websocket_endpoint(websocket, room_id)
 
 
-@app.websocket("/ws/chat/{room_id}")
-async def autonomous_chat_ws(websocket: WebSocket, room_id: str) -> None:
-    """自主聊天 WebSocket 端点 - 实时接收 AI 猫对话消息"""
-    await autonomous_chat_websocket_endpoint(websocket, room_id)
+@app.websocket("/ws/{room_id}/{player_id}")
+async def room_ws(websocket: WebSocket, room_id: str, player_id: str) -> None:
+    await ws_manager.connect(room_id, player_id, websocket)
     try:
         room = room_manager.must_get_room(room_id)
         room.engine.mark_online_status(player_id, True)
@@ -183,7 +200,13 @@ async def autonomous_chat_ws(websocket: WebSocket, room_id: str) -> None:
 
             if event == "subscribe":
                 view_mode = msg.get("view_mode", "god")
-                await ws_manager.update_view_mode(websocket, view_mode)
+                delta = bool(msg.get("delta"))
+                resumed = await ws_manager.subscribe(
+                    websocket,
+                    view_mode,
+                    delta=delta,
+                    last_event_id=_resume_event_id(msg.get("last_event_id")),
+                )
                 await ws_manager.send_event(
                     websocket,
                     "subscribed",
@@ -191,11 +214,19 @@ async def autonomous_chat_ws(websocket: WebSocket, room_id: str) -> None:
                         "room_id": room_id,
                         "player_id": player_id,
                         "view_mode": view_mode,
+                        "delta": delta,
+                        "resumed": resumed,
                     },
                 )
                 await ws_manager.broadcast_room_state(room_id, room.engine.public_state())
                 continue
 
+            if event == "resync":
+                sub = await ws_manager.subscriber(websocket)
+                await ws_manager.subscribe(websocket, sub.view_mode if sub else "god", delta=True)
+                await ws_manager.broadcast_room_state(room_id, room.engine.public_state())
+                continue
+
             if event == "change_view":
                 view_mode = msg.get("mode", "god")
                 await ws_manager.update_view_mode(websocket, view_mode)
@@ -237,7 +268,7 @@ async def autonomous_chat_ws(websocket: WebSocket, room_id: str) -> None:
             )
 
             if state["game_over"]:
-                room_manager.remove_room_if_game_over(room_id)
+                await room_manager.aremove_room_if_game_over(room_id)
 
     except WebSocketDisconnect:
         room = room_manager.get_room(room_id)
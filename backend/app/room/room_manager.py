@@ -1,29 +1,41 @@
 from __future__ import annotations
 
 import asyncio
+import copy
+import os
 import uuid
 import time
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
+from functools import partial
 from threading import RLock
 from typing import Any, Awaitable, Callable, Dict, Optional
 
 import httpx
 
 from app.agent.ai_god_orchestrator import AIGodOrchestrator, GodAgentConfig
-from app.agent.child_process_manager import ChildAgentProcessManager
+from app.agent.child_process_manager import AGENT_MODE_PROCESS, ChildAgentProcessManager
 from app.agent.god_orchestrator import GodOrchestrator
+from app.agent.ipc_transport import TRANSPORT_TCP, ipc_url, sync_client
+from app.agent.model_preflight import ModelPreflightCache, model_preflights, preflight_key
+from app.agent.prometheus import render_scheduler_metrics
 from app.config.frontend_profile_env import load_frontend_profile
+from app.core.audit_event import as_dict
 from app.core.game_config import default_game_config
 from app.engine.game_engine import GameEngine
+from app.room.room_registry import ShardedRoomRegistry
+from app.room.state_publisher import CoalescingStatePublisher
 from app.storage.repository import SQLiteRepository
+from app.websocket.handler import ws_manager
 
 from typing import Union
 
 
 logger = logging.getLogger("uvicorn.error")
 
+PROGRESS_EVENT_TYPES = frozenset({"agent_speech", "god_narration", "phase_change", "vote_result", "death"})
+
 
 @dataclass(slots=True)
 class Room:
@@ -32,19 +44,32 @@ class Room:
     orchestrator: Union[GodOrchestrator, AIGodOrchestrator]
     sockets: Dict[str, object] = field(default_factory=dict)
     ai_god_enabled: bool = False
+    lock: RLock = field(default_factory=RLock, repr=False)
+    finalized: bool = False
 
 
 class RoomManager:
-    def __init__(self, repository: Optional[SQLiteRepository] = None) -> None:
-        self._rooms: Dict[str, Room] = {}
+    def __init__(
+        self,
+        repository: Optional[SQLiteRepository] = None,
+        preflights: Optional[ModelPreflightCache] = None,
+    ) -> None:
+        self._rooms: ShardedRoomRegistry[Room] = ShardedRoomRegistry()
+        # Serializes registry-wide lifecycle changes (bootstrap/replace-all); lookups never take it.
         self._lock = RLock()
         self.repository = repository or SQLiteRepository("./backend/data/werewolf.db")
         self.child_agents = ChildAgentProcessManager()
-
-    def shutdown_cleanup(self) -> None:
-        self.child_agents.stop_all()
-        with self._lock:
-            self._rooms.clear()
+        self.preflights = preflights or model_preflights
+        max_rate = float(os.getenv("CAT_PROGRESS_MAX_RATE_HZ", "4"))
+        self.progress_min_interval_sec = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.replay_page_max = max(1, int(os.getenv("CAT_REPLAY_PAGE_MAX", "500")))
+
+    async def shutdown_cleanup(self) -> None:
+        for room in self._rooms.values():
+            await room.orchestrator.scheduler.aclose()
+        await asyncio.to_thread(self.child_agents.stop_all)
+        await asyncio.to_thread(self.repository.close)
+        self._rooms.clear()
 
     def create_room(
         self,
@@ -53,24 +78,23 @@ class RoomManager:
         custom_role_config: Optional[dict] = None,
         admin_override: bool = False,
     ) -> dict:
-        with self._lock:
-            room_id = self._new_room_id()
-            owner_id = self._new_player_id()
-            config = default_game_config(
-                player_count=player_count,
-                custom_role_config=custom_role_config,
-                admin_override=admin_override,
-            )
-            engine = GameEngine(room_id=room_id, owner_id=owner_id, config=config)
-            engine.add_player(owner_id, owner_nickname)
-            room = Room(room_id=room_id, engine=engine, orchestrator=GodOrchestrator())
-            self._rooms[room_id] = room
-            return {
-                "room_id": room_id,
-                "owner_id": owner_id,
-                "player_count": config.player_count,
-                "role_distribution": config.role_distribution,
-            }
+        room_id = self._new_room_id()
+        owner_id = self._new_player_id()
+        config = default_game_config(
+            player_count=player_count,
+            custom_role_config=custom_role_config,
+            admin_override=admin_override,
+        )
+        engine = GameEngine(room_id=room_id, owner_id=owner_id, config=config)
+        engine.add_player(owner_id, owner_nickname)
+        room = Room(room_id=room_id, engine=engine, orchestrator=GodOrchestrator())
+        self._rooms.put(room_id, room)
+        return {
+            "room_id": room_id,
+            "owner_id": owner_id,
+            "player_count": config.player_count,
+            "role_distribution": config.role_distribution,
+        }
 
     def bootstrap_from_frontend_env(self) -> dict:
         profile = load_frontend_profile()
@@ -111,16 +135,17 @@ class RoomManager:
         if ai_god and player_count < 8:
             raise ValueError("启用AI法官时，除法官外至少需要 8 只参赛猫猫（当前不足）")
 
-        stale_room_ids: list[str] = []
+        stale_rooms: list[Room] = []
         with self._lock:
+            existing_rooms = self._rooms.values()
             active_started = any(
                 r.engine.snapshot.started and not r.engine.snapshot.game_over
-                for r in self._rooms.values()
+                for r in existing_rooms
             )
             if active_started:
                 raise ValueError("游戏已开始，不能再切换/设定 AI 法官模式；请在开局前设置")
 
-            for existing in self._rooms.values():
+            for existing in existing_rooms:
                 existing_players = list(existing.engine.snapshot.players.values())
                 if (
                     not existing.engine.snapshot.started
@@ -148,11 +173,13 @@ class RoomManager:
                         "source": "existing_room",
                     }
 
-            stale_room_ids = [room_id for room_id in self._rooms.keys()]
-            self._rooms.clear()
+            # create_room does not take self._lock: remove only the rooms inspected above, so a
+            # room registered concurrently is left alone.
+            stale_rooms = [room for room in existing_rooms if self._rooms.pop(room.room_id) is not None]
 
-        for room_id in stale_room_ids:
-            self.child_agents.stop_room(room_id)
+        for stale in stale_rooms:
+            self.child_agents.stop_room(stale.room_id)
+            self._release_dropped_room(stale)
 
         selected_provider = str((selected_god_cat or {}).get("provider") or "").strip().lower()
         selected_custom_compat = str((selected_god_cat or {}).get("customCompat") or "openai").strip().lower()
@@ -227,6 +254,9 @@ class RoomManager:
             cli_command=monitor_cfg.get("cliCommand") or None,
             cli_timeout_sec=45,
             cat_configs=participant_cats,
+            agent_mode=monitor_cfg.get("agentMode") or None,
+            agent_transport=monitor_cfg.get("agentTransport") or None,
+            preflight_check=bool(monitor_cfg.get("preflightCheck")),
         )
 
         return {
@@ -254,52 +284,50 @@ class RoomManager:
         god_provider: Optional[str] = None,
         god_temperature: Optional[float] = None,
     ) -> dict:
-        with self._lock:
-            if ai_god and (not god_api_url or not god_api_key):
-                raise ValueError("ai_god enabled but missing god_api_url/god_api_key")
-
-            room_id = self._new_room_id()
-            owner_id = "cat_01"
-            config = default_game_config(
-                player_count=player_count,
-                custom_role_config=custom_role_config,
-                admin_override=admin_override,
-            )
-            engine = GameEngine(room_id=room_id, owner_id=owner_id, config=config)
-
-            if ai_god:
-                god_cfg = GodAgentConfig(
-                    api_url=god_api_url,
-                    api_key=god_api_key,
-                    model_name=god_model_name or "gpt-4o-mini",
-                    provider=god_provider or "openai",
-                    temperature=god_temperature if god_temperature is not None else 0.7,
-                )
-                orchestrator: Union[GodOrchestrator, AIGodOrchestrator] = AIGodOrchestrator(god_config=god_cfg)
-            else:
-                orchestrator = GodOrchestrator()
-
-            room = Room(
-                room_id=room_id,
-                engine=engine,
-                orchestrator=orchestrator,
-                ai_god_enabled=bool(ai_god),
+        if ai_god and (not god_api_url or not god_api_key):
+            raise ValueError("ai_god enabled but missing god_api_url/god_api_key")
+
+        room_id = self._new_room_id()
+        owner_id = "cat_01"
+        config = default_game_config(
+            player_count=player_count,
+            custom_role_config=custom_role_config,
+            admin_override=admin_override,
+        )
+        engine = GameEngine(room_id=room_id, owner_id=owner_id, config=config)
+
+        if ai_god:
+            god_cfg = GodAgentConfig(
+                api_url=god_api_url,
+                api_key=god_api_key,
+                model_name=god_model_name or "gpt-4o-mini",
+                provider=god_provider or "openai",
+                temperature=god_temperature if god_temperature is not None else 0.7,
             )
-            self._rooms[room_id] = room
-
-            for idx in range(1, config.total_players + 1):
-                pid = f"cat_{idx:02d}"
-                nickname = owner_nickname if idx == 1 else pid
-                engine.add_player(pid, nickname)
-
-            return {
-                "room_id": room_id,
-                "owner_id": owner_id,
-                "player_count": config.player_count,
-                "role_distribution": config.role_distribution,
-                "players": [p.player_id for p in engine.snapshot.players.values()],
-                "ai_god": room.ai_god_enabled,
-            }
+            orchestrator: Union[GodOrchestrator, AIGodOrchestrator] = AIGodOrchestrator(god_config=god_cfg)
+        else:
+            orchestrator = GodOrchestrator()
+
+        room = Room(
+            room_id=room_id,
+            engine=engine,
+            orchestrator=orchestrator,
+            ai_god_enabled=bool(ai_god),
+        )
+        for idx in range(1, config.total_players + 1):
+            pid = f"cat_{idx:02d}"
+            nickname = owner_nickname if idx == 1 else pid
+            engine.add_player(pid, nickname)
+        self._rooms.put(room_id, room)
+
+        return {
+            "room_id": room_id,
+            "owner_id": owner_id,
+            "player_count": config.player_count,
+            "role_distribution": config.role_distribution,
+            "players": [p.player_id for p in engine.snapshot.players.values()],
+            "ai_god": room.ai_god_enabled,
+        }
 
     def join_room(self, room_id: str, nickname: str) -> dict:
         room = self.get_room(room_id)
@@ -307,12 +335,14 @@ class RoomManager:
             raise ValueError("room not found")
 
         player_id = self._new_player_id()
-        room.engine.add_player(player_id, nickname)
+        with room.lock:
+            room.engine.add_player(player_id, nickname)
         return {"room_id": room_id, "player_id": player_id}
 
     def start_game(self, room_id: str, owner_id: str) -> None:
         room = self.must_get_room(room_id)
-        room.engine.start_game(owner_id)
+        with room.lock:
+            room.engine.start_game(owner_id)
 
     def register_agent(
         self,
@@ -333,10 +363,11 @@ class RoomManager:
         room = self.must_get_room(room_id)
         if player_id not in room.engine.snapshot.players:
             raise ValueError("player not found")
-        if not skip_endpoint_check:
+        self.child_agents.assert_managed_socket(ipc_endpoint)
+        if not skip_endpoint_check and not self.child_agents.is_ready(ipc_endpoint):
             self._assert_agent_endpoint(ipc_endpoint)
         if preflight_check:
-            self._assert_agent_model_access(
+            self._preflight_model_access(
                 ipc_endpoint=ipc_endpoint,
                 player_id=player_id,
                 api_url=api_url,
@@ -347,6 +378,7 @@ class RoomManager:
             )
         if isinstance(nickname, str) and nickname.strip():
             room.engine.snapshot.players[player_id].nickname = nickname.strip()
+            room.engine.mark_state_changed()
         reg = room.orchestrator.scheduler.registry.register(
             player_id=player_id,
             ipc_endpoint=ipc_endpoint,
@@ -392,9 +424,11 @@ class RoomManager:
         player = room.engine.snapshot.players.get(player_id)
         if not player:
             raise ValueError("player not found")
-        self._assert_agent_endpoint(ipc_endpoint)
+        self.child_agents.assert_managed_socket(ipc_endpoint)
+        if not self.child_agents.is_ready(ipc_endpoint):
+            self._assert_agent_endpoint(ipc_endpoint)
         if preflight_check:
-            self._assert_agent_model_access(
+            self._preflight_model_access(
                 ipc_endpoint=ipc_endpoint,
                 player_id=player_id,
                 api_url=api_url,
@@ -419,6 +453,7 @@ class RoomManager:
         player.entrusted = False
         if reset_role_runtime_state:
             player.can_hunter_shoot = False
+        room.engine.mark_state_changed()
 
         invoke_mode = (
             "cli"
@@ -451,10 +486,15 @@ class RoomManager:
         cli_command: Optional[str],
         cli_timeout_sec: int,
         cat_configs: Optional[list[dict]] = None,
+        agent_mode: Optional[str] = None,
+        agent_transport: Optional[str] = None,
+        preflight_check: bool = False,
     ) -> dict:
         room = self.must_get_room(room_id)
         players = list(room.engine.snapshot.players.values())
         player_ids = [p.player_id for p in players]
+        agent_mode = (agent_mode or os.getenv("CAT_AGENT_MODE") or AGENT_MODE_PROCESS).strip().lower()
+        agent_transport = (agent_transport or os.getenv("CAT_AGENT_TRANSPORT") or TRANSPORT_TCP).strip().lower()
 
         existing_child_processes = self.child_agents.status(room_id)
         reusable = len(existing_child_processes) == len(player_ids) and len(player_ids) > 0
@@ -467,7 +507,11 @@ class RoomManager:
                 running = bool(proc_info.get("running"))
                 reg = room.orchestrator.scheduler.registry.get(player_id)
                 reg_endpoint = (reg.ipc_endpoint if reg else "").rstrip("/")
-                if not (running and endpoint and reg and reg.online and reg_endpoint == endpoint):
+                same_mode = (
+                    proc_info.get("mode", AGENT_MODE_PROCESS) == agent_mode
+                    and proc_info.get("transport", TRANSPORT_TCP) == agent_transport
+                )
+                if not (running and same_mode and endpoint and reg and reg.online and reg_endpoint == endpoint):
                     reusable = False
                     break
                 existing_endpoints[player_id] = endpoint
@@ -508,6 +552,8 @@ class RoomManager:
                         "cli_timeout_sec": cli_timeout_sec,
                     },
                     "startup_mode": "reused",
+                    "agent_mode": agent_mode,
+                    "agent_transport": agent_transport,
                     "endpoints": existing_endpoints,
                     "registered_agents": {
                         "count": len(reused_agents),
@@ -525,6 +571,8 @@ class RoomManager:
             host=host,
             start_port=start_port,
             startup_timeout_sec=startup_timeout_sec,
+            mode=agent_mode,
+            transport=agent_transport,
         )
         registration = self._register_bootstrap_agents_with_retry(
             room_id=room_id,
@@ -538,10 +586,12 @@ class RoomManager:
             cli_command=cli_command,
             cli_timeout_sec=cli_timeout_sec,
             cat_configs=cat_configs,
+            preflight_check=preflight_check,
         )
 
         logger.info(
-            "[BootstrapAgents] mode=parallel room_id=%s players=%s retries_total=%s retried_agents=%s",
+            "[BootstrapAgents] mode=parallel agent_mode=%s room_id=%s players=%s retries_total=%s retried_agents=%s",
+            agent_mode,
             room_id,
             len(player_ids),
             registration.get("retries_total", 0),
@@ -560,6 +610,8 @@ class RoomManager:
                 "cli_timeout_sec": cli_timeout_sec,
             },
             "startup_mode": "parallel",
+            "agent_mode": agent_mode,
+            "agent_transport": agent_transport,
             "endpoints": endpoints,
             "registered_agents": registration,
             "child_processes": self.child_agents.status(room_id),
@@ -579,6 +631,7 @@ class RoomManager:
         cli_command: Optional[str],
         cli_timeout_sec: int,
         cat_configs: Optional[list[dict]] = None,
+        preflight_check: bool = False,
     ) -> Dict[str, Any]:
         room = self.must_get_room(room_id)
         cats = cat_configs if isinstance(cat_configs, list) else []
@@ -621,6 +674,12 @@ class RoomManager:
                 }
             )
 
+        preflight = (
+            self._preflight_bootstrap_providers(player_configs, cli_command, cli_timeout_sec)
+            if preflight_check
+            else None
+        )
+
         def _register_one(cfg: dict) -> dict:
             player_id_local = cfg["player_id"]
             attempt_local = 0
@@ -670,13 +729,83 @@ class RoomManager:
                 if int(reg.get("attempts") or 1) > 1:
                     retried_agents += 1
 
-        return {
+        result = {
             "count": len(registered),
             "mode": "parallel",
             "retries_total": retries_total,
             "retried_agents": retried_agents,
             "agents": registered,
         }
+        if preflight is not None:
+            result["preflight"] = preflight
+        return result
+
+    def _preflight_bootstrap_providers(
+        self,
+        player_configs: list[dict],
+        cli_command: Optional[str],
+        cli_timeout_sec: int,
+    ) -> Dict[str, Any]:
+        """Check model access once per distinct provider, all providers concurrently.
+
+        Cats sharing ``api_url``/``model_name``/key are probed through one representative
+        endpoint; recent successes come from the shared TTL cache without a round trip.
+        """
+        probes: Dict[str, Any] = {}
+        labels: Dict[str, str] = {}
+        for cfg in player_configs:
+            key = preflight_key(cfg["api_url"], cfg["api_key"], cfg["model_name"], cli_command)
+            if key is None or key in probes:
+                continue
+            probes[key] = partial(
+                self._assert_agent_model_access,
+                ipc_endpoint=cfg["endpoint"],
+                player_id=cfg["player_id"],
+                api_url=cfg["api_url"],
+                api_key=cfg["api_key"],
+                model_name=cfg["model_name"],
+                cli_command=cli_command,
+                cli_timeout_sec=cli_timeout_sec,
+            )
+            labels[key] = "cli" if cli_command else f"{cfg['api_url']} ({cfg['model_name'] or 'default'})"
+
+        outcomes = self.preflights.check_many(probes)
+        errors = [f"{labels[key]}: {outcome}" for key, outcome in outcomes.items() if isinstance(outcome, Exception)]
+        if errors:
+            raise ValueError("model preflight failed: " + "; ".join(errors))
+        return {
+            "providers": len(probes),
+            "cached": sum(1 for outcome in outcomes.values() if outcome is True),
+            "probed": sum(1 for outcome in outcomes.values() if outcome is False),
+        }
+
+    def _preflight_model_access(
+        self,
+        *,
+        ipc_endpoint: str,
+        player_id: str,
+        api_url: Optional[str],
+        api_key: Optional[str],
+        model_name: Optional[str],
+        cli_command: Optional[str],
+        cli_timeout_sec: int,
+    ) -> None:
+        key = preflight_key(api_url, api_key, model_name, cli_command)
+        if key is None:
+            return
+        self.preflights.check(
+            key,
+            partial(
+                self._assert_agent_model_access,
+                ipc_endpoint=ipc_endpoint,
+                player_id=player_id,
+                api_url=api_url,
+                api_key=api_key,
+                model_name=model_name,
+                cli_command=cli_command,
+                cli_timeout_sec=cli_timeout_sec,
+            ),
+        )
 
     def teardown_agents(self, room_id: str) -> dict:
         self.child_agents.stop_room(room_id)
@@ -687,6 +816,9 @@ class RoomManager:
         return {
             "room_id": room_id,
             "child_processes": self.child_agents.status(room_id),
+            "warm_pool": self.child_agents.pool_status(),
+            "multiplexed_hosts": self.child_agents.multiplexed_status(),
+            "model_preflight": self.preflights.status(),
         }
 
     @staticmethod
@@ -694,12 +826,12 @@ class RoomManager:
         base = (ipc_endpoint or "").strip().rstrip("/")
         if not base:
             raise ValueError("ipc_endpoint is required")
-        health_url = base + "/health"
+        health_url = ipc_url(base, "/health")
         deadline = time.time() + 8.0
         last_error = "unknown"
         while time.time() < deadline:
             try:
-                with httpx.Client(timeout=2.5) as client:
+                with sync_client(base, timeout=2.5) as client:
                     resp = client.get(health_url)
                 if resp.status_code < 400:
                     return
@@ -726,7 +858,7 @@ class RoomManager:
         if not (cli_command or (api_url and api_key)):
             return
 
-        url = (ipc_endpoint or "").strip().rstrip("/") + "/act"
+        url = ipc_url(ipc_endpoint, "/act")
         payload = {
             "session_id": "bootstrap-preflight",
             "player_id": player_id,
@@ -750,7 +882,7 @@ class RoomManager:
         timeout = httpx.Timeout(connect=5.0, read=45.0, write=10.0, pool=5.0)
 
         def _once() -> None:
-            with httpx.Client(timeout=timeout) as client:
+            with sync_client(ipc_endpoint, timeout=timeout) as client:
                 resp = client.post(url, json=payload)
             if resp.status_code >= 400:
                 detail = ""
@@ -787,27 +919,27 @@ class RoomManager:
     ) -> dict:
         room = self.must_get_room(room_id)
         engine = room.engine
-        original_audit = engine._audit
-
-        def _audit_and_stream(event_type: str, actor_id: str, payload: dict) -> None:
-            original_audit(event_type, actor_id, payload)
-            if not progress_callback:
-                return
-            if event_type not in {"agent_speech", "god_narration", "phase_change", "vote_result", "death"}:
-                return
-            try:
-                loop = asyncio.get_running_loop()
-                loop.create_task(progress_callback(engine.public_state()))
-            except RuntimeError:
-                return
-
-        engine._audit = _audit_and_stream
-        try:
+        if progress_callback is None:
             await room.orchestrator.run_single_phase(engine)
-        finally:
-            engine._audit = original_audit
+        else:
+            publisher = CoalescingStatePublisher(
+                engine.public_state,
+                progress_callback,
+                min_interval_sec=self.progress_min_interval_sec,
+            )
+
+            def _on_audit(row: dict) -> None:
+                if row.get("event_type") in PROGRESS_EVENT_TYPES:
+                    publisher.notify()
+
+            engine.add_audit_listener(_on_audit)
+            try:
+                await room.orchestrator.run_single_phase(engine)
+            finally:
+                engine.remove_audit_listener(_on_audit)
+                await publisher.flush()
 
-        self.remove_room_if_game_over(room_id)
+        await self.aremove_room_if_game_over(room_id)
         return {
             "state": engine.public_state(),
             "metrics": room.orchestrator.scheduler.metrics.to_dict(),
@@ -816,7 +948,7 @@ class RoomManager:
     async def ai_run_to_end(self, room_id: str, max_steps: int = 500) -> dict:
         room = self.must_get_room(room_id)
         result = await room.orchestrator.run_to_game_over(room.engine, max_steps=max_steps)
-        self.remove_room_if_game_over(room_id)
+        await self.aremove_room_if_game_over(room_id)
         return {
             "result": result,
             "state": room.engine.public_state(),
@@ -836,10 +968,14 @@ class RoomManager:
                     "model_name": agent.model_name,
                     "timeout_sec": agent.timeout_sec,
                     "failed_count": agent.failed_count,
+                    "breaker_state": agent.breaker_state,
                 }
                 for pid, agent in agents.items()
             },
-            "metrics": room.orchestrator.scheduler.metrics.to_dict(),
+            "metrics": {
+                **room.orchestrator.scheduler.metrics.to_dict(),
+                "provider_concurrency": room.orchestrator.scheduler.provider_concurrency(),
+            },
             "ai_god": room.ai_god_enabled,
         }
         if room.ai_god_enabled and isinstance(room.orchestrator, AIGodOrchestrator):
@@ -864,12 +1000,16 @@ class RoomManager:
                     ),
                     "timeout_sec": agent.timeout_sec,
                     "failed_count": agent.failed_count,
+                    "breaker_state": agent.breaker_state,
                     "last_heartbeat": agent.last_heartbeat.isoformat(),
                     "error_msg": agent.last_error,
                 }
                 for pid, agent in agents.items()
             },
-            "metrics": room.orchestrator.scheduler.metrics.to_dict(),
+            "metrics": {
+                **room.orchestrator.scheduler.metrics.to_dict(),
+                "provider_concurrency": room.orchestrator.scheduler.provider_concurrency(),
+            },
         }
 
     def room_config(self, room_id: str) -> dict:
@@ -884,8 +1024,7 @@ class RoomManager:
         }
 
     def health_summary(self) -> dict:
-        with self._lock:
-            rooms = list(self._rooms.values())
+        rooms = self._rooms.values()
 
         total_agents = 0
         online_agents = 0
@@ -910,15 +1049,51 @@ class RoomManager:
             "rooms_detail": per_room,
         }
 
+    def scheduler_metrics_text(self) -> str:
+        rooms = self._rooms.values()
+        return render_scheduler_metrics({room.room_id: room.orchestrator.scheduler.metrics for room in rooms})
+
     def replay_record(self, record_id: int) -> dict:
         record = self.repository.get_game_record(record_id)
         if not record:
             raise ValueError("record not found")
         return record
 
+    def replay_events(self, record_id: int, offset: int = 0, limit: int = 200) -> dict:
+        """One page of a finished game's audit events plus the record header."""
+        header = self.repository.get_replay_header(record_id)
+        if not header:
+            raise ValueError("record not found")
+        total = header["audit_count"]
+        offset = min(max(0, offset), total)
+        limit = min(max(1, limit), self.replay_page_max)
+        events = list(self.repository.iter_audit_events(record_id, offset, offset + limit))
+        next_offset = offset + len(events)
+        return {
+            "record_id": record_id,
+            "offset": offset,
+            "total": total,
+            "next_offset": next_offset if next_offset < total else None,
+            "events": events,
+            "header": header if offset == 0 else None,
+        }
+
+    def replay_state(self, record_id: int, event_index: int) -> dict:
+        """Public state as it was after the first ``event_index`` audit events were applied."""
+        header = self.repository.get_replay_header(record_id)
+        if not header:
+            raise ValueError("record not found")
+        total = header["audit_count"]
+        event_index = min(max(0, event_index), total)
+        engine = GameEngine.for_replay(header["room_id"], header["payload"].get("players") or [])
+        for row in self.repository.iter_audit_events(record_id, 0, event_index):
+            engine.replay_audit_row(row)
+        if event_index == total:
+            engine.finish_replay(header["winner"])
+        return {"record_id": record_id, "event_index": event_index, "total": total, "state": engine.public_state()}
+
     def get_room(self, room_id: str) -> Optional[Room]:
-        with self._lock:
-            return self._rooms.get(room_id)
+        return self._rooms.get(room_id)
 
     def must_get_room(self, room_id: str) -> Room:
         room = self.get_room(room_id)
@@ -931,32 +1106,83 @@ class RoomManager:
         return room.engine.public_state()
 
     def remove_room_if_game_over(self, room_id: str) -> None:
-        with self._lock:
-            room = self._rooms.get(room_id)
-            if not room:
-                return
-            if room.engine.snapshot.game_over:
-                self.child_agents.stop_room(room_id)
-                snapshot = room.engine.snapshot
-                self.repository.save_finished_game(
-                    room_id=snapshot.room_id,
-                    winner=snapshot.winner.value if snapshot.winner else "unknown",
-                    rounds=snapshot.round_context.round_no,
-                    payload={
-                        "audit": snapshot.action_audit_log,
-                        "agent_audit": room.orchestrator.scheduler.audit_logs,
-                        "metrics": room.orchestrator.scheduler.metrics.to_dict(),
-                        "players": [
-                            {
-                                "player_id": p.player_id,
-                                "nickname": p.nickname,
-                                "role": p.role.value if p.role else None,
-                                "alive": p.alive,
-                            }
-                            for p in snapshot.players.values()
-                        ],
-                    },
-                )
+        """Persist a finished game once and stop its agents.
+
+        Only the room's own lock is held while the record is captured; child processes are
+        stopped outside every lock and the record goes to the repository's background writer.
+        The teardown blocks, so coroutines use ``aremove_room_if_game_over`` instead.
+        """
+        record = self._capture_finished_game(room_id)
+        if record is None:
+            return
+        self._teardown_finished_room(room_id, record)
+        ws_manager.forget_room(room_id)
+        room = self.get_room(room_id)
+        if room:
+            room.orchestrator.scheduler.release_clients()
+
+    async def aremove_room_if_game_over(self, room_id: str) -> None:
+        """``remove_room_if_game_over`` for the event loop: the teardown runs in a worker thread."""
+        record = self._capture_finished_game(room_id)
+        if record is None:
+            return
+        await asyncio.to_thread(self._teardown_finished_room, room_id, record)
+        ws_manager.forget_room(room_id)
+        room = self.get_room(room_id)
+        if room:
+            await room.orchestrator.scheduler.aclose()
+
+    def _capture_finished_game(self, room_id: str) -> Optional[dict]:
+        """Mark a finished room finalized and build its record; None if there is nothing to do.
+
+        The record shares nothing mutable with the live room, since the writer thread
+        serializes it later.
+        """
+        room = self.get_room(room_id)
+        if not room:
+            return None
+        with room.lock:
+            snapshot = room.engine.snapshot
+            if not snapshot.game_over or room.finalized:
+                return None
+            room.finalized = True
+            record = {
+                "room_id": snapshot.room_id,
+                "winner": snapshot.winner.value if snapshot.winner else "unknown",
+                "rounds": snapshot.round_context.round_no,
+                "payload": {
+                    "audit": [as_dict(row) for row in snapshot.action_audit_log],
+                    "agent_audit": list(room.orchestrator.scheduler.audit_logs),
+                    "metrics": copy.deepcopy(room.orchestrator.scheduler.metrics.to_dict()),
+                    "players": [
+                        {
+                            "player_id": p.player_id,
+                            "nickname": p.nickname,
+                            "role": p.role.value if p.role else None,
+                            "alive": p.alive,
+                        }
+                        for p in snapshot.players.values()
+                    ],
+                },
+            }
+            # Both logs are fully copied into the record; release their spill files now.
+            self._close_audit_logs(room)
+            return record
+
+    @staticmethod
+    def _close_audit_logs(room: Room) -> None:
+        room.engine.snapshot.action_audit_log.close()
+        room.orchestrator.scheduler.audit_logs.close()
+
+    def _release_dropped_room(self, room: Room) -> None:
+        """Free a room removed from the registry: agent clients, breaker probes, spill files."""
+        room.orchestrator.scheduler.release_clients()
+        with room.lock:
+            self._close_audit_logs(room)
+
+    def _teardown_finished_room(self, room_id: str, record: dict) -> None:
+        self.child_agents.stop_room(room_id)
+        self.repository.enqueue_finished_game(**record)
 
     @staticmethod
     def _new_room_id() -> str:
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import os
+import zlib
+from threading import Lock
+from typing import Dict, Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class ShardedRoomRegistry(Generic[T]):
+    """Room map split into independently locked shards.
+
+    Lookups only take the lock of the room's shard, and each lock is held just for the
+    dict operation itself, so a slow operation on one room never blocks lookups of others.
+    """
+
+    def __init__(self, shard_count: Optional[int] = None) -> None:
+        count = shard_count if shard_count is not None else int(os.getenv("CAT_ROOM_SHARDS", "16"))
+        self._shards: List[Dict[str, T]] = [{} for _ in range(max(1, count))]
+        self._locks: List[Lock] = [Lock() for _ in self._shards]
+
+    def _index(self, room_id: str) -> int:
+        return zlib.crc32(room_id.encode("utf-8")) % len(self._shards)
+
+    def get(self, room_id: str) -> Optional[T]:
+        idx = self._index(room_id)
+        with self._locks[idx]:
+            return self._shards[idx].get(room_id)
+
+    def put(self, room_id: str, room: T) -> None:
+        idx = self._index(room_id)
+        with self._locks[idx]:
+            self._shards[idx][room_id] = room
+
+    def pop(self, room_id: str) -> Optional[T]:
+        idx = self._index(room_id)
+        with self._locks[idx]:
+            return self._shards[idx].pop(room_id, None)
+
+    def values(self) -> List[T]:
+        rooms: List[T] = []
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                rooms.extend(shard.values())
+        return rooms
+
+    def keys(self) -> List[str]:
+        ids: List[str] = []
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                ids.extend(shard.keys())
+        return ids
+
+    def clear(self) -> List[T]:
+        """Remove every room and return the removed rooms."""
+        removed: List[T] = []
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                removed.extend(shard.values())
+                shard.clear()
+        return removed
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
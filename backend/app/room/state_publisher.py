@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CoalescingStatePublisher:
+    """Publish a room's state at most once per ``min_interval_sec`` with one pending update.
+
+    ``notify`` only marks the state dirty; a single pump task reads the state when it
+    actually sends, so intermediate changes collapse into the latest state and updates
+    always go out in order. ``flush`` sends the final state without waiting for the rate.
+    """
+
+    def __init__(
+        self,
+        state_fn: Callable[[], dict],
+        publish: Callable[[dict], Awaitable[None]],
+        min_interval_sec: float,
+    ) -> None:
+        self.state_fn = state_fn
+        self.publish = publish
+        self.min_interval_sec = max(0.0, min_interval_sec)
+        self.sent = 0
+        self.coalesced = 0
+        self._dirty = False
+        self._flushing = False
+        self._last_sent = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def notify(self) -> None:
+        if self._dirty:
+            self.coalesced += 1
+        self._dirty = True
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._task = loop.create_task(self._pump())
+
+    async def flush(self) -> None:
+        self._dirty = True
+        self._flushing = True
+        if self._wake is not None:
+            self._wake.set()
+        try:
+            task = self._task
+            if task is not None and not task.done():
+                await task
+            if self._dirty:
+                await self._pump()
+        finally:
+            self._flushing = False
+
+    async def _pump(self) -> None:
+        while self._dirty:
+            wait = self._last_sent + self.min_interval_sec - time.monotonic()
+            if wait > 0 and not self._flushing:
+                self._wake = asyncio.Event()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    self._wake = None
+            self._dirty = False
+            state = self.state_fn()
+            self._last_sent = time.monotonic()
+            try:
+                await self.publish(state)
+                self.sent += 1
+            except Exception:  # noqa: BLE001
+                logger.exception("state publish failed")
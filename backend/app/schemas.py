@@ -129,6 +129,9 @@ class BootstrapAgentsRequest(BaseModel):
     model_name: Optional[str] = None
     cli_command: Optional[str] = None
     cli_timeout_sec: int = Field(default=20, ge=3, le=120)
+    agent_mode: Optional[str] = None
+    agent_transport: Optional[str] = None
+    preflight_check: bool = False
 
 
 class RunToEndRequest(BaseModel):
@@ -170,6 +173,22 @@ class ReplayResponse(BaseModel):
     record: Dict[str, Any]
 
 
+class ReplayEventsResponse(BaseModel):
+    record_id: int
+    offset: int
+    total: int
+    next_offset: Optional[int] = None
+    events: List[Dict[str, Any]]
+    header: Optional[Dict[str, Any]] = None
+
+
+class ReplayStateResponse(BaseModel):
+    record_id: int
+    event_index: int
+    total: int
+    state: Dict[str, Any]
+
+
 class WSOutboundEvent(BaseModel):
     event: str
     payload: Dict[str, Any]
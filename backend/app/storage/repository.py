@@ -1,13 +1,53 @@
 from __future__ import annotations
 
 import json
+import logging
+import os
+import queue
+import threading
+import zlib
+from collections.abc import Mapping
+from concurrent.futures import Future
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from sqlalchemy import DateTime, Integer, String, Text, create_engine
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    create_engine,
+    event,
+    func,
+    inspect,
+    select,
+    text,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column, sessionmaker
 
+from app.core.audit_event import json_default
+
+
+logger = logging.getLogger(__name__)
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+)
+
+# Rows written before compression have no format and keep the plain payload_json text.
+PAYLOAD_FORMAT_JSON = "json"
+PAYLOAD_FORMAT_ZLIB = "zlib"
+# Payload keys replays need up front; agent_audit and metrics stay out of the header path.
+REPLAY_HEADER_KEYS = ("players",)
+
 
 class Base(DeclarativeBase):
     pass
@@ -21,30 +61,465 @@ class GameRecord(Base):
     winner: Mapped[str] = mapped_column(String(16))
     rounds: Mapped[int] = mapped_column(Integer)
     payload_json: Mapped[str] = mapped_column(Text)
+    role_distribution: Mapped[Optional[str]] = mapped_column(String(255), nullable=True, index=True)
+    payload_format: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
+    payload_blob: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    audit_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    header_blob: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
 
+class GameAuditChunk(Base):
+    """A compressed slice of a finished game's engine audit log, so replays page without loading it all."""
+
+    __tablename__ = "game_audit_chunks"
+    __table_args__ = (Index("ix_game_audit_chunks_record_first", "record_id", "first_index", unique=True),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    record_id: Mapped[int] = mapped_column(Integer)
+    first_index: Mapped[int] = mapped_column(Integer)
+    event_count: Mapped[int] = mapped_column(Integer)
+    data: Mapped[bytes] = mapped_column(LargeBinary)
+
+
+class GameEvent(Base):
+    """One audit row of a finished game, flattened so dashboards can aggregate in SQL."""
+
+    __tablename__ = "game_events"
+    __table_args__ = (
+        Index("ix_game_events_record_seq", "record_id", "seq"),
+        Index("ix_game_events_type_phase", "event_type", "phase"),
+        Index("ix_game_events_type_model", "event_type", "model_type"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    record_id: Mapped[int] = mapped_column(Integer)
+    seq: Mapped[int] = mapped_column(Integer)
+    round_no: Mapped[int] = mapped_column(Integer)
+    phase: Mapped[str] = mapped_column(String(32))
+    event_type: Mapped[str] = mapped_column(String(32))
+    actor_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)
+    target_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    latency_ms: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    is_fallback: Mapped[bool] = mapped_column(Boolean, default=False)
+    model_type: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+
+
+AGENT_EVENT_TYPES = ("agent_response", "fallback_action")
+
+
+def role_distribution(players: List[dict]) -> str:
+    """Canonical ``role:count`` signature of a roster, e.g. ``seer:1,villager:4,werewolf:4``."""
+    counts: Dict[str, int] = {}
+    for player in players:
+        role = str(player.get("role") or "unknown")
+        counts[role] = counts.get(role, 0) + 1
+    return ",".join(f"{role}:{counts[role]}" for role in sorted(counts))
+
+
+def normalize_game_events(payload: dict) -> List[dict]:
+    """Flatten engine and scheduler audit rows into ``game_events`` columns.
+
+    Both logs are merged by timestamp so scheduler rows inherit the round of the
+    surrounding phase. Engine timeout auto-actions and scheduler fallbacks are flagged.
+    """
+    merged = [(str(row.get("ts") or ""), 0, row) for row in payload.get("audit") or [] if isinstance(row, Mapping)]
+    merged.extend(
+        (str(row.get("ts") or ""), 1, row)
+        for row in payload.get("agent_audit") or []
+        if isinstance(row, Mapping) and row.get("event") in AGENT_EVENT_TYPES
+    )
+    merged.sort(key=lambda item: (item[0], item[1]))
+
+    events: List[dict] = []
+    round_no, phase, seen_night = 1, "", False
+    for _, source, row in merged:
+        if source == 0:
+            data = row.get("payload") if isinstance(row.get("payload"), Mapping) else {}
+            event_type = str(row.get("event_type") or "")
+            if event_type == "phase_change":
+                phase = str(data.get("phase") or phase)
+                if "round_no" in data:
+                    round_no = int(data["round_no"])
+                elif phase == "night_wolf":
+                    round_no += 1 if seen_night else 0
+                    seen_night = True
+            target = data.get("target") or data.get("player_id")
+            events.append(
+                {
+                    "round_no": round_no,
+                    "phase": str(data.get("phase") or phase),
+                    "event_type": event_type,
+                    "actor_id": row.get("actor_id"),
+                    "target_id": str(target) if target else None,
+                    "latency_ms": None,
+                    "is_fallback": event_type == "auto_action",
+                    "model_type": None,
+                }
+            )
+            continue
+        response = row.get("response") if isinstance(row.get("response"), dict) else {}
+        action = response.get("action") if isinstance(response.get("action"), dict) else response
+        target = action.get("target")
+        latency = row.get("latency_ms")
+        events.append(
+            {
+                "round_no": round_no,
+                "phase": str(row.get("phase") or phase),
+                "event_type": str(row["event"]),
+                "actor_id": row.get("player_id"),
+                "target_id": str(target) if target else None,
+                "latency_ms": float(latency) if isinstance(latency, (int, float)) else None,
+                "is_fallback": row["event"] == "fallback_action",
+                "model_type": row.get("model_type"),
+            }
+        )
+    for seq, item in enumerate(events):
+        item["seq"] = seq
+    return events
+
+
+def _compress(value: object) -> bytes:
+    return zlib.compress(json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=json_default).encode("utf-8"), 6)
+
+
+def _decompress(data: bytes) -> object:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+def _replay_header(payload: dict) -> dict:
+    return {key: payload.get(key) or [] for key in REPLAY_HEADER_KEYS}
+
+
+_PendingRecord = Tuple[dict, Future]
+
+
 class SQLiteRepository:
     def __init__(self, db_path: str = "./werewolf.db") -> None:
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         self.engine = create_engine(f"sqlite:///{db_path}", future=True)
+        event.listen(self.engine, "connect", self._apply_pragmas)
         self.session_factory = sessionmaker(bind=self.engine, class_=Session, expire_on_commit=False)
         Base.metadata.create_all(self.engine)
+        self._migrate()
+        self.write_batch_size = max(1, int(os.getenv("CAT_DB_WRITE_BATCH", "32")))
+        self.audit_chunk_size = max(1, int(os.getenv("CAT_REPLAY_CHUNK_EVENTS", "200")))
+        self.write_linger_sec = max(0.0, float(os.getenv("CAT_DB_WRITE_LINGER_SEC", "0.05")))
+        self._write_queue: "queue.Queue[Optional[_PendingRecord]]" = queue.Queue(
+            maxsize=max(1, int(os.getenv("CAT_DB_WRITE_QUEUE_MAX", "256")))
+        )
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+
+    @staticmethod
+    def _apply_pragmas(dbapi_connection, _connection_record) -> None:  # noqa: ANN001
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in SQLITE_PRAGMAS:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    def _migrate(self) -> None:
+        """Add columns introduced after a database file was first created."""
+        columns = {column["name"] for column in inspect(self.engine).get_columns(GameRecord.__tablename__)}
+        added = {
+            "role_distribution": "VARCHAR(255)",
+            "payload_format": "VARCHAR(16)",
+            "payload_blob": "BLOB",
+            "audit_count": "INTEGER",
+            "header_blob": "BLOB",
+        }
+        with self.engine.begin() as conn:
+            for name, sql_type in added.items():
+                if name not in columns:
+                    conn.execute(text(f"ALTER TABLE game_records ADD COLUMN {name} {sql_type}"))
+            conn.execute(
+                text("CREATE INDEX IF NOT EXISTS ix_game_records_role_distribution ON game_records (role_distribution)")
+            )
 
     def save_finished_game(self, room_id: str, winner: str, rounds: int, payload: dict) -> int:
+        return self._insert_batch([{"room_id": room_id, "winner": winner, "rounds": rounds, "payload": payload}])[0]
+
+    def enqueue_finished_game(self, room_id: str, winner: str, rounds: int, payload: dict) -> "Future[int]":
+        """Queue a finished game for the background writer; the future resolves to the row id.
+
+        Serialization and the commit happen on the writer thread. The queue is bounded and
+        never waited on: when it is full the record is written on the calling thread instead,
+        so a flood of finished games slows its producers rather than growing memory.
+        """
+        future: "Future[int]" = Future()
+        record = {"room_id": room_id, "winner": winner, "rounds": rounds, "payload": payload}
+        self._ensure_writer()
+        try:
+            self._write_queue.put_nowait((record, future))
+        except queue.Full:
+            logger.warning("game record write queue full; writing room_id=%s inline", room_id)
+            try:
+                future.set_result(self._insert_batch([record])[0])
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("inline game record write failed")
+                future.set_exception(exc)
+        return future
+
+    def flush(self) -> None:
+        """Block until every queued record has been committed."""
+        if self._writer is not None:
+            self._write_queue.join()
+
+    def close(self) -> None:
+        """Flush pending records and stop the writer thread."""
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is None:
+            return
+        self._write_queue.put(None)
+        writer.join()
+
+    def _ensure_writer(self) -> None:
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name="sqlite-writer", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._write_queue.get()
+            if item is None:
+                self._write_queue.task_done()
+                return
+            batch: List[_PendingRecord] = [item]
+            stop = False
+            while len(batch) < self.write_batch_size:
+                try:
+                    nxt = self._write_queue.get(timeout=self.write_linger_sec)
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+            try:
+                ids = self._insert_batch([record for record, _ in batch])
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("game record batch write failed")
+                for _, future in batch:
+                    future.set_exception(exc)
+            else:
+                for (_, future), row_id in zip(batch, ids):
+                    future.set_result(row_id)
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+            if stop:
+                self._write_queue.task_done()
+                return
+
+    def _insert_batch(self, records: List[dict]) -> List[int]:
+        rows: List[GameRecord] = []
+        for record in records:
+            payload = record["payload"]
+            audit = list(payload.get("audit") or [])
+            rows.append(
+                GameRecord(
+                    room_id=record["room_id"],
+                    winner=record["winner"],
+                    rounds=record["rounds"],
+                    payload_json="",
+                    payload_format=PAYLOAD_FORMAT_ZLIB,
+                    payload_blob=_compress({key: value for key, value in payload.items() if key != "audit"}),
+                    audit_count=len(audit),
+                    header_blob=_compress(_replay_header(payload)),
+                    role_distribution=role_distribution(payload.get("players") or []),
+                )
+            )
         with self.session_factory() as session:
-            row = GameRecord(
-                room_id=room_id,
-                winner=winner,
-                rounds=rounds,
-                payload_json=json.dumps(payload, ensure_ascii=False),
+            session.add_all(rows)
+            session.flush()
+            for row, record in zip(rows, records):
+                self._add_audit_chunks(session, row.id, list(record["payload"].get("audit") or []))
+                self._add_events(session, row.id, record["payload"])
+            session.commit()
+            return [row.id for row in rows]
+
+    def _add_audit_chunks(self, session: Session, record_id: int, audit: List[dict]) -> None:
+        size = self.audit_chunk_size
+        session.add_all(
+            GameAuditChunk(
+                record_id=record_id,
+                first_index=start,
+                event_count=len(audit[start : start + size]),
+                data=_compress(audit[start : start + size]),
+            )
+            for start in range(0, len(audit), size)
+        )
+
+    @staticmethod
+    def _load_header(row: GameRecord) -> dict:
+        """Payload without the engine audit log (legacy rows still carry it)."""
+        if row.payload_format == PAYLOAD_FORMAT_ZLIB and row.payload_blob is not None:
+            return _decompress(row.payload_blob)
+        return json.loads(row.payload_json or "{}")
+
+    def _load_payload(self, session: Session, row: GameRecord) -> dict:
+        payload = self._load_header(row)
+        if row.payload_format == PAYLOAD_FORMAT_ZLIB:
+            payload["audit"] = list(self._iter_chunked_audit(session, row.id, 0, None))
+        return payload
+
+    @staticmethod
+    def _iter_chunked_audit(session: Session, record_id: int, start: int, stop: Optional[int]) -> Iterator[dict]:
+        stmt = (
+            select(GameAuditChunk.first_index, GameAuditChunk.data)
+            .where(
+                GameAuditChunk.record_id == record_id,
+                GameAuditChunk.first_index + GameAuditChunk.event_count > start,
             )
-            session.add(row)
+            .order_by(GameAuditChunk.first_index)
+        )
+        if stop is not None:
+            stmt = stmt.where(GameAuditChunk.first_index < stop)
+        for first_index, data in session.execute(stmt):
+            for index, row in enumerate(_decompress(data), start=first_index):
+                if index < start:
+                    continue
+                if stop is not None and index >= stop:
+                    return
+                yield row
+
+    def iter_audit_events(self, record_id: int, start: int = 0, stop: Optional[int] = None) -> Iterator[dict]:
+        """Yield engine audit rows ``[start, stop)`` of a record, decompressing one chunk at a time."""
+        self.flush()
+        with self.session_factory() as session:
+            row = session.get(GameRecord, record_id)
+            if not row:
+                raise ValueError("record not found")
+            if row.payload_format == PAYLOAD_FORMAT_ZLIB:
+                yield from self._iter_chunked_audit(session, record_id, start, stop)
+                return
+            audit = self._load_header(row).get("audit") or []
+        yield from audit[start:stop]
+
+    def get_replay_header(self, record_id: int) -> Optional[dict]:
+        """Record metadata and roster only; reads the small header blob, not the full payload.
+
+        Rows written before the header blob existed fall back to the full payload once.
+        """
+        self.flush()
+        with self.session_factory() as session:
+            row = session.get(GameRecord, record_id)
+            if not row:
+                return None
+            audit_count = row.audit_count
+            if row.header_blob is not None:
+                header = _decompress(row.header_blob)
+            else:
+                payload = self._load_header(row)
+                header = _replay_header(payload)
+                if audit_count is None:
+                    audit_count = len(payload.get("audit") or [])
+            return {
+                "id": row.id,
+                "room_id": row.room_id,
+                "winner": row.winner,
+                "rounds": row.rounds,
+                "audit_count": audit_count or 0,
+                "payload": header,
+                "created_at": row.created_at.isoformat(),
+            }
+
+    @staticmethod
+    def _add_events(session: Session, record_id: int, payload: dict) -> None:
+        events = [{"record_id": record_id, **item} for item in normalize_game_events(payload)]
+        if events:
+            session.execute(GameEvent.__table__.insert(), events)
+
+    def backfill_game_events(self) -> int:
+        """Normalize records written before ``game_events`` existed; returns how many were filled."""
+        self.flush()
+        filled = 0
+        with self.session_factory() as session:
+            pending = session.scalars(select(GameRecord).where(GameRecord.role_distribution.is_(None))).all()
+            for row in pending:
+                payload = self._load_payload(session, row)
+                row.role_distribution = role_distribution(payload.get("players") or [])
+                self._add_events(session, row.id, payload)
+                filled += 1
             session.commit()
-            session.refresh(row)
-            return row.id
+        return filled
+
+    def win_rate_by_role_distribution(self) -> List[dict]:
+        """Games and wins per winner for every role distribution seen."""
+        self.flush()
+        stmt = (
+            select(GameRecord.role_distribution, GameRecord.winner, func.count())
+            .where(GameRecord.role_distribution.is_not(None))
+            .group_by(GameRecord.role_distribution, GameRecord.winner)
+        )
+        grouped: Dict[str, Dict[str, int]] = {}
+        with self.session_factory() as session:
+            for distribution, winner, count in session.execute(stmt):
+                grouped.setdefault(distribution, {})[winner] = int(count)
+        result = []
+        for distribution, wins in sorted(grouped.items()):
+            games = sum(wins.values())
+            result.append(
+                {
+                    "role_distribution": distribution,
+                    "games": games,
+                    "wins": wins,
+                    "win_rate": {winner: round(count / games, 4) for winner, count in wins.items()},
+                }
+            )
+        return result
+
+    def latency_by_model(self) -> List[dict]:
+        """Agent response count, average and max latency per model type."""
+        self.flush()
+        stmt = (
+            select(
+                GameEvent.model_type,
+                func.count(),
+                func.avg(GameEvent.latency_ms),
+                func.max(GameEvent.latency_ms),
+            )
+            .where(GameEvent.event_type == "agent_response", GameEvent.latency_ms.is_not(None))
+            .group_by(GameEvent.model_type)
+            .order_by(GameEvent.model_type)
+        )
+        with self.session_factory() as session:
+            return [
+                {
+                    "model_type": model_type,
+                    "responses": int(count),
+                    "avg_latency_ms": round(float(avg_ms), 2),
+                    "max_latency_ms": round(float(max_ms), 2),
+                }
+                for model_type, count, avg_ms, max_ms in session.execute(stmt)
+            ]
+
+    def fallback_rate_by_phase(self) -> List[dict]:
+        """Share of agent decisions per phase that were answered by a fallback strategy."""
+        self.flush()
+        stmt = (
+            select(GameEvent.phase, func.count(), func.sum(GameEvent.is_fallback, type_=Integer))
+            .where(GameEvent.event_type.in_(AGENT_EVENT_TYPES))
+            .group_by(GameEvent.phase)
+            .order_by(GameEvent.phase)
+        )
+        with self.session_factory() as session:
+            return [
+                {
+                    "phase": phase,
+                    "decisions": int(count),
+                    "fallbacks": int(fallbacks or 0),
+                    "fallback_rate": round(int(fallbacks or 0) / count, 4),
+                }
+                for phase, count, fallbacks in session.execute(stmt)
+            ]
 
     def get_game_record(self, record_id: int) -> Optional[dict]:
+        self.flush()
         with self.session_factory() as session:
             row = session.get(GameRecord, record_id)
             if not row:
@@ -54,6 +529,6 @@ class SQLiteRepository:
                 "room_id": row.room_id,
                 "winner": row.winner,
                 "rounds": row.rounds,
-                "payload": json.loads(row.payload_json),
+                "payload": self._load_payload(session, row),
                 "created_at": row.created_at.isoformat(),
             }
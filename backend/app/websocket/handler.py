@@ -2,10 +2,12 @@ from __future__ import annotations
 
 import asyncio
 import json
-from collections import defaultdict
-from dataclasses import dataclass
+import os
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import DefaultDict, Dict, Optional, Set
+from typing import Any, Deque, DefaultDict, Dict, List, Optional, Set, Tuple
 
 from fastapi import WebSocket
 
@@ -16,34 +18,141 @@ class WSSubscriber:
     player_id: str
     view_mode: str = "god"
     last_event_id: int = 0
+    delta: bool = False
+    needs_snapshot: bool = False
+
+
+@dataclass(slots=True)
+class _Outbox:
+    """Bounded outbound queue of pre-encoded frames drained by one writer task."""
+
+    room_id: str
+    frames: Deque[Tuple[str, str]] = field(default_factory=deque)
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    idle: asyncio.Event = field(default_factory=asyncio.Event)
+    writer: Optional[asyncio.Task] = None
+    closed: bool = False
+
+
+@dataclass(slots=True)
+class _ViewTrack:
+    """Last room_state delivered to one view class of a room's delta subscribers."""
+
+    since_event_id: int
+    event_id: int
+    state: Dict
+    detached_at: Optional[float] = None
+
+
+@dataclass(slots=True)
+class _RoomStream:
+    """Per-room delta state: tracked views plus a replay ring of recent frames.
+
+    Exists only while the room has delta subscribers, or views still inside the resume grace.
+    """
+
+    views: Dict[str, _ViewTrack] = field(default_factory=dict)
+    replay: Deque[Tuple[int, str, Optional[str], str]] = field(default_factory=deque)
+    evicted_upto: int = 0
+
+
+@dataclass(slots=True)
+class WSMetrics:
+    frames_enqueued: int = 0
+    frames_sent: int = 0
+    frames_coalesced: int = 0
+    clients_dropped: int = 0
+    send_errors: int = 0
+
+
+_MISSING = object()
 
 
 class WSConnectionManager:
     def __init__(self) -> None:
         self._connections: DefaultDict[str, Set[WebSocket]] = defaultdict(set)
         self._subscribers: Dict[WebSocket, WSSubscriber] = {}
+        self._outboxes: Dict[WebSocket, _Outbox] = {}
         self._event_counter: int = 0
         self._lock = asyncio.Lock()
+        self._streams: Dict[str, _RoomStream] = {}
+        self.send_queue_max = max(1, int(os.getenv("CAT_WS_SEND_QUEUE_MAX", "64")))
+        self.replay_buffer_size = max(1, int(os.getenv("CAT_WS_REPLAY_BUFFER", "256")))
+        self.resume_grace_sec = max(0.0, float(os.getenv("CAT_WS_RESUME_GRACE_SEC", "30")))
+        self.metrics = WSMetrics()
 
     async def connect(self, room_id: str, player_id: str, websocket: WebSocket) -> None:
         await websocket.accept()
+        outbox = _Outbox(room_id=room_id)
+        outbox.idle.set()
+        outbox.writer = asyncio.create_task(self._writer(websocket, outbox))
         async with self._lock:
             self._connections[room_id].add(websocket)
             self._subscribers[websocket] = WSSubscriber(room_id=room_id, player_id=player_id)
+            self._outboxes[websocket] = outbox
 
     async def disconnect(self, room_id: str, websocket: WebSocket) -> None:
         async with self._lock:
             if room_id in self._connections and websocket in self._connections[room_id]:
                 self._connections[room_id].remove(websocket)
+                if not self._connections[room_id]:
+                    del self._connections[room_id]
             self._subscribers.pop(websocket, None)
+            outbox = self._outboxes.pop(websocket, None)
+            self._prune_stream(room_id, self._delta_keys_locked(room_id))
+        if outbox is not None:
+            self._close_outbox(outbox)
 
     async def update_view_mode(self, websocket: WebSocket, view_mode: str) -> None:
         async with self._lock:
             sub = self._subscribers.get(websocket)
             if not sub:
                 return
+            if sub.view_mode != view_mode:
+                sub.needs_snapshot = sub.delta
             sub.view_mode = view_mode
 
+    async def subscribe(
+        self,
+        websocket: WebSocket,
+        view_mode: str,
+        delta: bool = False,
+        last_event_id: Optional[int] = None,
+    ) -> bool:
+        """Set the subscriber's view and protocol; returns True when it resumed from the replay ring.
+
+        Delta subscribers get a full ``room_state`` with the next broadcast and
+        ``room_state_patch`` frames afterwards. With ``last_event_id`` the missed frames for
+        the same view are replayed instead, as long as the ring still covers that point.
+        """
+        async with self._lock:
+            sub = self._subscribers.get(websocket)
+            if not sub:
+                return False
+            sub.view_mode = view_mode
+            sub.delta = delta
+            sub.needs_snapshot = delta
+            if not delta or last_event_id is None:
+                return False
+            stream = self._streams.get(sub.room_id)
+            key = self._view_key(sub)
+            track = stream.views.get(key) if stream else None
+            if (
+                stream is None
+                or track is None
+                or not (max(stream.evicted_upto, track.since_event_id) <= last_event_id <= self._event_counter)
+            ):
+                return False
+            missed = [
+                (event, frame)
+                for event_id, event, audience, frame in stream.replay
+                if event_id > last_event_id and self._audience_matches(audience, key)
+            ]
+            sub.needs_snapshot = False
+        for event, frame in missed:
+            self._enqueue(websocket, event, frame)
+        return True
+
     async def send_event(self, websocket: WebSocket, event: str, payload: Dict) -> None:
         async with self._lock:
             self._event_counter += 1
@@ -51,75 +160,67 @@ class WSConnectionManager:
             sub = self._subscribers.get(websocket)
             if sub:
                 sub.last_event_id = event_id
-        message = json.dumps(
-            {
-                "event_id": event_id,
-                "event": event,
-                "payload": payload,
-                "ts": datetime.utcnow().isoformat(),
-            },
-            ensure_ascii=False,
-        )
-        await websocket.send_text(message)
+        self._enqueue(websocket, event, self._encode(event_id, event, payload, datetime.utcnow().isoformat()))
 
     async def broadcast(self, room_id: str, event: str, payload: Dict) -> None:
-        stale = []
-        async with self._lock:
-            self._event_counter += 1
-            event_id = self._event_counter
-            conns = list(self._connections.get(room_id, set()))
-        for ws in conns:
-            try:
-                message = json.dumps(
-                    {
-                        "event_id": event_id,
-                        "event": event,
-                        "payload": payload,
-                        "ts": datetime.utcnow().isoformat(),
-                    },
-                    ensure_ascii=False,
-                )
-                await ws.send_text(message)
-            except Exception:
-                stale.append(ws)
-        if stale:
-            async with self._lock:
-                for ws in stale:
-                    self._connections[room_id].discard(ws)
-                    self._subscribers.pop(ws, None)
+        event_id, conns, _ = await self._begin_broadcast(room_id)
+        message = self._encode(event_id, event, payload, datetime.utcnow().isoformat())
+        self._record(room_id, event_id, event, None, message)
+        await self._send_frames(room_id, event, {ws: message for ws in conns})
 
     async def broadcast_room_state(self, room_id: str, state: Dict) -> None:
-        stale = []
-        async with self._lock:
-            self._event_counter += 1
-            event_id = self._event_counter
-            conns = list(self._connections.get(room_id, set()))
-            subscribers = {ws: self._subscribers.get(ws) for ws in conns}
+        event_id, conns, subscribers = await self._begin_broadcast(room_id)
+        ts = datetime.utcnow().isoformat()
+        delta_keys = {self._view_key(sub) for sub in subscribers.values() if sub and sub.delta}
+        stream = self._prune_stream(room_id, delta_keys)
+        if stream is None and delta_keys:
+            stream = self._streams[room_id] = _RoomStream()
+        patches: Dict[str, Optional[str]] = {}
+        fresh: Set[str] = set()
+        for key in sorted(delta_keys | set(stream.views if stream else ())):
+            filtered = self._filter_state_for_view(state, key, key.split(":", 1)[-1])
+            track = stream.views.get(key)
+            if track is None:
+                stream.views[key] = _ViewTrack(since_event_id=event_id, event_id=event_id, state=filtered)
+                patches[key] = None
+                fresh.add(key)
+                continue
+            patch = self._state_patch(track.state, filtered)
+            if patch:
+                patch["base_event_id"] = track.event_id
+                frame = self._encode(event_id, "room_state_patch", patch, ts)
+                self._record(room_id, event_id, "room_state_patch", key, frame)
+                track.event_id = event_id
+                patches[key] = frame
+            else:
+                patches[key] = None
+            track.state = filtered
 
+        frames: Dict[str, str] = {}
+        targets: Dict[WebSocket, str] = {}
+        snapshots: List[Tuple[WebSocket, str]] = []
         for ws in conns:
             sub = subscribers.get(ws)
             if not sub:
                 continue
-            filtered = self._filter_state_for_view(state, sub.view_mode, sub.player_id)
-            try:
-                message = json.dumps(
-                    {
-                        "event_id": event_id,
-                        "event": "room_state",
-                        "payload": filtered,
-                        "ts": datetime.utcnow().isoformat(),
-                    },
-                    ensure_ascii=False,
-                )
-                await ws.send_text(message)
-            except Exception:
-                stale.append(ws)
-
-        if stale:
-            async with self._lock:
-                for ws in stale:
-                    self._connections[room_id].discard(ws)
-                    self._subscribers.pop(ws, None)
+            key = self._view_key(sub)
+            if sub.delta and not sub.needs_snapshot and key not in fresh:
+                if patches.get(key) is not None:
+                    snapshots.append((ws, patches[key]))
+                continue
+            if sub.delta:
+                # Snapshot of the tracked view, tagged with the event id patches will be based on.
+                track = stream.views[key]
+                sub.needs_snapshot = False
+                snapshots.append((ws, self._encode(track.event_id, "room_state", track.state, ts)))
+                continue
+            if key not in frames:
+                filtered = self._filter_state_for_view(state, sub.view_mode, sub.player_id)
+                frames[key] = self._encode(event_id, "room_state", filtered, ts)
+            targets[ws] = frames[key]
+        await self._send_frames(room_id, "room_state", targets)
+        if snapshots:
+            await self._send_patches(room_id, snapshots)
 
     async def broadcast_phase_changed(
         self,
@@ -127,39 +228,280 @@ class WSConnectionManager:
         payload: Dict,
         god_view: Optional[Dict] = None,
     ) -> None:
-        stale = []
+        event_id, conns, subscribers = await self._begin_broadcast(room_id)
+        ts = datetime.utcnow().isoformat()
+        frames: Dict[bool, str] = {}
+
+        def frame_for(with_god_view: bool) -> str:
+            if with_god_view not in frames:
+                merged = dict(payload)
+                if with_god_view:
+                    merged["god_view"] = god_view
+                frames[with_god_view] = self._encode(event_id, "phase_changed", merged, ts)
+            return frames[with_god_view]
+
+        targets: Dict[WebSocket, str] = {}
+        for ws in conns:
+            sub = subscribers.get(ws)
+            if not sub:
+                continue
+            targets[ws] = frame_for(sub.view_mode == "god" and bool(god_view))
+        if room_id in self._streams:
+            if god_view:
+                self._record(room_id, event_id, "phase_changed", "god", frame_for(True))
+                self._record(room_id, event_id, "phase_changed", "!god", frame_for(False))
+            else:
+                self._record(room_id, event_id, "phase_changed", None, frame_for(False))
+        await self._send_frames(room_id, "phase_changed", targets)
+
+    async def _begin_broadcast(
+        self, room_id: str
+    ) -> Tuple[int, List[WebSocket], Dict[WebSocket, Optional[WSSubscriber]]]:
         async with self._lock:
             self._event_counter += 1
             event_id = self._event_counter
             conns = list(self._connections.get(room_id, set()))
             subscribers = {ws: self._subscribers.get(ws) for ws in conns}
+        return event_id, conns, subscribers
 
-        for ws in conns:
-            sub = subscribers.get(ws)
-            if not sub:
-                continue
-            merged = dict(payload)
-            if sub.view_mode == "god" and god_view:
-                merged["god_view"] = god_view
-            try:
-                message = json.dumps(
-                    {
-                        "event_id": event_id,
-                        "event": "phase_changed",
-                        "payload": merged,
-                        "ts": datetime.utcnow().isoformat(),
-                    },
-                    ensure_ascii=False,
-                )
-                await ws.send_text(message)
-            except Exception:
-                stale.append(ws)
+    async def _send_frames(self, room_id: str, event: str, targets: Dict[WebSocket, str]) -> None:
+        """Queue pre-encoded frames; clients whose queue overflows are dropped from the room."""
+        stale = [ws for ws, message in targets.items() if not self._enqueue(ws, event, message)]
+        if stale:
+            async with self._lock:
+                for ws in stale:
+                    self._drop_locked(room_id, ws)
 
+    async def _send_patches(self, room_id: str, targets: List[Tuple[WebSocket, str]]) -> None:
+        # Patches are never coalesced; a client that cannot keep up is dropped and may resume.
+        stale = [ws for ws, message in targets if not self._enqueue(ws, "room_state_patch", message)]
         if stale:
             async with self._lock:
                 for ws in stale:
-                    self._connections[room_id].discard(ws)
-                    self._subscribers.pop(ws, None)
+                    self._drop_locked(room_id, ws)
+
+    def _record(self, room_id: str, event_id: int, event: str, audience: Optional[str], frame: str) -> None:
+        stream = self._prune_stream(room_id)
+        if stream is None:
+            return
+        stream.replay.append((event_id, event, audience, frame))
+        while len(stream.replay) > self.replay_buffer_size:
+            stream.evicted_upto = stream.replay.popleft()[0]
+
+    @staticmethod
+    def _audience_matches(audience: Optional[str], view_key: str) -> bool:
+        if audience is None:
+            return True
+        if audience == "!god":
+            return view_key != "god"
+        return audience == view_key
+
+    def _delta_keys_locked(self, room_id: str) -> Set[str]:
+        subs = (self._subscribers.get(ws) for ws in self._connections.get(room_id, ()))
+        return {self._view_key(sub) for sub in subs if sub and sub.delta}
+
+    def _prune_stream(self, room_id: str, delta_keys: Optional[Set[str]] = None) -> Optional[_RoomStream]:
+        """Expire views detached longer than the resume grace; drops the stream once none remain.
+
+        ``delta_keys`` are the views delta subscribers currently hold; views outside it start
+        their grace period. Without it only already-detached views are checked.
+        """
+        stream = self._streams.get(room_id)
+        if stream is None:
+            return None
+        now = time.monotonic()
+        for key, track in list(stream.views.items()):
+            if delta_keys is not None:
+                if key in delta_keys:
+                    track.detached_at = None
+                    continue
+                if track.detached_at is None:
+                    track.detached_at = now
+            if track.detached_at is not None and now - track.detached_at >= self.resume_grace_sec:
+                del stream.views[key]
+        if not stream.views and not delta_keys:
+            self._streams.pop(room_id, None)
+            return None
+        return stream
+
+    def forget_room(self, room_id: str) -> None:
+        """Drop the delta tracks and replay ring of a finished room.
+
+        Delta subscribers still attached get a fresh snapshot with the next room_state.
+        """
+        self._streams.pop(room_id, None)
+
+    def _enqueue(self, websocket: WebSocket, event: str, message: str) -> bool:
+        """Non-blocking enqueue. A newer room_state replaces any pending one for the client;
+        returns False when the queue is still full, i.e. the client has fallen too far behind."""
+        outbox = self._outboxes.get(websocket)
+        if outbox is None or outbox.closed:
+            return outbox is None
+        if event == "room_state":
+            kept = [item for item in outbox.frames if item[0] != "room_state"]
+            if len(kept) != len(outbox.frames):
+                self.metrics.frames_coalesced += len(outbox.frames) - len(kept)
+                outbox.frames = deque(kept)
+        if len(outbox.frames) >= self.send_queue_max:
+            return False
+        outbox.frames.append((event, message))
+        self.metrics.frames_enqueued += 1
+        outbox.idle.clear()
+        outbox.wakeup.set()
+        return True
+
+    async def _writer(self, websocket: WebSocket, outbox: _Outbox) -> None:
+        try:
+            while not outbox.closed:
+                if not outbox.frames:
+                    outbox.idle.set()
+                    outbox.wakeup.clear()
+                    await outbox.wakeup.wait()
+                    continue
+                _, message = outbox.frames.popleft()
+                await websocket.send_text(message)
+                self.metrics.frames_sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.metrics.send_errors += 1
+            async with self._lock:
+                self._drop_locked(outbox.room_id, websocket, close=False)
+        finally:
+            outbox.idle.set()
+
+    def _drop_locked(self, room_id: str, websocket: WebSocket, close: bool = True) -> None:
+        conns = self._connections.get(room_id)
+        if conns is not None:
+            conns.discard(websocket)
+            if not conns:
+                del self._connections[room_id]
+        self._subscribers.pop(websocket, None)
+        self._prune_stream(room_id, self._delta_keys_locked(room_id))
+        outbox = self._outboxes.pop(websocket, None)
+        if outbox is None:
+            return
+        self.metrics.clients_dropped += 1
+        self._close_outbox(outbox)
+        if close:
+            asyncio.ensure_future(self._close_quietly(websocket))
+
+    @staticmethod
+    def _close_outbox(outbox: _Outbox) -> None:
+        outbox.closed = True
+        outbox.frames.clear()
+        outbox.idle.set()
+        if outbox.writer is not None and outbox.writer is not asyncio.current_task():
+            outbox.writer.cancel()
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
+
+    async def drain(self, room_id: Optional[str] = None) -> None:
+        """Wait until every queued frame (optionally of one room) has been written."""
+        outboxes = [box for box in list(self._outboxes.values()) if room_id is None or box.room_id == room_id]
+        for outbox in outboxes:
+            await outbox.idle.wait()
+
+    def metrics_snapshot(self) -> dict:
+        depths = [len(box.frames) for box in self._outboxes.values()]
+        return {
+            "connections": len(self._outboxes),
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "send_queue_max": self.send_queue_max,
+            "frames_enqueued": self.metrics.frames_enqueued,
+            "frames_sent": self.metrics.frames_sent,
+            "frames_coalesced": self.metrics.frames_coalesced,
+            "clients_dropped": self.metrics.clients_dropped,
+            "send_errors": self.metrics.send_errors,
+        }
+
+    @staticmethod
+    def _encode(event_id: int, event: str, payload: Dict, ts: str) -> str:
+        return json.dumps(
+            {
+                "event_id": event_id,
+                "event": event,
+                "payload": payload,
+                "ts": ts,
+            },
+            ensure_ascii=False,
+        )
+
+    @staticmethod
+    def _view_key(sub: WSSubscriber) -> str:
+        """Effective view of a subscriber; equal keys always receive identical room_state frames."""
+        if sub.view_mode == "god":
+            return "god"
+        if sub.view_mode.startswith("player:"):
+            return sub.view_mode
+        return f"player:{sub.player_id}"
+
+    @staticmethod
+    def _state_patch(prev: Dict, cur: Dict) -> Dict[str, Any]:
+        """Describe how ``cur`` differs from ``prev``; an empty dict means no change.
+
+        Keys: ``set``/``unset`` for top-level fields, ``players`` with the changed fields per
+        player id, and ``speech_drop``/``speech_append`` for the speech history window.
+        """
+        patch: Dict[str, Any] = {}
+        changed = {
+            key: value
+            for key, value in cur.items()
+            if key not in {"players", "speech_history"} and prev.get(key, _MISSING) != value
+        }
+        removed = [key for key in prev if key not in cur]
+
+        prev_players = prev.get("players") or []
+        cur_players = cur.get("players") or []
+        if [p.get("player_id") for p in prev_players] != [p.get("player_id") for p in cur_players]:
+            changed["players"] = cur_players
+        else:
+            player_changes = {}
+            for old, new in zip(prev_players, cur_players):
+                fields = {key: value for key, value in new.items() if old.get(key, _MISSING) != value}
+                if fields:
+                    player_changes[new.get("player_id")] = fields
+            if player_changes:
+                patch["players"] = player_changes
+
+        prev_history = prev.get("speech_history") or []
+        cur_history = cur.get("speech_history") or []
+        if prev_history != cur_history:
+            window = WSConnectionManager._history_append(prev_history, cur_history)
+            if window is None:
+                changed["speech_history"] = cur_history
+            else:
+                dropped, appended = window
+                if dropped:
+                    patch["speech_drop"] = dropped
+                patch["speech_append"] = appended
+
+        if changed:
+            patch["set"] = changed
+        if removed:
+            patch["unset"] = removed
+        return patch
+
+    @staticmethod
+    def _history_append(prev: List[Any], cur: List[Any]) -> Optional[Tuple[int, List[Any]]]:
+        """Return ``(dropped_from_head, appended)`` when ``cur`` is ``prev`` shifted forward."""
+        if not prev:
+            return 0, list(cur)
+        last = prev[-1]
+        for idx in range(len(cur) - 1, -1, -1):
+            if cur[idx] != last:
+                continue
+            overlap = idx + 1
+            if overlap <= len(prev) and prev[len(prev) - overlap :] == cur[:overlap]:
+                return len(prev) - overlap, cur[overlap:]
+            return None
+        return None
 
     @staticmethod
     def _filter_state_for_view(state: Dict, view_mode: str, player_id: str) -> Dict:
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from fastapi import FastAPI, HTTPException
+
+try:
+    from cat_agent_template import main as agent
+except ImportError:  # started from inside cat_agent_template/
+    import main as agent  # type: ignore[no-redef]
+
+
+app = FastAPI(title="Cat Agent Multiplexed Host", version="0.1.0")
+
+# With several uvicorn workers a room DELETE reaches only one of them, so every worker
+# also forgets logical agents that have been idle this long.
+AGENT_IDLE_TTL_SEC = max(1, int(os.getenv("CAT_MUX_AGENT_IDLE_SEC", "1800")))
+SWEEP_INTERVAL_SEC = max(1, int(os.getenv("CAT_MUX_SWEEP_INTERVAL_SEC", "60")))
+
+
+@dataclass(slots=True)
+class LogicalAgent:
+    room_id: str
+    player_id: str
+    calls: int = 0
+    last_call_at: int = 0
+    last_seen: float = 0.0
+
+
+_agents: Dict[Tuple[str, str], LogicalAgent] = {}
+_agents_lock = threading.Lock()
+_next_sweep_at = 0.0
+
+
+def _sweep_locked(now: float) -> None:
+    global _next_sweep_at
+    if now < _next_sweep_at:
+        return
+    _next_sweep_at = now + SWEEP_INTERVAL_SEC
+    expired: List[Tuple[str, str]] = [
+        key for key, item in _agents.items() if now - item.last_seen > AGENT_IDLE_TTL_SEC
+    ]
+    for key in expired:
+        del _agents[key]
+
+
+def _touch(room_id: str, player_id: str) -> LogicalAgent:
+    key = (room_id, player_id)
+    now = time.monotonic()
+    with _agents_lock:
+        _sweep_locked(now)
+        item = _agents.get(key)
+        if item is None:
+            item = _agents[key] = LogicalAgent(room_id=room_id, player_id=player_id)
+        item.last_seen = now
+        return item
+
+
+@app.get("/health")
+def health() -> dict:
+    with _agents_lock:
+        _sweep_locked(time.monotonic())
+        count = len(_agents)
+    return {
+        "status": "ok",
+        "mode": "multiplexed",
+        "model_type": agent.MODEL_TYPE,
+        "pid": os.getpid(),
+        "agents": count,
+    }
+
+
+@app.get("/agents/{room_id}/{player_id}/health")
+def agent_health(room_id: str, player_id: str) -> dict:
+    _touch(room_id, player_id)
+    return {**agent.health(), "mode": "multiplexed", "room_id": room_id, "player_id": player_id}
+
+
+@app.post("/agents/{room_id}/{player_id}/act", response_model=agent.ActResponse)
+def agent_act(room_id: str, player_id: str, req: agent.ActRequest) -> agent.ActResponse:
+    if req.player_id != player_id:
+        raise HTTPException(status_code=400, detail=f"player_id mismatch: route={player_id} body={req.player_id}")
+    item = _touch(room_id, player_id)
+    with _agents_lock:
+        item.calls += 1
+        item.last_call_at = int(time.time())
+    return agent.act(req)
+
+
+@app.get("/agents")
+def list_agents() -> dict:
+    """Logical agents seen by this worker; counts are per worker process."""
+    with _agents_lock:
+        _sweep_locked(time.monotonic())
+        items = [
+            {"room_id": a.room_id, "player_id": a.player_id, "calls": a.calls, "last_call_at": a.last_call_at}
+            for a in _agents.values()
+        ]
+    return {"pid": os.getpid(), "agents": items}
+
+
+@app.delete("/agents/{room_id}")
+def drop_room(room_id: str) -> dict:
+    with _agents_lock:
+        keys = [key for key in _agents if key[0] == room_id]
+        for key in keys:
+            del _agents[key]
+    return {"room_id": room_id, "dropped": len(keys)}
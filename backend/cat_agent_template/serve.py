@@ -0,0 +1,57 @@
+"""Run a cat agent app and announce readiness on an inherited file descriptor.
+
+    python -m cat_agent_template.serve cat_agent_template.main:app --host 127.0.0.1 --port 9101
+    python -m cat_agent_template.serve cat_agent_template.main:app --uds /tmp/catchat-agents/r1/p1.sock
+
+When ``CAT_AGENT_READY_FD`` names an fd inherited from the parent, one ``ready <pid>`` line
+is written to it after the server is listening, then the fd is closed. Without it this is
+a plain ``uvicorn`` run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from typing import List, Optional
+
+import uvicorn
+
+READY_FD_ENV = "CAT_AGENT_READY_FD"
+
+
+def _announce_ready() -> None:
+    raw = os.environ.pop(READY_FD_ENV, "")
+    if not raw:
+        return
+    fd = int(raw)
+    try:
+        os.write(fd, f"ready {os.getpid()}\n".encode("ascii"))
+    except OSError:
+        pass
+    finally:
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+
+class _SignallingServer(uvicorn.Server):
+    async def startup(self, sockets: Optional[list] = None) -> None:
+        await super().startup(sockets=sockets)
+        if self.started:
+            _announce_ready()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a cat agent app with readiness signalling")
+    parser.add_argument("app", help="ASGI app import string, e.g. cat_agent_template.main:app")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9101)
+    parser.add_argument("--uds", default=None)
+    args = parser.parse_args(argv)
+    config = uvicorn.Config(args.app, host=args.host, port=args.port, uds=args.uds)
+    _SignallingServer(config).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import pytest
+
+from app.agent.child_process_manager import ChildAgentProcessManager
+from app.agent.ipc_transport import TRANSPORT_UDS, uds_supported
+from tests.test_warm_agent_pool import _FakeProcess
+
+
+def _no_polling(endpoint: str, timeout: float) -> None:
+    raise AssertionError(f"unexpected /health polling for {endpoint}")
+
+
+@pytest.mark.skipif(not uds_supported(), reason="needs fd inheritance and unix sockets")
+def test_child_readiness_comes_from_inherited_pipe(tmp_path) -> None:
+    manager = ChildAgentProcessManager()
+    manager.runtime_dir = tmp_path
+    manager._wait_health = _no_polling  # type: ignore[method-assign]
+    assert manager.ready_signal
+
+    endpoints = manager.bootstrap_room(
+        room_id="r1", player_ids=["p1", "p2"], transport=TRANSPORT_UDS, startup_timeout_sec=30
+    )
+    try:
+        assert all(manager.is_ready(endpoint) for endpoint in endpoints.values())
+    finally:
+        manager.stop_all()
+    assert not manager.is_ready(endpoints["p1"])
+
+
+def test_child_without_ready_line_falls_back_to_health_polling() -> None:
+    manager = ChildAgentProcessManager()
+    polled: list[str] = []
+    # A fake child never writes its ready line; the closed pipe must trigger polling.
+    manager._spawn_child = lambda host, port, **kwargs: _FakeProcess()  # type: ignore[method-assign]
+    manager._next_available_port = lambda host, start, reserved: start  # type: ignore[method-assign]
+    manager._wait_health = lambda endpoint, timeout: polled.append(endpoint)  # type: ignore[method-assign]
+
+    endpoints = manager.bootstrap_room(room_id="r1", player_ids=["p1", "p2"], start_port=9101)
+    assert sorted(polled) == sorted(endpoints.values())
+    assert manager.is_ready(endpoints["p1"])
+    manager.stop_all()
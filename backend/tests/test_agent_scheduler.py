@@ -0,0 +1,505 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+from app.agent.adaptive_limiter import AdaptiveConcurrencyLimiter, ProviderLimiterRegistry
+from app.agent.agent_scheduler import LATENCY_BUCKETS_MS, AgentScheduler, LatencyHistogram
+from app.agent.prometheus import render_scheduler_metrics
+from app.core.audit_event import AuditEvent, as_dict
+from app.storage.repository import normalize_game_events
+
+
+def _ok_response(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"action": {"type": "vote", "target": "cat_02"}, "reasoning": "ok"})
+
+
+def _scheduler(handler) -> AgentScheduler:
+    scheduler = AgentScheduler(transport=httpx.MockTransport(handler), limiters=ProviderLimiterRegistry())
+    scheduler.retry_backoff_sec = 0.0
+    for pid in ("cat_01", "cat_02"):
+        scheduler.registry.register(player_id=pid, ipc_endpoint=f"http://agent-{pid}", model_type="mock")
+    return scheduler
+
+
+async def _act(scheduler: AgentScheduler, player_id: str) -> dict:
+    return await scheduler.trigger_agent_action(
+        player_id=player_id,
+        session_id="r1",
+        role="villager",
+        phase="day_vote",
+        visible_state={"player_id": player_id, "alive_player_ids": ["cat_01", "cat_02"]},
+        prompt_template="",
+        strategy_name="day_vote",
+    )
+
+
+def test_scheduler_reuses_pooled_client_per_endpoint() -> None:
+    scheduler = _scheduler(_ok_response)
+
+    async def _run() -> None:
+        await _act(scheduler, "cat_01")
+        first = scheduler._clients["http://agent-cat_01"][1]
+        await _act(scheduler, "cat_01")
+        assert scheduler._clients["http://agent-cat_01"][1] is first
+        await _act(scheduler, "cat_02")
+        assert set(scheduler._clients) == {"http://agent-cat_01", "http://agent-cat_02"}
+        await scheduler.aclose()
+        assert first.is_closed
+        assert scheduler._clients == {}
+
+    asyncio.run(_run())
+
+
+def test_scheduler_closes_replaced_and_stale_loop_clients() -> None:
+    scheduler = _scheduler(_ok_response)
+    clients: list[httpx.AsyncClient] = []
+
+    async def _first_loop() -> None:
+        await _act(scheduler, "cat_01")
+        await _act(scheduler, "cat_02")
+        clients.append(scheduler._clients["http://agent-cat_01"][1])
+        clients.append(scheduler._clients["http://agent-cat_02"][1])
+        scheduler.registry.register(player_id="cat_01", ipc_endpoint="http://agent-cat_01b", model_type="mock")
+        await asyncio.sleep(0)
+        assert clients[0].is_closed and "http://agent-cat_01" not in scheduler._clients
+
+    async def _second_loop() -> None:
+        await _act(scheduler, "cat_02")
+        await asyncio.sleep(0)
+        assert clients[1].is_closed
+        assert scheduler._clients["http://agent-cat_02"][1] is not clients[1]
+        await scheduler.aclose()
+
+    asyncio.run(_first_loop())
+    asyncio.run(_second_loop())
+
+
+def test_scheduler_retries_share_one_client() -> None:
+    calls: list[int] = []
+
+    def _flaky(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        if len(calls) == 1:
+            return httpx.Response(503)
+        return _ok_response(request)
+
+    scheduler = _scheduler(_flaky)
+
+    async def _run() -> dict:
+        result = await _act(scheduler, "cat_01")
+        assert len(scheduler._clients) == 1
+        await scheduler.aclose()
+        return result
+
+    result = asyncio.run(_run())
+    assert len(calls) == 2
+    assert "fallback_reason" not in result
+
+
+def test_adaptive_limiter_grows_on_healthy_latency_and_backs_off_on_overload() -> None:
+    limiter = AdaptiveConcurrencyLimiter(key="api:x", limit=1.0, max_limit=4, decrease_cooldown_sec=0.0)
+    for _ in range(20):
+        limiter.on_success(100.0)
+    assert limiter.current_limit == 4
+
+    limiter.on_overload()
+    assert limiter.current_limit == 2
+    limiter.on_overload()
+    limiter.on_overload()
+    assert limiter.current_limit == 1
+
+
+def test_adaptive_limiter_never_admits_above_shrunk_limit() -> None:
+    limiter = AdaptiveConcurrencyLimiter(key="api:x", limit=3.0, max_limit=3, decrease_cooldown_sec=0.0)
+    peak = 0
+
+    async def _worker(gate: asyncio.Event) -> None:
+        nonlocal peak
+        async with limiter:
+            peak = max(peak, limiter.in_flight)
+            await gate.wait()
+
+    async def _run() -> None:
+        first_gate = asyncio.Event()
+        first = [asyncio.create_task(_worker(first_gate)) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert limiter.in_flight == 3
+        limiter.on_overload()
+        assert limiter.current_limit == 1
+
+        second_gate = asyncio.Event()
+        second = [asyncio.create_task(_worker(second_gate)) for _ in range(3)]
+        first_gate.set()
+        await asyncio.gather(*first)
+        await asyncio.sleep(0)
+        assert limiter.in_flight == 1
+        second_gate.set()
+        await asyncio.gather(*second)
+
+    asyncio.run(_run())
+    assert peak == 3
+    assert limiter.in_flight == 0
+
+
+def test_adaptive_limiter_is_shared_safely_across_loops_in_threads() -> None:
+    limiter = AdaptiveConcurrencyLimiter(key="api:x", limit=2.0, max_limit=2)
+    peak = 0
+    done: list[int] = []
+    guard = threading.Lock()
+
+    async def _room() -> None:
+        nonlocal peak
+        for _ in range(20):
+            async with limiter:
+                with guard:
+                    peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.001)
+        done.append(1)
+
+    # Each thread runs its own loop, like rooms advanced from the REST threadpool.
+    threads = [threading.Thread(target=asyncio.run, args=(_room(),)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert len(done) == 4
+    assert peak <= 2
+    assert limiter.to_dict()["in_flight"] == 0 and limiter.to_dict()["waiting"] == 0
+
+
+def test_provider_limiter_state_is_shared_across_phases_and_schedulers() -> None:
+    registry = ProviderLimiterRegistry()
+    first = AgentScheduler(limiters=registry)
+    second = AgentScheduler(limiters=registry)
+    reg = first.registry.register(
+        player_id="cat_01",
+        ipc_endpoint="http://agent",
+        model_type="openai",
+        api_url="https://api.example.com/v1",
+        model_name="m",
+    )
+    vote_limiter = first._provider_limiter(reg, "day_vote")
+    assert second._provider_limiter(reg, "day_discuss") is vote_limiter
+    assert first.provider_concurrency()[first._provider_key(reg)]["limit"] == vote_limiter.current_limit
+
+
+def test_breaker_opens_short_circuits_and_recovers_via_health_probe() -> None:
+    state = {"healthy": False, "act_calls": 0}
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/health":
+            return httpx.Response(200 if state["healthy"] else 503)
+        state["act_calls"] += 1
+        return _ok_response(request) if state["healthy"] else httpx.Response(500)
+
+    scheduler = _scheduler(_handler)
+    scheduler.max_transient_retries = 0
+    scheduler.breaker_failure_threshold = 2
+    scheduler.breaker_cooldown_sec = 0.01
+    agent = scheduler.registry.get("cat_01")
+
+    async def _run() -> None:
+        for _ in range(2):
+            await _act(scheduler, "cat_01")
+        assert agent.breaker_state == "open"
+        assert agent.online is False
+
+        result = await _act(scheduler, "cat_01")
+        assert result["fallback_reason"] == "circuit_open"
+        assert state["act_calls"] == 2
+
+        state["healthy"] = True
+        for _ in range(50):
+            if agent.breaker_state == "half_open":
+                break
+            await asyncio.sleep(0.01)
+        assert agent.breaker_state == "half_open"
+
+        result = await _act(scheduler, "cat_01")
+        assert "fallback_reason" not in result
+        assert agent.breaker_state == "closed"
+        assert agent.online is True and agent.entrusted is False
+        await scheduler.aclose()
+
+    asyncio.run(_run())
+    assert scheduler.metrics.short_circuit_calls == 1
+
+
+def test_release_clients_from_another_thread_stops_breaker_probes() -> None:
+    polls: list[int] = []
+
+    def _dead(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/health":
+            polls.append(1)
+        return httpx.Response(503)
+
+    scheduler = _scheduler(_dead)
+    scheduler.max_transient_retries = 0
+    scheduler.breaker_failure_threshold = 1
+    scheduler.breaker_cooldown_sec = scheduler.breaker_max_cooldown_sec = 0.05
+    loop = asyncio.new_event_loop()
+    runner = threading.Thread(target=loop.run_forever, daemon=True)
+    runner.start()
+    try:
+        asyncio.run_coroutine_threadsafe(_act(scheduler, "cat_01"), loop).result(timeout=5)
+        for _ in range(100):
+            if polls:
+                break
+            time.sleep(0.01)
+        assert polls, "breaker probe never polled /health"
+
+        # The finished room is released from a REST worker thread, not the scheduler's loop.
+        scheduler.release_clients()
+        time.sleep(0.1)
+        settled = len(polls)
+        time.sleep(0.3)
+        assert len(polls) == settled
+        assert scheduler._clients == {}
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        runner.join(timeout=5)
+
+
+def test_breaker_half_open_trial_is_single_attempt_and_reopens_with_backoff() -> None:
+    calls: list[int] = []
+
+    def _failing(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        return httpx.Response(503)
+
+    scheduler = _scheduler(_failing)
+    scheduler.breaker_cooldown_sec = 5.0
+    agent = scheduler.registry.get("cat_01")
+    agent.breaker_state = "half_open"
+    agent.breaker_cooldown_sec = 5.0
+
+    async def _run() -> None:
+        result = await _act(scheduler, "cat_01")
+        assert result["fallback_reason"] == "http_503"
+        await scheduler.aclose()
+
+    asyncio.run(_run())
+    assert len(calls) == 1
+    assert agent.breaker_state == "open"
+    assert agent.breaker_cooldown_sec == 10.0
+
+
+def test_latency_histogram_percentiles_and_retry_counters() -> None:
+    hist = LatencyHistogram()
+    for _ in range(98):
+        hist.observe(80.0)
+    hist.observe(12000.0)
+    hist.observe(70000.0)
+    assert hist.percentile(0.5) == 100.0
+    assert hist.percentile(0.99) == 15000.0
+    assert hist.to_dict()["max_ms"] == 70000.0
+    assert len(hist.counts) == len(LATENCY_BUCKETS_MS) + 1
+
+    calls: list[int] = []
+
+    def _flaky(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        return httpx.Response(429) if len(calls) == 1 else _ok_response(request)
+
+    scheduler = _scheduler(_flaky)
+    asyncio.run(_act(scheduler, "cat_01"))
+    data = scheduler.metrics.to_dict()
+    assert data["retry_attempts"] == 1
+    assert data["retries_by_reason"] == {"http_429": 1}
+    assert data["latency_by_phase"]["day_vote"]["count"] == 1
+    assert data["latency_by_player"]["cat_01"]["count"] == 1
+    assert data["latency_by_provider"]["model:mock"]["count"] == 1
+
+    text = render_scheduler_metrics({"r1": scheduler.metrics})
+    assert "# TYPE cat_agent_phase_latency_ms histogram" in text
+    assert 'cat_agent_retries_total{room_id="r1"} 1' in text
+    assert 'cat_agent_player_latency_ms_count{room_id="r1",player_id="cat_01"} 1' in text
+    assert 'cat_agent_phase_latency_ms_bucket{room_id="r1",phase="day_vote",le="+Inf"} 1' in text
+
+
+def test_deadline_shrinks_budgets_and_skips_retries_that_do_not_fit() -> None:
+    seen: list[tuple[float, int]] = []
+
+    def _timeout(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        seen.append((request.extensions["timeout"]["read"], payload["agent_config"]["api_timeout_sec"]))
+        raise httpx.ReadTimeout("slow", request=request)
+
+    scheduler = _scheduler(_timeout)
+    scheduler.deadline_margin_sec = 0.0
+    scheduler.retry_backoff_sec = 1.0
+
+    async def _run() -> dict:
+        return await scheduler.trigger_agent_action(
+            player_id="cat_01",
+            session_id="r1",
+            role="villager",
+            phase="day_vote",
+            visible_state={"player_id": "cat_01", "alive_player_ids": ["cat_01", "cat_02"]},
+            prompt_template="",
+            strategy_name="day_vote",
+            deadline_at=datetime.utcnow() + timedelta(seconds=2.5),
+        )
+
+    result = asyncio.run(_run())
+    assert len(seen) == 1
+    read_timeout, api_timeout = seen[0]
+    assert read_timeout <= 2.5
+    assert api_timeout == 1
+    assert result["fallback_reason"].startswith("timeout")
+    assert scheduler.metrics.retry_attempts == 0
+
+
+def test_deadline_already_passed_falls_back_without_network() -> None:
+    calls: list[int] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        return _ok_response(request)
+
+    scheduler = _scheduler(_handler)
+
+    async def _run() -> dict:
+        return await scheduler.trigger_agent_action(
+            player_id="cat_01",
+            session_id="r1",
+            role="villager",
+            phase="night_guard",
+            visible_state={"player_id": "cat_01", "alive_player_ids": ["cat_01", "cat_02"]},
+            prompt_template="",
+            strategy_name="night_guard",
+            deadline_at=datetime.utcnow() - timedelta(seconds=1),
+        )
+
+    result = asyncio.run(_run())
+    assert calls == []
+    assert result["fallback_reason"] == "deadline_exceeded"
+    assert scheduler.registry.get("cat_01").failed_count == 0
+
+
+def test_hedged_request_wins_over_slow_primary_and_is_audited() -> None:
+    calls: list[int] = []
+
+    async def _slow_then_fast(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(5)
+        return _ok_response(request)
+
+    scheduler = _scheduler(_slow_then_fast)
+    scheduler.hedge_enabled = True
+    scheduler.hedge_min_samples = 1
+    scheduler.hedge_min_delay_ms = 0.0
+    scheduler.metrics.observe_latency(40.0, phase="day_vote", provider="model:mock", player_id="cat_02")
+
+    async def _run() -> dict:
+        result = await _act(scheduler, "cat_01")
+        await scheduler.aclose()
+        return result
+
+    result = asyncio.run(_run())
+    assert "fallback_reason" not in result
+    assert len(calls) == 2
+    assert scheduler.metrics.hedged_requests == 1
+    assert scheduler.metrics.hedge_wins == 1
+    assert scheduler.audit_logs[-1]["won_by"] == "hedge"
+    limiter = scheduler._provider_limiter(scheduler.registry.get("cat_01"), "day_vote")
+    assert limiter.in_flight == 0
+
+
+def test_malformed_first_reply_does_not_win_the_hedge_race() -> None:
+    calls: list[int] = []
+
+    async def _malformed_then_valid(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(0.2)
+            return httpx.Response(200, json={"reasoning": "no action"})
+        await asyncio.sleep(0.4)
+        return _ok_response(request)
+
+    scheduler = _scheduler(_malformed_then_valid)
+    scheduler.hedge_enabled = True
+    scheduler.hedge_min_samples = 1
+    scheduler.hedge_min_delay_ms = 0.0
+    scheduler.metrics.observe_latency(40.0, phase="day_vote", provider="model:mock", player_id="cat_02")
+
+    result = asyncio.run(_act(scheduler, "cat_01"))
+    assert "fallback_reason" not in result and result["action"]["target"] == "cat_02"
+    assert scheduler.audit_logs[-1]["won_by"] == "hedge"
+
+
+def test_cancelled_caller_cancels_both_hedged_requests() -> None:
+    started: list[str] = []
+    cancelled: list[str] = []
+
+    async def _hang(request: httpx.Request) -> httpx.Response:
+        started.append(request.url.path)
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(request.url.path)
+            raise
+        return _ok_response(request)
+
+    scheduler = _scheduler(_hang)
+    limiter = ProviderLimiterRegistry().get("p", initial_limit=4, max_limit=4)
+
+    async def _run() -> None:
+        client = httpx.AsyncClient(transport=httpx.MockTransport(_hang))
+        # Cancelled while waiting to hedge, then after the hedge has fired.
+        for hedge_delay, requests in ((1.0, 1), (0.05, 3)):
+            race = asyncio.ensure_future(
+                scheduler._post_hedged(client, "http://agent/act", {}, 10.0, hedge_delay, limiter)
+            )
+            while len(started) < requests:
+                await asyncio.sleep(0.01)
+            race.cancel()
+            await asyncio.gather(race, return_exceptions=True)
+        await client.aclose()
+
+    asyncio.run(_run())
+    assert len(cancelled) == 3
+    assert limiter.in_flight == 0
+
+
+def test_hedging_leaves_fast_path_and_unhedged_phases_alone() -> None:
+    calls: list[int] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        return _ok_response(request)
+
+    scheduler = _scheduler(_handler)
+    scheduler.hedge_enabled = True
+    scheduler.hedge_min_samples = 1
+    assert scheduler._hedge_delay("day_vote") is None
+    scheduler.metrics.observe_latency(40.0, phase="day_discuss", provider="model:mock", player_id="cat_02")
+    assert scheduler._hedge_delay("day_discuss") is None
+
+    asyncio.run(_act(scheduler, "cat_01"))
+    assert len(calls) == 1
+    assert scheduler.audit_logs[-1]["won_by"] == "primary"
+    assert scheduler.metrics.hedged_requests == 0
+
+
+def test_scheduler_audit_rows_share_the_engine_audit_clock() -> None:
+    scheduler = _scheduler(_ok_response)
+    before = AuditEvent("phase_change", "system", {"phase": "day_vote", "round_no": 2})
+
+    async def _run() -> None:
+        await _act(scheduler, "cat_01")
+        await scheduler.aclose()
+
+    asyncio.run(_run())
+    after = AuditEvent("vote", "cat_01", {"target": "cat_02"})
+    events = normalize_game_events(
+        {"audit": [as_dict(before), as_dict(after)], "agent_audit": list(scheduler.audit_logs)}
+    )
+    kinds = [item["event_type"] for item in events]
+    assert kinds[0] == "phase_change" and kinds[-1] == "vote"
+    assert "agent_response" in kinds[1:-1]
@@ -0,0 +1,42 @@
+import json
+from datetime import datetime
+
+from app.core.audit_event import AuditEvent, AuditEventType, SpeechPayload, as_dict, as_event
+from app.core.audit_log import SpillingAuditLog
+
+
+def test_audit_event_reads_like_the_legacy_dict_row() -> None:
+    row = AuditEvent("agent_speech", "p1", {"phase": "day_discuss", "content": "hi", "extra_key": 1})
+    assert row.event_type is AuditEventType.AGENT_SPEECH
+    assert isinstance(row.payload, SpeechPayload)
+    assert row["event_type"] == "agent_speech" and type(row["event_type"]) is str
+    assert row.get("payload").get("content") == "hi"
+    assert row["payload"]["extra_key"] == 1
+    assert "role" not in row["payload"] and row["payload"].get("role", "x") == "x"
+    assert row.payload.content == "hi" and row.payload.role is None
+    assert dict(row["payload"]) == {"phase": "day_discuss", "content": "hi", "extra_key": 1}
+    assert row == {"ts": row["ts"], "event_type": "agent_speech", "actor_id": "p1", "payload": dict(row["payload"])}
+    datetime.fromisoformat(row["ts"])
+    assert json.loads(json.dumps(as_dict(row)))["payload"]["content"] == "hi"
+
+    custom = AuditEvent("custom_event", "system", {"k": "v"})
+    assert custom["event_type"] == "custom_event" and custom["payload"] == {"k": "v"}
+
+
+def test_audit_events_are_monotonic_and_spill_as_dicts() -> None:
+    log = SpillingAuditLog(memory_limit=2, segment_size=2)
+    events = [AuditEvent("vote", f"p{idx}", {"target": "p0"}) for idx in range(6)]
+    for event in events:
+        log.append(event)
+    assert [event.ts_ns for event in events] == sorted(event.ts_ns for event in events)
+    assert log.spilled == 4
+    assert list(log) == [as_dict(event) for event in events]
+
+
+def test_dict_rows_convert_to_events_with_their_original_timestamp() -> None:
+    event = AuditEvent("vote", "p1", {"target": "p2", "phase": "day_vote"})
+    assert as_event(event) is event
+    restored = as_event(as_dict(event))
+    assert restored.event_type is AuditEventType.VOTE and restored.payload.target == "p2"
+    assert restored.ts == event.ts and restored.ts_ns // 1000 == event.ts_ns // 1000
+    assert as_dict(restored) == as_dict(event)
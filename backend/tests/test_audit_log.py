@@ -0,0 +1,38 @@
+from app.agent.perspective_engine import PerspectiveCache
+from app.core.audit_log import SpillingAuditLog
+from app.core.models import PlayerState
+
+
+def test_spilling_log_keeps_bounded_tail_and_reads_back_from_disk() -> None:
+    log = SpillingAuditLog(memory_limit=8, segment_size=4)
+    rows = [{"event_type": "vote", "actor_id": f"p{idx}", "payload": {"target": "p0"}} for idx in range(50)]
+    for row in rows:
+        log.append(row)
+
+    assert len(log) == 50
+    assert log.spilled == 40
+    assert len(log._recent) < 12
+    assert list(log) == rows
+    assert log[3] == rows[3] and log[-1] is rows[-1]
+    assert log[-30:] == rows[-30:]
+    assert log[5:19] == rows[5:19]
+    assert log[45:] == rows[45:]
+    assert log[60:] == []
+
+    log.close()
+    assert log._file is None
+    assert list(log) == rows[40:]
+
+
+def test_perspective_cache_cursor_survives_spilled_rows() -> None:
+    log = SpillingAuditLog(memory_limit=4, segment_size=2)
+    players = {pid: PlayerState(player_id=pid, nickname=pid) for pid in ("p1", "p2")}
+    cache = PerspectiveCache()
+    for idx in range(6):
+        log.append({"event_type": "vote", "actor_id": "p1", "payload": {"target": "p2"}, "ts": str(idx)})
+    assert len(cache.public_votes(log, players)) == 6
+    for idx in range(6, 20):
+        log.append({"event_type": "vote", "actor_id": "p2", "payload": {"target": "p1"}, "ts": str(idx)})
+    votes = cache.public_votes(log, players)
+    assert [vote["ts"] for vote in votes] == [str(idx) for idx in range(20)]
+    assert log.spilled > 0
@@ -0,0 +1,45 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.agent.ai_god_orchestrator import AIGodOrchestrator, GodNarration
+from app.agent.god_orchestrator import GodOrchestrator
+from app.core.models import Phase, Role
+from tests.test_night_random_target_fallback import _make_engine
+
+
+class _DeadlineRecordingScheduler:
+    def __init__(self) -> None:
+        self.deadlines: list = []
+
+    async def trigger_agent_action(self, **kwargs):
+        self.deadlines.append(kwargs.get("deadline_at"))
+        return {"action": {"target": "owner"}, "reasoning": "开枪。"}
+
+
+async def _no_god(engine, phase: str) -> GodNarration:
+    return GodNarration(phase=phase, narration="", reasoning="")
+
+
+def _engine_with_dead_hunter(expired: bool):
+    engine = _make_engine()
+    hunter = engine.snapshot.players["p3"]
+    hunter.role = Role.HUNTER
+    hunter.alive = False
+    hunter.can_hunter_shoot = True
+    engine.snapshot.phase = Phase.DAY_DISCUSS
+    # The hunter shoots after the phase that killed them; its deadline is stale or cleared.
+    engine.snapshot.round_context.deadline_at = datetime.utcnow() - timedelta(seconds=5) if expired else None
+    return engine
+
+
+def test_hunter_shot_gets_a_fresh_deadline_in_both_orchestrators() -> None:
+    for expired in (True, False):
+        scheduler = _DeadlineRecordingScheduler()
+        asyncio.run(GodOrchestrator(scheduler=scheduler)._run_hunter_if_needed(_engine_with_dead_hunter(expired)))
+
+        ai_orchestrator = AIGodOrchestrator(scheduler=scheduler)
+        ai_orchestrator._ask_god = _no_god  # type: ignore[method-assign]
+        asyncio.run(ai_orchestrator._run_hunter_if_needed(_engine_with_dead_hunter(expired)))
+
+        assert len(scheduler.deadlines) == 2
+        assert all(deadline is not None and deadline > datetime.utcnow() for deadline in scheduler.deadlines)
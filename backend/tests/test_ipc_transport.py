@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from app.agent.agent_scheduler import AgentScheduler
+from app.agent.adaptive_limiter import ProviderLimiterRegistry
+from app.agent.child_process_manager import ChildAgentProcessManager
+from app.agent.ipc_transport import TRANSPORT_UDS, ipc_url, split_uds, sync_client, uds_endpoint, uds_supported
+from app.room.room_manager import RoomManager
+
+
+def test_uds_endpoint_round_trip_and_urls() -> None:
+    endpoint = uds_endpoint("/tmp/cat agents/r1/p1.sock", "/agents/r1/p1")
+    assert endpoint.startswith("http+unix://%2Ftmp%2Fcat%20agents")
+    assert split_uds(endpoint) == ("/tmp/cat agents/r1/p1.sock", "/agents/r1/p1")
+    assert ipc_url(endpoint, "/act") == "http://localhost/agents/r1/p1/act"
+    assert ipc_url("http://127.0.0.1:9101/", "/health") == "http://127.0.0.1:9101/health"
+    assert split_uds("http://127.0.0.1:9101") is None
+
+
+def test_api_registered_uds_endpoint_must_live_under_runtime_dir(tmp_path) -> None:
+    manager = RoomManager(repository=object())  # type: ignore[arg-type]
+    manager.child_agents.runtime_dir = tmp_path / "agents"
+    room_id = manager.create_ai_room(player_count=8)["room_id"]
+    player_id = next(iter(manager.must_get_room(room_id).engine.snapshot.players))
+    register = lambda endpoint: manager.register_agent(  # noqa: E731
+        room_id, player_id, None, endpoint, "mock", 5, skip_endpoint_check=True
+    )
+
+    for outside in ("/var/run/docker.sock", str(tmp_path / "agents" / ".." / "db.sock")):
+        with pytest.raises(ValueError, match="runtime dir"):
+            register(uds_endpoint(outside))
+    inside = uds_endpoint(str(tmp_path / "agents" / room_id / "p.sock"))
+    assert register(inside)["ipc_endpoint"] == inside
+    assert register("http://127.0.0.1:9101")["ipc_endpoint"] == "http://127.0.0.1:9101"
+
+
+@pytest.mark.skipif(not uds_supported(), reason="unix domain sockets unavailable")
+def test_child_agent_over_unix_socket_serves_scheduler_and_health(tmp_path) -> None:
+    manager = ChildAgentProcessManager()
+    manager.runtime_dir = tmp_path
+    endpoints = manager.bootstrap_room(
+        room_id="r1", player_ids=["p1"], transport=TRANSPORT_UDS, startup_timeout_sec=30
+    )
+    try:
+        endpoint = endpoints["p1"]
+        assert split_uds(endpoint)[0] == str(tmp_path / "r1" / "p1.sock")
+        assert manager.status("r1")["p1"]["transport"] == TRANSPORT_UDS
+        with sync_client(endpoint, timeout=5) as client:
+            assert client.get(ipc_url(endpoint, "/health")).status_code == 200
+
+        scheduler = AgentScheduler(limiters=ProviderLimiterRegistry())
+        scheduler.registry.register(player_id="p1", ipc_endpoint=endpoint, model_type="mock")
+
+        async def _run() -> dict:
+            try:
+                return await scheduler.trigger_agent_action(
+                    player_id="p1",
+                    session_id="r1",
+                    role="villager",
+                    phase="day_vote",
+                    visible_state={"player_id": "p1", "alive_player_ids": ["p1", "p2"]},
+                    prompt_template="",
+                    strategy_name="day_vote",
+                )
+            finally:
+                await scheduler.aclose()
+
+        result = asyncio.run(_run())
+        assert not result.get("fallback_reason")
+    finally:
+        manager.stop_all()
+    assert not (tmp_path / "r1").exists()
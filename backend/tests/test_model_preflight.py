@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from app.agent.model_preflight import ModelPreflightCache, preflight_key
+from app.room.room_manager import RoomManager
+
+
+class _NullRepository:
+    pass
+
+
+def test_concurrent_checks_share_one_probe_and_cache_success() -> None:
+    cache = ModelPreflightCache(ttl_sec=60)
+    calls: list[int] = []
+
+    def probe() -> None:
+        calls.append(1)
+        time.sleep(0.1)
+
+    workers = [threading.Thread(target=cache.check, args=("k", probe)) for _ in range(6)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=5)
+    assert calls == [1]
+    assert cache.check("k", probe) is True
+    status = cache.status()
+    assert (status["probes"], status["joined"] + status["hits"]) == (1, 6)
+
+
+def test_failures_are_not_cached_and_providers_probe_concurrently() -> None:
+    cache = ModelPreflightCache(ttl_sec=60)
+
+    def failing() -> None:
+        raise ValueError("model api preflight failed")
+
+    with pytest.raises(ValueError):
+        cache.check("bad", failing)
+    with pytest.raises(ValueError):
+        cache.check("bad", failing)
+    assert cache.status()["failures"] == 2
+
+    started = time.perf_counter()
+    outcomes = cache.check_many({"a": lambda: time.sleep(0.2), "b": lambda: time.sleep(0.2), "bad": failing})
+    assert time.perf_counter() - started < 0.35
+    assert outcomes["a"] is False and outcomes["b"] is False
+    assert isinstance(outcomes["bad"], ValueError)
+
+
+def test_preflight_key_ignores_cats_without_model_access_and_hides_secret() -> None:
+    assert preflight_key(None, None, None, None) is None
+    assert preflight_key("https://api.example.com/v1", None, "m", None) is None
+    key = preflight_key("https://API.example.com/v1/", "sk-secret", "M", None)
+    assert key == preflight_key("https://api.example.com/v1", "sk-secret", "m", None)
+    assert "sk-secret" not in key
+
+
+def test_bootstrap_preflight_probes_once_per_distinct_provider() -> None:
+    manager = RoomManager(repository=_NullRepository(), preflights=ModelPreflightCache(ttl_sec=60))  # type: ignore[arg-type]
+    probed: list[str] = []
+    manager._assert_agent_model_access = lambda **kwargs: probed.append(kwargs["api_url"])  # type: ignore[method-assign]
+    configs = [
+        {
+            "player_id": f"p{idx}",
+            "endpoint": f"http://127.0.0.1:{9101 + idx}",
+            "api_url": "https://a.example.com/v1" if idx < 11 else "https://b.example.com/v1",
+            "api_key": "key",
+            "model_name": "m",
+        }
+        for idx in range(12)
+    ]
+    first = manager._preflight_bootstrap_providers(configs, None, 20)
+    assert sorted(probed) == ["https://a.example.com/v1", "https://b.example.com/v1"]
+    assert first == {"providers": 2, "cached": 0, "probed": 2}
+
+    second = manager._preflight_bootstrap_providers(configs, None, 20)
+    assert len(probed) == 2
+    assert second == {"providers": 2, "cached": 2, "probed": 0}
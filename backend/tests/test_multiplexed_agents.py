@@ -0,0 +1,89 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app.agent.child_process_manager import AGENT_MODE_MULTIPLEXED, ChildAgentProcessManager
+from cat_agent_template import multiplexed
+from cat_agent_template.multiplexed import app as mux_app
+from tests.test_warm_agent_pool import _FakeProcess
+
+
+def _act_payload(player_id: str) -> dict:
+    return {
+        "session_id": "room1",
+        "player_id": player_id,
+        "role": "villager",
+        "phase": "day_vote",
+        "visible_state": {"alive_player_ids": [player_id, "other"]},
+        "prompt_template": "vote",
+    }
+
+
+def test_multiplexed_host_routes_act_by_player_id() -> None:
+    client = TestClient(mux_app)
+    for player_id in ("p1", "p2"):
+        resp = client.post(f"/agents/room1/{player_id}/act", json=_act_payload(player_id))
+        assert resp.status_code == 200
+        assert "action" in resp.json()
+    assert client.get("/agents/room1/p1/health").json()["player_id"] == "p1"
+
+    mismatch = client.post("/agents/room1/p1/act", json=_act_payload("p2"))
+    assert mismatch.status_code == 400
+
+    agents = {item["player_id"]: item["calls"] for item in client.get("/agents").json()["agents"]}
+    assert agents["p1"] == 1 and agents["p2"] == 1
+    assert client.delete("/agents/room1").json()["dropped"] == 2
+
+
+def test_multiplexed_bootstrap_shares_one_host_process() -> None:
+    manager = ChildAgentProcessManager()
+    spawned: list[tuple[str, int]] = []
+
+    def spawn(host: str, port: int, app: str = "", **kwargs) -> _FakeProcess:
+        spawned.append((app, port))
+        return _FakeProcess()
+
+    manager._spawn_child = spawn  # type: ignore[method-assign]
+    manager._wait_health = lambda endpoint, timeout: None  # type: ignore[method-assign]
+
+    first = manager.bootstrap_room(room_id="r1", player_ids=["a", "b"], mode=AGENT_MODE_MULTIPLEXED)
+    second = manager.bootstrap_room(room_id="r2", player_ids=["c"], mode=AGENT_MODE_MULTIPLEXED)
+    assert len(spawned) == 1 and spawned[0][0] == "cat_agent_template.multiplexed:app"
+    assert first["a"].endswith("/agents/r1/a") and second["c"].endswith("/agents/r2/c")
+    assert manager.status("r1")["b"]["mode"] == AGENT_MODE_MULTIPLEXED
+    assert manager.multiplexed_status()[0]["rooms"] == 2
+
+    manager.stop_room("r1")
+    assert manager.multiplexed_status()[0]["running"] is True
+    manager.stop_all()
+    assert manager.multiplexed_status() == []
+
+
+def test_idle_logical_agents_expire_on_workers_the_delete_missed(monkeypatch) -> None:
+    client = TestClient(mux_app)
+    assert client.post("/agents/room_idle/p1/act", json=_act_payload("p1")).status_code == 200
+    monkeypatch.setattr(multiplexed, "AGENT_IDLE_TTL_SEC", 0)
+    monkeypatch.setattr(multiplexed, "_next_sweep_at", 0.0)
+    time.sleep(0.01)
+    rooms = {item["room_id"] for item in client.get("/agents").json()["agents"]}
+    assert "room_idle" not in rooms
+
+
+def test_stop_room_drops_multiplexed_agents_off_the_caller_thread() -> None:
+    manager = ChildAgentProcessManager()
+    manager._spawn_child = lambda host, port, **kwargs: _FakeProcess()  # type: ignore[method-assign]
+    manager._wait_health = lambda endpoint, timeout: None  # type: ignore[method-assign]
+    dropped = threading.Event()
+    threads: list[int] = []
+
+    def _drop(base_endpoint: str, room_id: str) -> None:
+        threads.append(threading.get_ident())
+        dropped.set()
+
+    manager._drop_multiplexed_room = _drop  # type: ignore[method-assign]
+    manager.bootstrap_room(room_id="r1", player_ids=["a"], mode=AGENT_MODE_MULTIPLEXED)
+    manager.stop_room("r1")
+    assert dropped.wait(timeout=5)
+    assert threads and threads[0] != threading.get_ident()
+    manager.stop_all()
@@ -1,3 +1,5 @@
+import json
+
 from app.agent.perspective_engine import PerspectiveEngine
 from app.core.models import Phase, Role
 from app.engine.game_engine import GameEngine
@@ -212,3 +214,66 @@ def test_memory_context_role_aware_marker_filtering_for_seer_debug_leak() -> Non
     seer_visible = PerspectiveEngine.build_visible_state(engine, "cat_07")
     seer_public_memory = (seer_visible.get("memory_context") or {}).get("public_memory") or []
     assert any("seer_result" in str(item.get("content") or "") for item in seer_public_memory)
+
+
+def _assert_incremental_parity(engine: GameEngine) -> None:
+    snapshot = engine.snapshot
+    alive_count = len([p for p in snapshot.players.values() if p.alive])
+    dead_count = len(snapshot.players) - alive_count
+    for pid, player in snapshot.players.items():
+        visible = PerspectiveEngine.build_visible_state(engine, pid)
+        expected_memory = PerspectiveEngine._build_memory_context(
+            audit_log=snapshot.action_audit_log,
+            players=snapshot.players,
+            viewer_id=pid,
+            viewer_role=player.role,
+            round_no=snapshot.round_context.round_no,
+            alive_count=alive_count,
+            dead_count=dead_count,
+        )
+        expected_votes = PerspectiveEngine._extract_public_votes(snapshot.action_audit_log, snapshot.players)
+        assert json.dumps(visible["memory_context"], ensure_ascii=False) == json.dumps(expected_memory, ensure_ascii=False)
+        assert json.dumps(visible["public_vote_log"], ensure_ascii=False) == json.dumps(expected_votes, ensure_ascii=False)
+
+
+def test_incremental_memory_context_matches_full_scan() -> None:
+    engine = _started_engine()
+    _assert_incremental_parity(engine)
+
+    for round_idx in range(3):
+        for wolf_id in ("cat_01", "cat_02", "cat_03", "cat_04"):
+            engine._audit(
+                "agent_speech",
+                wolf_id,
+                {"phase": "night_wolf_discuss", "role": Role.WEREWOLF.value, "content": f"第{round_idx}夜刀9号"},
+            )
+            if engine.snapshot.players[wolf_id].alive:
+                engine.submit_night_action(wolf_id, "cat_10" if round_idx == 0 else "cat_11")
+        _assert_incremental_parity(engine)
+        while engine.snapshot.phase != Phase.DAY_DISCUSS and not engine.snapshot.game_over:
+            engine.advance_phase()
+        for pid, player in engine.snapshot.players.items():
+            if not player.alive:
+                continue
+            engine._audit(
+                "agent_speech",
+                pid,
+                {"phase": Phase.DAY_DISCUSS.value, "role": player.role.value, "content": f"{pid} 第{round_idx}轮发言"},
+            )
+        engine._audit(
+            "god_narration",
+            "god",
+            {"phase": "day_discuss", "content": "debug: seer_result={\"is_wolf\":true}"},
+        )
+        _assert_incremental_parity(engine)
+        engine.advance_phase()
+        alive = [pid for pid, p in engine.snapshot.players.items() if p.alive and p.can_vote]
+        for voter in alive:
+            engine.submit_vote(voter, alive[-1] if voter != alive[-1] else alive[0])
+        engine.advance_phase()
+        _assert_incremental_parity(engine)
+        if engine.snapshot.game_over:
+            break
+
+    engine.snapshot.players["cat_09"].nickname = "renamed"
+    _assert_incremental_parity(engine)
@@ -0,0 +1,70 @@
+from app.core.models import DeathCause, Role
+from app.engine.game_engine import GameEngine
+
+
+def _started_engine() -> GameEngine:
+    engine = GameEngine(room_id="r_index", owner_id="cat_01")
+    for i in range(1, 13):
+        engine.add_player(f"cat_{i:02d}", f"Cat {i:02d}")
+    engine.start_game("cat_01")
+    return engine
+
+
+def _expected(engine: GameEngine) -> dict:
+    players = engine.snapshot.players.values()
+    return {
+        "alive": [p.player_id for p in players if p.alive],
+        "wolves": [p.player_id for p in players if p.alive and p.role == Role.WEREWOLF],
+        "voters": [p.player_id for p in players if p.alive and p.can_vote],
+    }
+
+
+def _indexed(engine: GameEngine) -> dict:
+    index = engine.players_index
+    return {"alive": index.alive_ids(), "wolves": index.alive_ids(Role.WEREWOLF), "voters": index.voter_ids()}
+
+
+def test_index_follows_kills_and_direct_player_mutation() -> None:
+    engine = _started_engine()
+    assert _indexed(engine) == _expected(engine)
+
+    wolf = engine.players_index.alive_ids(Role.WEREWOLF)[0]
+    engine._kill_player(wolf, DeathCause.VOTE)
+    assert wolf not in engine.players_index.alive_ids()
+    assert _indexed(engine) == _expected(engine)
+
+    # Tests and tools flip roles and liveness directly; the index must notice.
+    engine.snapshot.players["cat_03"].role = Role.WEREWOLF
+    engine.snapshot.players["cat_04"].alive = False
+    engine.snapshot.players["cat_05"].can_vote = False
+    assert _indexed(engine) == _expected(engine)
+    assert engine._find_alive_role(Role.WEREWOLF) is not None
+
+
+def test_nickname_lookup_and_target_normalization_use_index() -> None:
+    engine = _started_engine()
+    index = engine.players_index
+    assert index.ids_by_nickname("Cat 07") == ["cat_07"]
+    assert index.ids_by_nickname("cat 07", case_insensitive=True) == ["cat_07"]
+
+    engine.snapshot.players["cat_07"].nickname = "Tabby"
+    assert engine.players_index.ids_by_nickname("Tabby") == ["cat_07"]
+    assert engine.players_index.ids_by_nickname("Cat 07") == []
+
+    from app.agent.god_orchestrator import GodOrchestrator
+
+    assert GodOrchestrator._normalize_target(engine, "目标是 Tabby") == "cat_07"
+    engine._kill_player("cat_07", DeathCause.WOLF)
+    assert GodOrchestrator._normalize_target(engine, "Tabby") is None
+
+
+def test_writes_in_one_room_do_not_invalidate_another_rooms_index() -> None:
+    engine = _started_engine()
+    other = _started_engine()
+    index = engine.players_index
+    seen = index.epoch.value
+
+    other.snapshot.players["cat_02"].alive = False
+    assert engine.players_index is index and index.epoch.value == seen
+    assert other.players_index.epoch is not index.epoch
+    assert "cat_02" not in other.players_index.alive_ids()
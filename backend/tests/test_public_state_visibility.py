@@ -1,4 +1,4 @@
-from app.core.models import Role
+from app.core.models import DeathCause, Role
 from app.engine.game_engine import GameEngine
 from app.websocket.handler import WSConnectionManager
 
@@ -142,3 +142,46 @@ def test_player_view_hides_sensitive_god_narration_fields() -> None:
     assert first.get("phase_instructions") == "狼人内部沟通并选择目标。"
     assert "rulings" not in first
     assert "next_phase_hint" not in first
+
+
+def test_public_state_is_cached_until_state_version_changes() -> None:
+    engine = _started_engine()
+    first = engine.public_state()
+    assert engine.public_state() is first
+    assert first["state_version"] == engine.state_version
+
+    engine._audit(
+        "agent_speech",
+        "cat_02",
+        {"phase": "day_discuss", "role": Role.VILLAGER.value, "content": "hello"},
+    )
+    second = engine.public_state()
+    assert second is not first
+    assert second["state_version"] > first["state_version"]
+    assert second["speech_history"][-1]["content"] == "hello"
+
+    engine.mark_online_status("cat_03", False)
+    third = engine.public_state()
+    assert third is not second
+    assert next(p for p in third["players"] if p["player_id"] == "cat_03")["online"] is False
+
+
+def test_public_state_projection_tracks_deaths_and_history_window() -> None:
+    engine = _started_engine()
+    limit = GameEngine.PUBLIC_SPEECH_HISTORY_LIMIT
+    for i in range(limit + 5):
+        engine._audit(
+            "agent_speech",
+            "cat_01",
+            {"phase": "day_discuss", "role": Role.VILLAGER.value, "content": f"speech {i}"},
+        )
+    engine._kill_player("cat_04", DeathCause.WOLF)
+
+    state = engine.public_state()
+    rows = state["speech_history"]
+    assert len(rows) == limit
+    assert rows[0]["content"] == "speech 5"
+    assert rows[-1]["content"] == f"speech {limit + 4}"
+    cat_04 = next(p for p in state["players"] if p["player_id"] == "cat_04")
+    assert cat_04["alive"] is False
+    assert cat_04["death_cause"] == DeathCause.WOLF.value
@@ -0,0 +1,186 @@
+import json
+import queue
+from concurrent.futures import Future
+
+from sqlalchemy import text
+
+from app.core.audit_event import as_dict
+from app.storage.repository import SQLiteRepository
+
+
+def test_background_writer_batches_and_flushes(tmp_path) -> None:
+    repo = SQLiteRepository(str(tmp_path / "games.db"))
+    repo.write_linger_sec = 0.2
+    futures = [
+        repo.enqueue_finished_game(room_id=f"r{idx}", winner="wolf", rounds=idx, payload={"audit": [{"n": idx}]})
+        for idx in range(5)
+    ]
+    repo.flush()
+    ids = [future.result(timeout=5) for future in futures]
+    assert len(set(ids)) == 5
+
+    record = repo.get_game_record(ids[3])
+    assert record is not None
+    assert record["room_id"] == "r3"
+    assert record["payload"] == {"audit": [{"n": 3}]}
+
+    with repo.engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+
+    late = repo.enqueue_finished_game(room_id="late", winner="good", rounds=1, payload={})
+    repo.close()
+    assert late.done()
+    assert repo.get_game_record(late.result())["room_id"] == "late"
+
+
+def test_full_write_queue_falls_back_to_inline_write(tmp_path) -> None:
+    repo = SQLiteRepository(str(tmp_path / "games.db"))
+    repo._ensure_writer = lambda: None  # type: ignore[method-assign]
+    repo._write_queue = queue.Queue(maxsize=1)
+    repo._write_queue.put_nowait(({}, Future()))
+
+    future = repo.enqueue_finished_game(room_id="overflow", winner="good", rounds=1, payload={"audit": []})
+    assert future.done()
+    assert repo.get_game_record(future.result())["room_id"] == "overflow"
+
+
+def _finished_payload() -> dict:
+    return {
+        "players": [
+            {"player_id": "p1", "role": "werewolf"},
+            {"player_id": "p2", "role": "seer"},
+            {"player_id": "p3", "role": "villager"},
+        ],
+        "audit": [
+            {"ts": "2026-01-01T00:00:00", "event_type": "phase_change", "actor_id": "system", "payload": {"phase": "night_wolf", "round_no": 1}},
+            {"ts": "2026-01-01T00:00:02", "event_type": "night_action", "actor_id": "p1", "payload": {"phase": "night_wolf", "target": "p3"}},
+            {"ts": "2026-01-01T00:00:05", "event_type": "phase_change", "actor_id": "system", "payload": {"phase": "day_vote", "round_no": 2}},
+            {"ts": "2026-01-01T00:00:07", "event_type": "auto_action", "actor_id": "p2", "payload": {"phase": "day_vote"}},
+        ],
+        "agent_audit": [
+            {"event": "agent_response", "player_id": "p1", "phase": "night_wolf", "model_type": "gpt", "latency_ms": 100.0, "response": {"action": {"target": "p3"}}, "ts": "2026-01-01T00:00:01"},
+            {"event": "god_visible_state", "player_id": "p2", "phase": "day_vote", "ts": "2026-01-01T00:00:06"},
+            {"event": "agent_response", "player_id": "p2", "phase": "day_vote", "model_type": "gpt", "latency_ms": 300.0, "response": {"action": {"target": "p1"}}, "ts": "2026-01-01T00:00:06"},
+            {"event": "fallback_action", "player_id": "p3", "phase": "day_vote", "strategy": "random", "reason": "timeout", "response": {"target": "p1"}, "ts": "2026-01-01T00:00:06"},
+        ],
+    }
+
+
+def test_game_events_are_normalized_and_aggregated(tmp_path) -> None:
+    repo = SQLiteRepository(str(tmp_path / "games.db"))
+    first = repo.save_finished_game(room_id="r1", winner="wolf", rounds=2, payload=_finished_payload())
+    repo.save_finished_game(room_id="r2", winner="good", rounds=2, payload=_finished_payload())
+
+    with repo.engine.connect() as conn:
+        rows = conn.execute(
+            text("SELECT seq, round_no, phase, event_type, actor_id, target_id, is_fallback FROM game_events WHERE record_id = :rid ORDER BY seq"),
+            {"rid": first},
+        ).all()
+    assert [row.event_type for row in rows] == [
+        "phase_change", "agent_response", "night_action", "phase_change", "agent_response", "fallback_action", "auto_action",
+    ]
+    assert rows[1].target_id == "p3" and rows[1].round_no == 1
+    assert rows[5].round_no == 2 and rows[5].phase == "day_vote" and rows[5].is_fallback
+    assert rows[6].is_fallback
+
+    assert repo.win_rate_by_role_distribution() == [
+        {
+            "role_distribution": "seer:1,villager:1,werewolf:1",
+            "games": 2,
+            "wins": {"good": 1, "wolf": 1},
+            "win_rate": {"good": 0.5, "wolf": 0.5},
+        }
+    ]
+    assert repo.latency_by_model() == [{"model_type": "gpt", "responses": 4, "avg_latency_ms": 200.0, "max_latency_ms": 300.0}]
+    assert repo.fallback_rate_by_phase() == [
+        {"phase": "day_vote", "decisions": 4, "fallbacks": 2, "fallback_rate": 0.5},
+        {"phase": "night_wolf", "decisions": 2, "fallbacks": 0, "fallback_rate": 0.0},
+    ]
+
+
+def test_backfill_normalizes_legacy_records(tmp_path) -> None:
+    repo = SQLiteRepository(str(tmp_path / "games.db"))
+    record_id = repo.save_finished_game(room_id="old", winner="good", rounds=1, payload=_finished_payload())
+    with repo.engine.begin() as conn:
+        conn.execute(text("DELETE FROM game_events"))
+        conn.execute(text("UPDATE game_records SET role_distribution = NULL"))
+
+    assert repo.backfill_game_events() == 1
+    assert repo.backfill_game_events() == 0
+    with repo.engine.connect() as conn:
+        count = conn.execute(text("SELECT COUNT(*) FROM game_events WHERE record_id = :rid"), {"rid": record_id}).scalar()
+    assert count == 7
+
+
+def test_compressed_record_pages_and_rebuilds_public_state(tmp_path) -> None:
+    from app.engine.game_engine import GameEngine
+    from app.room.room_manager import RoomManager
+
+    engine = GameEngine(room_id="r_replay", owner_id="cat_01")
+    for idx in range(1, 13):
+        engine.add_player(f"cat_{idx:02d}", f"cat_{idx:02d}")
+    expected: list[dict] = []
+
+    def _view(state: dict) -> dict:
+        return {
+            "phase": state["phase"],
+            "round_no": state["round_no"],
+            "alive": {p["player_id"]: p["alive"] for p in state["players"]},
+            "deaths": state["deaths_this_round"],
+            "speech": [item["content"] for item in state["speech_history"]],
+        }
+
+    engine.add_audit_listener(lambda _row: expected.append(_view(engine.public_state())))
+    engine.start_game("cat_01")
+    for _ in range(40):
+        if engine.snapshot.game_over:
+            break
+        engine.timeout_autorun_current_phase()
+        engine.advance_phase()
+
+    repo = SQLiteRepository(str(tmp_path / "games.db"))
+    repo.audit_chunk_size = 7
+    payload = {
+        "audit": [as_dict(row) for row in engine.snapshot.action_audit_log],
+        "agent_audit": [{"player_id": "cat_01", "visible_state": {"speech_history": ["..."] * 50}}],
+        "players": [
+            {"player_id": p.player_id, "nickname": p.nickname, "role": p.role.value, "alive": p.alive}
+            for p in engine.snapshot.players.values()
+        ],
+    }
+    record_id = repo.save_finished_game(room_id="r_replay", winner="wolf", rounds=2, payload=payload)
+    legacy_id = repo.save_finished_game(room_id="legacy", winner="wolf", rounds=2, payload=payload)
+    with repo.engine.begin() as conn:
+        raw = json.dumps(payload, ensure_ascii=False)
+        conn.execute(
+            text("UPDATE game_records SET payload_json = :raw, payload_format = NULL, payload_blob = NULL WHERE id = :rid"),
+            {"raw": raw, "rid": legacy_id},
+        )
+        conn.execute(text("DELETE FROM game_audit_chunks WHERE record_id = :rid"), {"rid": legacy_id})
+        stored = conn.execute(text("SELECT length(payload_blob) FROM game_records WHERE id = :rid"), {"rid": record_id}).scalar()
+    assert stored < len(raw)
+    assert repo.get_game_record(record_id)["payload"]["audit"] == payload["audit"]
+    assert repo.get_game_record(legacy_id)["payload"]["audit"] == payload["audit"]
+
+    manager = RoomManager(repository=repo)
+    total = len(payload["audit"])
+    for rid in (record_id, legacy_id):
+        page = manager.replay_events(rid, offset=5, limit=9)
+        assert page["events"] == payload["audit"][5:14]
+        assert page["total"] == total and page["next_offset"] == 14 and page["header"] is None
+        assert manager.replay_events(rid, offset=total - 1, limit=9)["next_offset"] is None
+
+    # Phase boundaries are where the live engine has settled every non-audited side effect.
+    boundaries = [idx + 1 for idx, row in enumerate(payload["audit"][:-1]) if row["event_type"] == "phase_change"]
+    for index in boundaries:
+        assert _view(manager.replay_state(record_id, index)["state"]) == expected[index - 1]
+    final = manager.replay_state(record_id, total + 10)
+    assert final["event_index"] == total and final["state"]["game_over"]
+
+    # Scrubbing and page 0 read only the roster header, never the full payload blob.
+    with repo.engine.begin() as conn:
+        conn.execute(text("UPDATE game_records SET payload_blob = x'00' WHERE id = :rid"), {"rid": record_id})
+    header = manager.replay_events(record_id, offset=0, limit=3)["header"]
+    assert header["payload"] == {"players": payload["players"]} and header["audit_count"] == total
+    assert manager.replay_state(record_id, total)["state"]["game_over"]
+    assert manager.replay_events(legacy_id, offset=0, limit=3)["header"]["payload"] == {"players": payload["players"]}
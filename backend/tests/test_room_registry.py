@@ -0,0 +1,121 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.audit_log import SpillingAuditLog
+from app.room import room_manager as room_manager_module
+from app.room.room_manager import RoomManager
+from app.room.room_registry import ShardedRoomRegistry
+
+
+class _BlockingRepository:
+    def __init__(self) -> None:
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.saved: list[str] = []
+
+    def enqueue_finished_game(self, room_id: str, winner: str, rounds: int, payload: dict) -> int:
+        self.entered.set()
+        self.release.wait(timeout=5)
+        self.saved.append(room_id)
+        return len(self.saved)
+
+
+def test_sharded_registry_put_get_pop_and_clear() -> None:
+    registry: ShardedRoomRegistry[str] = ShardedRoomRegistry(shard_count=4)
+    for idx in range(20):
+        registry.put(f"room{idx}", f"value{idx}")
+    assert len(registry) == 20
+    assert registry.get("room7") == "value7"
+    assert registry.pop("room7") == "value7"
+    assert registry.get("room7") is None
+    assert sorted(registry.clear()) == sorted(f"value{idx}" for idx in range(20) if idx != 7)
+    assert len(registry) == 0
+
+
+def test_finished_game_is_persisted_once_without_blocking_other_rooms() -> None:
+    repository = _BlockingRepository()
+    manager = RoomManager(repository=repository)  # type: ignore[arg-type]
+    finished = manager.create_ai_room(player_count=8)["room_id"]
+    other = manager.create_ai_room(player_count=8)["room_id"]
+    manager.must_get_room(finished).engine.snapshot.game_over = True
+
+    worker = threading.Thread(target=manager.remove_room_if_game_over, args=(finished,))
+    worker.start()
+    assert repository.entered.wait(timeout=5)
+
+    lookup = threading.Thread(target=lambda: (manager.get_room(other), manager.health_summary()))
+    lookup.start()
+    lookup.join(timeout=1)
+    assert not lookup.is_alive()
+
+    manager.remove_room_if_game_over(finished)
+    repository.release.set()
+    worker.join(timeout=5)
+    assert repository.saved == [finished]
+
+
+def test_async_finalization_runs_teardown_off_loop_with_detached_metrics() -> None:
+    repository = _BlockingRepository()
+    repository.release.set()
+    manager = RoomManager(repository=repository)  # type: ignore[arg-type]
+    room_id = manager.create_ai_room(player_count=8)["room_id"]
+    room = manager.must_get_room(room_id)
+    room.engine.snapshot.game_over = True
+    spilling = room.engine.snapshot.action_audit_log = SpillingAuditLog(memory_limit=1, segment_size=1)
+    for idx in range(3):
+        spilling.append({"event_type": "vote", "actor_id": f"p{idx}", "payload": {}})
+    assert spilling._file is not None
+    threads: list[str] = []
+    records: list[dict] = []
+    manager._teardown_finished_room = lambda rid, record: (  # type: ignore[method-assign]
+        threads.append(threading.current_thread().name),
+        records.append(record),
+    )
+
+    closed: list[bool] = []
+
+    async def _aclose() -> None:
+        closed.append(True)
+
+    room.orchestrator.scheduler.aclose = _aclose  # type: ignore[method-assign]
+
+    asyncio.run(manager.aremove_room_if_game_over(room_id))
+    assert closed == [True]
+    assert threads and threads[0] != threading.main_thread().name
+    metrics = room.orchestrator.scheduler.metrics
+    stored = records[0]["payload"]["metrics"]
+    assert stored == metrics.to_dict()
+    assert stored["by_error_type"] is not metrics.by_error_type
+    assert stored["retries_by_reason"] is not metrics.retries_by_reason
+    assert len(records[0]["payload"]["audit"]) == 3 and spilling._file is None
+    assert room.orchestrator.scheduler.audit_logs._file is None
+
+
+def test_rebootstrap_releases_clients_and_spill_files_of_stale_rooms(monkeypatch) -> None:
+    manager = RoomManager(repository=_BlockingRepository())  # type: ignore[arg-type]
+    stale = manager.must_get_room(manager.create_ai_room(player_count=9)["room_id"])
+    spilling = stale.engine.snapshot.action_audit_log = SpillingAuditLog(memory_limit=1, segment_size=1)
+    for idx in range(3):
+        spilling.append({"event_type": "vote", "actor_id": f"p{idx}", "payload": {}})
+    assert spilling._file is not None
+    released: list[bool] = []
+    stale.orchestrator.scheduler.release_clients = lambda: released.append(True)  # type: ignore[method-assign]
+    stopped: list[str] = []
+    manager.child_agents.stop_room = stopped.append  # type: ignore[method-assign]
+
+    cats = [{"id": f"c{idx}", "name": f"cat_{idx:02d}"} for idx in range(8)]
+    monkeypatch.setattr(room_manager_module, "load_frontend_profile", lambda: {"cats": cats, "monitor_config": {}})
+
+    def _stop_after_cleanup(**kwargs):
+        raise RuntimeError("stop after stale cleanup")
+
+    manager.create_ai_room = _stop_after_cleanup  # type: ignore[method-assign]
+    with pytest.raises(RuntimeError):
+        manager.bootstrap_from_frontend_env()
+
+    assert manager.get_room(stale.room_id) is None
+    assert stopped == [stale.room_id] and released == [True]
+    assert spilling._file is None
+    assert stale.orchestrator.scheduler.audit_logs._file is None
@@ -0,0 +1,63 @@
+import random
+
+from app.agent.fallback_strategies import FallbackStrategies
+from app.core.game_config import default_game_config
+from app.core.models import Phase
+from app.engine.simulator import _SimulatedTable, play_game, report_to_csv, run_simulation
+from tests.test_night_random_target_fallback import _make_engine
+
+
+def _strip_timings(report: dict) -> list[dict]:
+    return [{k: v for k, v in item.items() if k != "phase_mean_us"} for item in report["templates"]]
+
+
+def test_play_game_is_deterministic_per_seed() -> None:
+    config = default_game_config(player_count=10)
+    first = play_game(config, seed=42)
+    second = play_game(config, seed=42)
+    assert first.winner in {"wolf", "good"}
+    assert (first.winner, first.rounds, first.rejected_actions, first.phase_counts) == (
+        second.winner,
+        second.rounds,
+        second.rejected_actions,
+        second.phase_counts,
+    )
+
+
+def test_run_simulation_summary_does_not_depend_on_workers_or_batches() -> None:
+    inline = run_simulation(player_counts=[8, 12], games=6, seed=5, workers=1, batch_size=4)
+    pooled = run_simulation(player_counts=[8, 12], games=6, seed=5, workers=2, batch_size=2)
+    assert _strip_timings(inline) == _strip_timings(pooled)
+
+    template = inline["templates"][0]
+    assert template["player_count"] == 8
+    assert template["wolf_wins"] + template["good_wins"] + template["unfinished"] == 6
+    assert "night_wolf" in template["phase_mean_us"]
+    assert inline["total_games"] == 12 and inline["games_per_second"] > 0
+
+    lines = report_to_csv(inline).splitlines()
+    assert lines[0].startswith("player_count,games,wolf_win_rate")
+    assert len(lines) == 3
+
+
+def test_table_gives_seer_its_own_history_and_retries_rejected_witch_save() -> None:
+    for seed in range(20):
+        engine = _make_engine()
+        engine.snapshot.phase = Phase.NIGHT_SEER
+        engine.snapshot.players["p7"].last_seer_target = "p9"
+        table = _SimulatedTable(engine, FallbackStrategies(rng=random.Random(seed)))
+        table.act(Phase.NIGHT_SEER)
+        assert table.rejected == 0
+        assert engine.snapshot.round_context.night_actions.seer_target not in {None, "p7", "p9"}
+
+    engine = _make_engine()
+    engine.snapshot.phase = Phase.NIGHT_WITCH
+    context = engine.snapshot.round_context
+    # The antidote is refused because the guard already covers the wolf target.
+    context.wolf_target = context.night_actions.guard_target = "p3"
+    table = _SimulatedTable(engine, FallbackStrategies(rng=random.Random(1)))
+    table.act(Phase.NIGHT_WITCH)
+    witch = engine.snapshot.players["p6"]
+    assert table.rejected == 1
+    assert not context.night_actions.witch_save and not witch.used_antidote
+    assert context.night_actions.witch_poison_target is not None and witch.used_poison
@@ -0,0 +1,62 @@
+import asyncio
+
+from app.engine.game_engine import GameEngine
+from app.room.state_publisher import CoalescingStatePublisher
+
+
+def test_publisher_coalesces_bursts_and_always_sends_final_state() -> None:
+    counter = {"value": 0}
+    published: list[int] = []
+
+    async def _publish(state: dict) -> None:
+        published.append(state["value"])
+
+    publisher = CoalescingStatePublisher(lambda: dict(counter), _publish, min_interval_sec=10.0)
+
+    async def _run() -> None:
+        for _ in range(50):
+            counter["value"] += 1
+            publisher.notify()
+        await asyncio.sleep(0)
+        for _ in range(20):
+            counter["value"] += 1
+            publisher.notify()
+        await publisher.flush()
+
+    asyncio.run(_run())
+    assert published == [50, 70]
+    assert publisher.coalesced > 60
+
+
+def test_publisher_respects_rate_and_keeps_order() -> None:
+    counter = {"value": 0}
+    published: list[int] = []
+
+    async def _publish(state: dict) -> None:
+        published.append(state["value"])
+
+    publisher = CoalescingStatePublisher(lambda: dict(counter), _publish, min_interval_sec=0.02)
+
+    async def _run() -> None:
+        for _ in range(10):
+            counter["value"] += 1
+            publisher.notify()
+            await asyncio.sleep(0.005)
+        await publisher.flush()
+
+    asyncio.run(_run())
+    assert published == sorted(published)
+    assert published[-1] == 10
+    assert len(published) < 10
+
+
+def test_engine_audit_listener_receives_rows_until_removed() -> None:
+    engine = GameEngine(room_id="r_listen", owner_id="cat_01")
+    rows: list[str] = []
+    listener = lambda row: rows.append(row["event_type"])  # noqa: E731
+
+    engine.add_audit_listener(listener)
+    engine._audit("agent_speech", "cat_01", {"content": "hi"})
+    engine.remove_audit_listener(listener)
+    engine._audit("agent_speech", "cat_01", {"content": "bye"})
+    assert rows == ["agent_speech"]
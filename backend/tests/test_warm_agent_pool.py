@@ -0,0 +1,105 @@
+import threading
+import time
+
+from app.agent.child_process_manager import ChildAgentProcessManager, WarmAgentPool
+
+
+class _FakeProcess:
+    _next_pid = 1000
+
+    def __init__(self) -> None:
+        _FakeProcess._next_pid += 1
+        self.pid = _FakeProcess._next_pid
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self) -> None:
+        self.returncode = 0
+
+    def wait(self, timeout=None):
+        return self.returncode
+
+    def kill(self) -> None:
+        self.returncode = -9
+
+
+def _fake_pool(
+    size: int, max_uses: int = 2, gate: threading.Event | None = None
+) -> tuple[WarmAgentPool, list[_FakeProcess]]:
+    spawned: list[_FakeProcess] = []
+    ports = iter(range(9601, 9700))
+
+    def spawn(host: str, port: int) -> _FakeProcess:
+        proc = _FakeProcess()
+        spawned.append(proc)
+        return proc
+
+    pool = WarmAgentPool(
+        spawn=spawn,  # type: ignore[arg-type]
+        stop=ChildAgentProcessManager._stop_process,
+        wait_health=lambda endpoint, timeout: gate.wait(5) if gate is not None else None,
+        next_port=lambda host, start, reserved: next(ports),
+        size=size,
+        max_uses=max_uses,
+        host="127.0.0.1",
+    )
+    return pool, spawned
+
+
+def _wait_idle(pool: WarmAgentPool, idle: int) -> None:
+    deadline = time.time() + 5
+    while pool.status()["idle"] < idle and time.time() < deadline:
+        time.sleep(0.01)
+    assert pool.status()["idle"] >= idle
+
+
+def test_pool_leases_counts_misses_and_recycles_after_max_uses() -> None:
+    gate = threading.Event()
+    gate.set()
+    pool, spawned = _fake_pool(size=2, max_uses=2, gate=gate)
+    assert pool.lease("127.0.0.1") is None
+    _wait_idle(pool, 2)
+
+    # Hold refills in their health check so the idle queue only changes through the test.
+    gate.clear()
+    first = pool.lease("127.0.0.1")
+    second = pool.lease("127.0.0.1")
+    assert first is not None and second is not None and first.uses == 1
+    assert pool.lease("10.0.0.1") is None
+    assert pool.give_back(first) is True
+
+    again = pool.lease("127.0.0.1")
+    assert again is first and again.uses == 2
+    assert pool.give_back(again) is False
+    assert again.process.poll() is not None
+
+    status = pool.status()
+    assert (status["leases"], status["misses"], status["returned"], status["recycled"]) == (3, 2, 1, 1)
+    gate.set()
+    pool.close()
+    pool.give_back(second)
+    assert all(proc.poll() is not None for proc in spawned[:3])
+
+
+def test_bootstrap_room_uses_leased_processes_without_spawning() -> None:
+    manager = ChildAgentProcessManager()
+    pool, spawned = _fake_pool(size=3)
+    manager.warm_pool = pool
+    pool.start()
+    _wait_idle(pool, 3)
+
+    endpoints = manager.bootstrap_room(room_id="r1", player_ids=["a", "b", "c"])
+    assert list(endpoints) == ["a", "b", "c"]
+    assert {proc.pid for proc in spawned[:3]} == {item["pid"] for item in manager.status("r1").values()}
+    status = manager.status("r1")
+    assert all(item["pooled"] for item in status.values())
+    assert manager.pool_status()["leases"] == 3
+
+    manager.stop_room("r1")
+    status = pool.status()
+    assert status["returned"] + status["recycled"] == 3
+    assert manager.status("r1") == {}
+    manager.stop_all()
+    assert all(proc.poll() is not None for proc in spawned)
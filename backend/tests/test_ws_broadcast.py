@@ -0,0 +1,280 @@
+import asyncio
+import json
+
+from app.websocket.handler import WSConnectionManager
+
+
+class _FakeSocket:
+    def __init__(self, fail: bool = False) -> None:
+        self.sent: list[str] = []
+        self.fail = fail
+
+    async def accept(self) -> None:
+        return None
+
+    async def send_text(self, message: str) -> None:
+        if self.fail:
+            raise RuntimeError("closed")
+        self.sent.append(message)
+
+
+def _state() -> dict:
+    return {
+        "room_id": "r1",
+        "game_metadata": {"secret": True},
+        "players": [{"player_id": "cat_01", "nickname": "a", "role": "seer", "alive": True, "online": True}],
+        "speech_history": [],
+    }
+
+
+def test_room_state_is_encoded_once_per_view(monkeypatch) -> None:
+    manager = WSConnectionManager()
+    sockets = [_FakeSocket() for _ in range(5)]
+    broken = _FakeSocket(fail=True)
+    filter_calls: list[str] = []
+    original = WSConnectionManager._filter_state_for_view
+
+    def _counting(state, view_mode, player_id):
+        filter_calls.append(view_mode)
+        return original(state, view_mode, player_id)
+
+    monkeypatch.setattr(WSConnectionManager, "_filter_state_for_view", staticmethod(_counting))
+
+    async def _run() -> None:
+        for idx, ws in enumerate(sockets + [broken]):
+            await manager.connect("r1", f"viewer_{idx}", ws)
+        await manager.update_view_mode(sockets[2], "player:cat_01")
+        await manager.update_view_mode(sockets[3], "player:cat_01")
+        await manager.update_view_mode(sockets[4], "player:cat_02")
+        await manager.broadcast_room_state("r1", _state())
+        await manager.broadcast_phase_changed("r1", {"phase": "day_vote"}, god_view={"roles": {}})
+        await manager.drain()
+
+    asyncio.run(_run())
+
+    assert sorted(filter_calls) == ["god", "player:cat_01", "player:cat_02"]
+    assert sockets[0].sent[0] is sockets[1].sent[0]
+    assert sockets[2].sent[0] is sockets[3].sent[0]
+    assert json.loads(sockets[2].sent[0])["payload"]["watch_player"] == "cat_01"
+    assert "game_metadata" not in json.loads(sockets[4].sent[0])["payload"]
+    assert "god_view" in json.loads(sockets[0].sent[1])["payload"]
+    assert "god_view" not in json.loads(sockets[2].sent[1])["payload"]
+    assert broken not in manager._subscribers
+
+
+def test_slow_client_gets_latest_room_state_and_overflow_drops_it() -> None:
+    manager = WSConnectionManager()
+    manager.send_queue_max = 3
+    fast = _FakeSocket()
+    gate = asyncio.Event()
+
+    class _SlowSocket(_FakeSocket):
+        async def send_text(self, message: str) -> None:
+            await gate.wait()
+            await super().send_text(message)
+
+    slow = _SlowSocket()
+
+    async def _run() -> None:
+        await manager.connect("r1", "fast", fast)
+        await manager.connect("r1", "slow", slow)
+        for round_no in range(5):
+            state = _state()
+            state["round"] = round_no
+            await manager.broadcast_room_state("r1", state)
+            await manager._outboxes[fast].idle.wait()
+        assert len(fast.sent) == 5
+        assert manager.metrics_snapshot()["queue_depth_max"] == 1
+        gate.set()
+        await manager.drain()
+        assert [json.loads(msg)["payload"]["round"] for msg in slow.sent] == [0, 4]
+
+        gate.clear()
+        for idx in range(5):
+            await manager.broadcast("r1", "agent_status_update", {"idx": idx})
+            if fast in manager._outboxes:
+                await manager._outboxes[fast].idle.wait()
+        assert slow not in manager._subscribers
+        assert fast in manager._subscribers
+        assert len(fast.sent) == 10
+        gate.set()
+        await manager.drain()
+
+    asyncio.run(_run())
+    snapshot = manager.metrics_snapshot()
+    assert snapshot["frames_coalesced"] == 3
+    assert snapshot["clients_dropped"] == 1
+
+
+def _apply(state: dict, patch: dict) -> dict:
+    result = dict(state)
+    for key in patch.get("unset", []):
+        result.pop(key, None)
+    result.update(patch.get("set", {}))
+    players = [dict(item) for item in result.get("players", [])]
+    for item in players:
+        item.update(patch.get("players", {}).get(item["player_id"], {}))
+    result["players"] = players
+    history = list(result.get("speech_history", []))[patch.get("speech_drop", 0) :]
+    result["speech_history"] = history + patch.get("speech_append", [])
+    return result
+
+
+def _replay(messages: list[str], state: dict | None = None) -> tuple[dict | None, int]:
+    last_event_id = 0
+    for raw in messages:
+        msg = json.loads(raw)
+        last_event_id = max(last_event_id, msg["event_id"])
+        if msg["event"] == "room_state":
+            state = msg["payload"]
+        elif msg["event"] == "room_state_patch":
+            assert state is not None
+            state = _apply(state, msg["payload"])
+    return state, last_event_id
+
+
+def _speech(idx: int) -> dict:
+    return {"player_id": "cat_01", "event": "agent_speech", "content": f"speech {idx}", "thought_content": "x"}
+
+
+def test_state_patch_covers_fields_players_and_history_window() -> None:
+    prev = _state()
+    prev["speech_history"] = [_speech(i) for i in range(3)]
+    cur = json.loads(json.dumps(prev))
+    cur["phase"] = "day_vote"
+    cur.pop("game_metadata")
+    cur["players"][0]["alive"] = False
+    cur["speech_history"] = cur["speech_history"][1:] + [_speech(3), _speech(4)]
+
+    patch = WSConnectionManager._state_patch(prev, cur)
+    assert patch["set"] == {"phase": "day_vote"}
+    assert patch["unset"] == ["game_metadata"]
+    assert patch["players"] == {"cat_01": {"alive": False}}
+    assert patch["speech_drop"] == 1
+    assert [item["content"] for item in patch["speech_append"]] == ["speech 3", "speech 4"]
+    assert _apply(prev, patch) == cur
+    assert WSConnectionManager._state_patch(cur, cur) == {}
+
+
+def test_delta_subscribers_get_snapshot_then_patches_and_can_resume() -> None:
+    manager = WSConnectionManager()
+    legacy, delta, late = _FakeSocket(), _FakeSocket(), _FakeSocket()
+    state = _state()
+    player_view = lambda s: WSConnectionManager._filter_state_for_view(s, "player:cat_01", "cat_01")  # noqa: E731
+
+    async def _run() -> None:
+        nonlocal state
+        await manager.connect("r1", "legacy", legacy)
+        await manager.connect("r1", "delta", delta)
+        await manager.subscribe(delta, "player:cat_01", delta=True)
+        await manager.broadcast_room_state("r1", state)
+        for idx in range(3):
+            state = {**state, "speech_history": state["speech_history"] + [_speech(idx)]}
+            await manager.broadcast_room_state("r1", state)
+        await manager.drain()
+
+        events = [json.loads(msg)["event"] for msg in delta.sent]
+        assert events == ["room_state", "room_state_patch", "room_state_patch", "room_state_patch"]
+        assert all(json.loads(msg)["event"] == "room_state" for msg in legacy.sent)
+        rebuilt, last_event_id = _replay(delta.sent)
+        assert rebuilt == player_view(state)
+        assert len(delta.sent[-1]) < len(legacy.sent[-1])
+
+        await manager.disconnect("r1", delta)
+        state = {**state, "phase": "day_vote", "speech_history": state["speech_history"] + [_speech(9)]}
+        await manager.broadcast_room_state("r1", state)
+        await manager.broadcast_phase_changed("r1", {"phase": "day_vote"}, god_view={"roles": {}})
+
+        await manager.connect("r1", "delta", late)
+        assert await manager.subscribe(late, "player:cat_01", delta=True, last_event_id=last_event_id)
+        await manager.broadcast_room_state("r1", state)
+        await manager.drain()
+        replayed = [json.loads(msg) for msg in late.sent]
+        assert [msg["event"] for msg in replayed] == ["room_state_patch", "phase_changed"]
+        assert "god_view" not in replayed[1]["payload"]
+        resumed, _ = _replay(late.sent, rebuilt)
+        assert resumed == player_view(state)
+
+    asyncio.run(_run())
+
+
+def test_resume_falls_back_to_snapshot_once_ring_has_moved_on() -> None:
+    manager = WSConnectionManager()
+    manager.replay_buffer_size = 2
+    first, second = _FakeSocket(), _FakeSocket()
+
+    async def _run() -> None:
+        await manager.connect("r1", "viewer", first)
+        await manager.subscribe(first, "god", delta=True)
+        await manager.broadcast_room_state("r1", _state())
+        await manager.drain()
+        _, last_event_id = _replay(first.sent)
+        await manager.disconnect("r1", first)
+        for idx in range(4):
+            await manager.broadcast("r1", "agent_status_update", {"idx": idx})
+
+        await manager.connect("r1", "viewer", second)
+        assert not await manager.subscribe(second, "god", delta=True, last_event_id=last_event_id)
+        await manager.broadcast_room_state("r1", _state())
+        await manager.drain()
+        assert [json.loads(msg)["event"] for msg in second.sent] == ["room_state"]
+
+    asyncio.run(_run())
+
+
+def test_room_stream_lives_only_while_delta_subscribers_need_it() -> None:
+    manager = WSConnectionManager()
+    manager.resume_grace_sec = 0
+    legacy, delta = _FakeSocket(), _FakeSocket()
+
+    async def _run() -> None:
+        await manager.connect("r1", "legacy", legacy)
+        await manager.broadcast_room_state("r1", _state())
+        await manager.broadcast("r1", "agent_status_update", {})
+        assert "r1" not in manager._streams
+
+        await manager.connect("r1", "delta", delta)
+        await manager.subscribe(delta, "god", delta=True)
+        await manager.broadcast_room_state("r1", _state())
+        assert list(manager._streams["r1"].views) == ["god"]
+
+        # A finished room is forgotten; attached delta clients start over from a snapshot.
+        manager.forget_room("r1")
+        await manager.broadcast_room_state("r1", {**_state(), "phase": "game_over"})
+        await manager.drain()
+        last = json.loads(delta.sent[-1])
+        assert last["event"] == "room_state" and last["payload"]["phase"] == "game_over"
+
+        await manager.disconnect("r1", delta)
+        assert "r1" not in manager._streams
+        await manager.disconnect("r1", legacy)
+        assert "r1" not in manager._connections
+
+    asyncio.run(_run())
+
+
+def test_phase_changed_frames_are_encoded_once_and_shared_with_ring(monkeypatch) -> None:
+    manager = WSConnectionManager()
+    god, player = _FakeSocket(), _FakeSocket()
+    encoded: list[str] = []
+    original = WSConnectionManager._encode
+
+    def _counting(event_id, event, payload, ts):
+        encoded.append(event)
+        return original(event_id, event, payload, ts)
+
+    monkeypatch.setattr(WSConnectionManager, "_encode", staticmethod(_counting))
+
+    async def _run() -> None:
+        await manager.connect("r1", "god", god)
+        await manager.connect("r1", "p1", player)
+        await manager.subscribe(god, "god", delta=True)
+        await manager.subscribe(player, "player:cat_01", delta=True)
+        await manager.broadcast_room_state("r1", _state())
+        await manager.broadcast_phase_changed("r1", {"phase": "day_vote"}, god_view={"roles": {}})
+        await manager.drain()
+
+    asyncio.run(_run())
+    assert encoded.count("phase_changed") == 2
+    ring = {audience: frame for _, event, audience, frame in manager._streams["r1"].replay if event == "phase_changed"}
+    assert ring["god"] is god.sent[-1] and ring["!god"] is player.sent[-1]